@@ -0,0 +1,95 @@
+# backend/aggregates.py
+"""Incrementally maintained prediction totals behind /national.
+
+Every write to `predictions` adjusts `party_totals` and `party_region_totals`
+in the same transaction, so reads are a scan of a handful of rows instead of
+the whole predictions table. ``rebuild`` recomputes both from scratch.
+
+Every statement touches the totals rows in ``(party, region)`` order, so
+concurrent batch predictions and account deletions take their row locks in
+the same order and cannot deadlock each other.
+"""
+import json
+from collections import Counter
+
+UNKNOWN_REGION = "unknown"
+# A missing or empty region is counted as UNKNOWN_REGION everywhere;
+# ``record_predictions`` applies the same rule in Python.
+REGION_SQL = f"COALESCE(NULLIF(region, ''), '{UNKNOWN_REGION}')"
+
+# Add per-(party, region) deltas given as a JSON array of {party, region, n}.
+APPLY_DELTAS_SQL = """
+    WITH delta AS (
+        SELECT party, region, n
+        FROM json_to_recordset(%s::json) AS d(party text, region text, n bigint)
+    ),
+    national AS (
+        INSERT INTO party_totals AS t (party, count)
+        SELECT party, SUM(n)::bigint FROM delta GROUP BY party ORDER BY party
+        ON CONFLICT (party) DO UPDATE SET count = t.count + EXCLUDED.count
+    )
+    INSERT INTO party_region_totals AS t (party, region, count)
+    SELECT party, region, n FROM delta ORDER BY party, region
+    ON CONFLICT (region, party) DO UPDATE SET count = t.count + EXCLUDED.count
+"""
+
+# Delete a user's predictions and take them back off the totals in one statement.
+DELETE_USER_PREDICTIONS_SQL = f"""
+    WITH deleted AS (
+        DELETE FROM predictions WHERE user_id = %s
+        RETURNING party, {REGION_SQL} AS region
+    ),
+    delta AS (
+        SELECT party, region, COUNT(*) AS n FROM deleted GROUP BY party, region ORDER BY party, region
+    ),
+    national AS (
+        UPDATE party_totals AS t SET count = t.count - s.n
+        FROM (SELECT party, SUM(n)::bigint AS n FROM delta GROUP BY party ORDER BY party) AS s
+        WHERE t.party = s.party
+    )
+    UPDATE party_region_totals AS t SET count = t.count - delta.n
+    FROM delta
+    WHERE t.party = delta.party AND t.region = delta.region
+"""
+
+NATIONAL_TOTALS_SQL = "SELECT party, count FROM party_totals WHERE count > 0"
+
+
+def record_predictions(cur, rows):
+    """Add ``(party, region)`` pairs to the totals (call before commit)."""
+    counts = Counter((party, region or UNKNOWN_REGION) for party, region in rows)
+    if not counts:
+        return
+    deltas = [{"party": p, "region": r, "n": n} for (p, r), n in sorted(counts.items())]
+    cur.execute(APPLY_DELTAS_SQL, (json.dumps(deltas),))
+
+
+def delete_user_predictions(cur, user_id):
+    """Delete every prediction of ``user_id`` and subtract them from the totals."""
+    cur.execute(DELETE_USER_PREDICTIONS_SQL, (user_id,))
+
+
+def national_totals(cur) -> dict:
+    """Return ``{party: count}`` from the national totals table."""
+    cur.execute(NATIONAL_TOTALS_SQL)
+    return {row["party"]: int(row["count"]) for row in cur.fetchall()}
+
+
+def rebuild(cur):
+    """Recompute both totals tables from `predictions`.
+
+    Holds a SHARE lock on `predictions` so concurrent inserts wait until the
+    rebuilt totals are committed instead of being double counted or lost.
+    """
+    cur.execute("LOCK TABLE predictions IN SHARE MODE")
+    cur.execute("TRUNCATE party_totals, party_region_totals")
+    cur.execute(f"""
+        INSERT INTO party_region_totals (party, region, count)
+        SELECT party, {REGION_SQL}, COUNT(*)
+        FROM predictions
+        GROUP BY 1, 2
+    """)
+    cur.execute("""
+        INSERT INTO party_totals (party, count)
+        SELECT party, SUM(count)::bigint FROM party_region_totals GROUP BY party
+    """)
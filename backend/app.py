@@ -1,24 +1,24 @@
 from flask import (
     Flask, request, jsonify, send_from_directory, make_response,
-    current_app
+    current_app, Response, stream_with_context, g
 )
 from flask_cors import CORS, cross_origin
-from functools import wraps
-import os, time, traceback
+import os, time, traceback, json, threading
 import jwt
 import datetime as dt
-import bcrypt
-import joblib
-import pandas as pd
-from typing import Dict, Any
-from collections import Counter
+import click
 from dotenv import load_dotenv
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from psycopg2.errors import UniqueViolation
 from werkzeug.utils import secure_filename
 
-from backend.db import get_db_connection, get_cursor
+from backend.db import get_db_connection, get_cursor, pool_stats
+from backend.features import INVERSE_LABELS, engineer_features_row
+from backend import aggregates, metrics, registry, training, explain as explain_mod
+from backend.auth import admin_required, token_required
+from backend.passwords import HasherBusy, hasher
+from backend.metrics import span
+from backend.schema import ensure_schema
+from backend.cache import NATIONAL_CACHE_TTL, cached_response, response_cache
+from backend.routes.party_meta import party_meta_bp
 import re
 
 
@@ -48,13 +48,35 @@ CORS(
     max_age=86400,
 )
 
+app.register_blueprint(party_meta_bp)
+
 # ─── Paths ───────────────────────────────────────────────────────────────────
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PIPELINE_PATH = os.path.join(BASE_DIR, "models", "final_model.pkl")
+BOOSTER_PATH = os.path.join(BASE_DIR, "models", "xgb_booster_2028.ubj")
+ENCODER_SPEC_PATH = os.path.join(BASE_DIR, "models", "xgb_encoder_spec_2028.json")
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+# ─── CLI ─────────────────────────────────────────────────────────────────────
+@app.cli.command("init-db")
+def init_db_command():
+    """Create the API-owned tables and indexes."""
+    with get_cursor(commit=True) as cur:
+        ensure_schema(cur)
+    click.echo("✅ Schema is up to date")
+
+
+@app.cli.command("rebuild-aggregates")
+def rebuild_aggregates_command():
+    """Recompute party_totals / party_region_totals from predictions."""
+    with get_cursor(commit=True) as cur:
+        ensure_schema(cur)
+        aggregates.rebuild(cur)
+        totals = aggregates.national_totals(cur)
+    click.echo(f"✅ Rebuilt aggregates: {sum(totals.values())} predictions across {len(totals)} parties")
+
 # ─── Error handlers ─────────────────────────────────────────────────────────
 @app.errorhandler(404)
 def _404(_):
@@ -65,12 +87,47 @@ def _500(e):
     current_app.logger.exception("Unhandled 500 error")
     return jsonify({"error": str(e)}), 500
 
+@app.errorhandler(HasherBusy)
+def _hasher_busy(e):
+    resp = jsonify({"message": "Too many sign-ins in progress, please try again shortly"})
+    resp.headers["Retry-After"] = str(e.retry_after)
+    return resp, 429
+
 # ─── Health check ───────────────────────────────────────────────────────────
 @app.route("/health", methods=["GET"])
 def health():
     return jsonify({"status": "ok"}), 200
 
 
+@app.route("/health/db", methods=["GET"])
+def health_db():
+    return jsonify(pool_stats()), 200
+
+# ─── Metrics ─────────────────────────────────────────────────────────────────
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        metrics.observe_request(
+            request.endpoint or "unmatched", request.method, response.status_code,
+            time.perf_counter() - started,
+        )
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    if not metrics.enabled():
+        return jsonify({"error": "prometheus_client is not installed"}), 503
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
 @app.get("/__routes")
 def list_routes():
     routes = [{"rule": r.rule, "methods": sorted(list(r.methods))} for r in app.url_map.iter_rules()]
@@ -79,21 +136,106 @@ def list_routes():
 
 
 
+# ─── Training jobs ───────────────────────────────────────────────────────────
 @app.route("/train", methods=["POST"])
-def train_model():
-    import subprocess
-    result = subprocess.run(
-    ["python", "backend/models/train_model_2028.py"], capture_output=True, text=True
-)
-    return {"status": "done", "stdout": result.stdout, "stderr": result.stderr}
+@admin_required
+def train_model(current_user):
+    data = request.get_json(silent=True) or {}
+    model = data.get("model") or training.DEFAULT_MODEL
+    try:
+        job = training.submit(model, promote=bool(data.get("promote")),
+                              incremental=bool(data.get("incremental")))
+    except training.UnknownModel:
+        return jsonify({"error": f"Unknown model '{model}'",
+                        "models": sorted(training.TRAINERS)}), 400
+    except training.JobAlreadyRunning as e:
+        return jsonify({"error": str(e), "job_id": e.job_id,
+                        "url": f"/train/{e.job_id}"}), 409
+
+    resp = jsonify({**job, "url": f"/train/{job['job_id']}",
+                    "logs_url": f"/train/{job['job_id']}/logs"})
+    resp.headers["Location"] = f"/train/{job['job_id']}"
+    return resp, 202
+
+
+@app.route("/train/<job_id>", methods=["GET"])
+@admin_required
+def train_status(current_user, job_id):
+    job = training.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown training job"}), 404
+    return jsonify(job), 200
+
+
+@app.route("/train/<job_id>/logs", methods=["GET"])
+@admin_required
+def train_logs(current_user, job_id):
+    """Training output; ``?follow=1`` keeps the stream open until the job ends."""
+    if training.get(job_id) is None:
+        return jsonify({"error": "Unknown training job"}), 404
+    follow = request.args.get("follow") in ("1", "true")
+    offset = request.args.get("offset", type=int) or 0
+    return Response(
+        stream_with_context(training.read_log(job_id, offset=offset, follow=follow)),
+        mimetype="text/plain",
+    )
+
 
+# ─── Model registry ──────────────────────────────────────────────────────────
+@app.route("/model", methods=["GET"])
+def model_info():
+    """The model version this worker serves and the registry's ACTIVE version."""
+    info = None
+    if model_version:
+        try:
+            info = registry.manifest(model_version)
+        except registry.UnknownVersion:
+            pass
+    return jsonify({
+        "loaded": load_model() is not None,
+        "version": model_version,
+        "active_version": registry.active_version(),
+        "manifest": info,
+    }), 200
 
-# ─── DB helper ───────────────────────────────────────────────────────────────
-def get_db_connection():
-    url = os.getenv("DATABASE_URL")
-    if not url:
-        raise RuntimeError("DATABASE_URL not set")
-    return psycopg2.connect(url, cursor_factory=RealDictCursor)
+
+@app.cli.command("model-list")
+def model_list_command():
+    """List registered model versions."""
+    active = registry.active_version()
+    for info in registry.list_versions():
+        marker = "*" if info["version"] == active else " "
+        f1 = (info.get("metrics") or {}).get("macro_f1")
+        click.echo(f"{marker} {info['version']}  macro_f1={f1}  data={str(info.get('data_sha256'))[:12]}")
+
+
+@app.cli.command("model-register")
+@click.option("--pipeline", "pipeline_path", default=PIPELINE_PATH, show_default=True)
+@click.option("--promote", is_flag=True, help="Make it the active version right away.")
+def model_register_command(pipeline_path, promote):
+    """Register a trained pipeline (default: the training script's output)."""
+    trainer = training.TRAINERS[training.DEFAULT_MODEL]
+    metrics_ = training.read_report_metrics(trainer["report"]) if os.path.exists(trainer["report"]) else {}
+    native, meta = {}, {}
+    if pipeline_path == PIPELINE_PATH and os.path.exists(BOOSTER_PATH) and os.path.exists(ENCODER_SPEC_PATH):
+        native = {"booster_path": BOOSTER_PATH, "spec_path": ENCODER_SPEC_PATH}
+    if pipeline_path == PIPELINE_PATH:
+        meta = training.read_meta(trainer["meta"], since=0)  # carries the watermark for --incremental
+    data_path = None if meta.get("mode") == "incremental" else trainer["data"]
+    info = registry.register(pipeline_path, data_path=data_path, metrics=metrics_,
+                             promote=promote, source="cli", **native, **meta)
+    click.echo(f"✅ Registered {info['version']}" + (" (active)" if promote else ""))
+
+
+@app.cli.command("model-promote")
+@click.argument("version")
+def model_promote_command(version):
+    """Point ACTIVE at VERSION; workers switch on their next poll."""
+    try:
+        registry.promote_version(version)
+    except registry.UnknownVersion:
+        raise click.ClickException(f"Unknown model version '{version}'")
+    click.echo(f"✅ {version} is now active")
 
 
 # ─── Example Route (testing db connection) ────────────────────────────────
@@ -132,39 +274,132 @@ def options_root():
 def options_any(anypath):
     return _cors_preflight_ok()
 
-# ─── JWT auth ────────────────────────────────────────────────────────────────
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        if request.method == "OPTIONS":
-            return jsonify({"ok": True}), 200
-        token = request.headers.get("Authorization", "").replace("Bearer ", "")
-        if not token:
-            return jsonify({"message": "Token is missing"}), 401
-        try:
-            decoded = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
-            current_user = {"id": decoded.get("user_id"), "username": decoded.get("username")}
-        except jwt.ExpiredSignatureError:
-            return jsonify({"message": "Token expired"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"message": "Token invalid"}), 401
-        return f(current_user, *args, **kwargs)
-    return decorated
-
-
 # ─── Model pipeline ──────────────────────────────────────────────────────────
+# Loaded on first use, not at import: numpy, pandas and the XGBoost runtime
+# stay out of processes (CLI, tests, /health) that never predict. The
+# registry's ACTIVE version wins, then the native booster + encoder spec
+# written by the training script, then the joblib pipeline.
 pipeline = None
-if os.path.exists(PIPELINE_PATH):
-    try:
-        pipeline = joblib.load(PIPELINE_PATH)
-        print(f"✅ Pipeline model loaded from {PIPELINE_PATH}")
-    except Exception as e:
-        print(f"❌ Failed to load pipeline: {e}")
-else:
-    print(f"⚠️ Pipeline not found at {PIPELINE_PATH}")
+model_version = None
+_model_loaded = False
+_engine = None
+_engine_lock = threading.Lock()
 
 
-inverse_mapping = {0: "lab", 1: "con", 2: "ld", 3: "green", 4: "reform", 5: "snp", 6: "other"}
+def _load_serving_model():
+    active = registry.active_version()
+    if active:
+        try:
+            loaded = registry.load(active)
+            print(f"✅ Pipeline model {active} loaded from the registry")
+            return loaded, active
+        except Exception as e:
+            print(f"❌ Failed to load model version {active}: {e}")
+    if os.path.exists(BOOSTER_PATH) and os.path.exists(ENCODER_SPEC_PATH):
+        try:
+            from backend.inference import NativeModel
+            loaded = NativeModel.load(BOOSTER_PATH, ENCODER_SPEC_PATH)
+            print(f"✅ Native model loaded from {BOOSTER_PATH}")
+            return loaded, None
+        except Exception as e:
+            print(f"❌ Failed to load native model: {e}")
+    if os.path.exists(PIPELINE_PATH):
+        try:
+            import joblib
+            loaded = joblib.load(PIPELINE_PATH)
+            print(f"✅ Pipeline model loaded from {PIPELINE_PATH}")
+            return loaded, None
+        except Exception as e:
+            print(f"❌ Failed to load pipeline: {e}")
+    else:
+        print(f"⚠️ Pipeline not found at {PIPELINE_PATH}")
+    return None, None
+
+
+def load_model():
+    """Return the serving pipeline, loading it on the first call.
+
+    Also starts this process's model watcher, from the version just resolved.
+    """
+    global pipeline, model_version, _model_loaded
+    if not _model_loaded:
+        with _engine_lock:
+            if not _model_loaded and pipeline is None:
+                pipeline, model_version = _load_serving_model()
+            _model_loaded = True
+    _ensure_model_watcher()
+    return pipeline
+
+
+def get_engine():
+    """Return the precompiled inference engine for the current pipeline."""
+    global _engine
+    engine = _engine
+    if engine is not None and engine.pipeline is pipeline:
+        return engine
+    with _engine_lock:
+        if _engine is None or _engine.pipeline is not pipeline:
+            from backend.inference import InferenceEngine
+            _engine = InferenceEngine(pipeline)
+        return _engine
+
+
+def install_model(version: str):
+    """Load, compile and warm ``version``, then swap it in for new requests.
+
+    Runs in the model watcher thread; requests already in flight finish on
+    the pipeline/engine they started with.
+    """
+    global pipeline, model_version, _engine
+    from backend.inference import InferenceEngine
+    new_pipeline = registry.load(version)
+    engine = InferenceEngine(new_pipeline)
+    engine.predict_proba_row(engine.row({})[1])  # first booster call allocates its buffers
+    with _engine_lock:
+        _engine, pipeline, model_version = engine, new_pipeline, version
+    print(f"✅ Switched to model version {version}")
+
+
+_watcher = None
+
+def _ensure_model_watcher():
+    # One watcher per worker process, started after gunicorn forks it and only
+    # once the model is loaded, so it starts from the version actually served.
+    global _watcher
+    if _watcher is None or _watcher.pid != os.getpid():
+        with _engine_lock:
+            if _watcher is None or _watcher.pid != os.getpid():
+                _watcher = registry.ModelWatcher(model_version, install_model).start()
+
+
+def warmup():
+    """Do in advance what a worker's first /predict would otherwise pay for.
+
+    Loads and compiles the model, runs one prediction so the booster
+    allocates its buffers, builds the SHAP explainer when shap is installed
+    and starts the model watcher. Called from gunicorn's ``post_fork``.
+    """
+    if load_model() is not None:
+        engine = get_engine()
+        engine.predict_proba_row(engine.row({})[1])
+        explain_mod.warmup(engine)
+
+
+def create_app(config: dict = None, preload_model: bool = False) -> Flask:
+    """Return the WSGI app, optionally with overrides and the model loaded.
+
+    Routes are registered when this module is imported; nothing heavy is.
+    ``preload_model`` loads and compiles (but does not warm) the model in the
+    calling process, which gunicorn's master does so forked workers share it.
+    """
+    if config:
+        app.config.update(config)
+    if preload_model and load_model() is not None:
+        get_engine()
+    return app
+
+
+inverse_mapping = dict(INVERSE_LABELS)  # class index -> party, as the models are trained
 PARTIES = ["lab", "con", "ld", "green", "reform", "snp", "other"]
 
 # ─── Auth: register & login ──────────────────────────────────────────────────
@@ -191,6 +426,8 @@ def password_strength(password: str) -> str:
 @app.route("/auth/register", methods=["POST"])
 @cross_origin(origins=allowed_origins, supports_credentials=True)
 def register():
+    from psycopg2.errors import UniqueViolation
+
     data = request.get_json() or {}
     username, email, password = data.get("username"), data.get("email"), data.get("password")
 
@@ -205,7 +442,7 @@ def register():
             "passwordStrength": strength
         }), 400
 
-    pw_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    pw_hash = hasher.hash(password)
 
     conn = get_db_connection()
     cur = conn.cursor()
@@ -244,7 +481,7 @@ def login():
         return jsonify({"message": "Username/email and password required"}), 400
 
     conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)  
+    cur = conn.cursor()  
     cur.execute("""
         SELECT id, username, email, pw_hash, profile_pic_url, chosen_alignment, profile_completion
         FROM users
@@ -256,9 +493,16 @@ def login():
     if not user:
         return jsonify({"message": "User not found"}), 404
 
-    pw_hash = user["pw_hash"].encode("utf-8") if isinstance(user["pw_hash"], str) else user["pw_hash"]
-    if not bcrypt.checkpw(password.encode("utf-8"), pw_hash):
+    matches, new_hash = hasher.verify(password, user["pw_hash"])
+    if not matches:
         return jsonify({"message": "Invalid credentials"}), 401
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made; store one at the new cost.
+        try:
+            with get_cursor(commit=True) as cur:
+                cur.execute("UPDATE users SET pw_hash=%s WHERE id=%s", (new_hash, user["id"]))
+        except Exception:
+            current_app.logger.exception("password rehash failed")
 
     # Generate JWT
     token = jwt.encode(
@@ -296,88 +540,29 @@ def login():
 @token_required
 def predict(current_user):
     try:
-        if pipeline is None:
+        if load_model() is None:
             return jsonify({"error": "Model is not loaded on server. Please try again later."}), 503
 
         data = request.get_json(silent=True) or {}
+        explain = str(request.args.get("explain") or data.pop("explain", None) or "none").lower()
         if not data:
             return jsonify({"error": "No input data provided"}), 400
-
-        # ─── Feature engineering ─────────────────────────────
-        def engineer_features(d: Dict[str, Any]) -> Dict[str, Any]:
-            education_map = {
-                "no qualification": 0, "gcse or equivalent": 1, "a-level or equivalent": 2,
-                "bachelors degree": 3, "masters degree": 4, "phd or higher": 5, "other": 2
-            }
-            income_map = {
-                "under £20,000": 0, "£20,000–£40,000": 1, "£40,000–£60,000": 2,
-                "£60,000-£80,000": 3, "£80,000 +": 4
-            }
-            trust_map = {"very low": 0, "low": 1, "medium": 2, "high": 3, "very high": 4}
-            satisfaction_map = {
-                "very dissatisfied": 0, "dissatisfied": 1, "neutral": 2,
-                "satisfied": 3, "very satisfied": 4
-            }
-
-            d = {(k or "").lower().strip(): (v.lower().strip() if isinstance(v, str) else v)
-                 for k, v in d.items()}
-
-            def _get(k, default="unknown"): return d.get(k, default)
-
-            d.update({
-                "is_climate_priority": int(_get("climate_priority") == "yes"),
-                "is_fiscally_conservative": int(_get("support_welfare_spending") == "no" and _get("tax_on_wealthy") == "no"),
-                "is_media_skeptic": int(_get("trust_mainstream_media") in ["low", "very low"]),
-                "is_snp_region": int(_get("constituency_leaning") == "scotland"),
-                "is_reform_minded": int(_get("concern_political_corruption") == "very concerned" and _get("immigration_policy_stance") in ["restrictive","very restrictive"]),
-                "is_social_justice_focused": int(_get("importance_social_issues") == "very important" and _get("support_welfare_spending") == "yes"),
-                "education_score": education_map.get(_get("education_level"), 2),
-                "income_score": income_map.get(_get("household_income"), 2),
-                "media_trust_score": trust_map.get(_get("trust_mainstream_media"), 2),
-                "gov_satisfaction_score": satisfaction_map.get(_get("satisfaction_national_government"), 2),
-            })
-            return d
-
-        raw_features = [
-            "age_bracket","education_level","household_income","socioeconomic_class",
-            "housing_status","constituency_leaning","vote_national","vote_local",
-            "satisfaction_national_government","importance_economy","importance_social_issues",
-            "support_welfare_spending","tax_on_wealthy","trust_mainstream_media",
-            "concern_political_corruption","climate_priority","immigration_policy_stance",
-            "trust_public_institutions"
-        ]
-        engineered_cols = [
-            "is_fiscally_conservative","is_climate_priority","is_media_skeptic",
-            "is_snp_region","is_reform_minded","is_social_justice_focused",
-            "education_score","income_score","media_trust_score","gov_satisfaction_score"
-        ]
-
-        df = pd.DataFrame([engineer_features(data)])
-        encoder = pipeline.named_steps["encoder"]
-        model = pipeline.named_steps["model"]
-
-        for col in raw_features:
-            if col not in df.columns:
-                df[col] = "unknown"
-
-        encoded_df = pd.DataFrame(
-            encoder.transform(df[raw_features]),
-            columns=encoder.get_feature_names_out()
-        )
-        final_df = pd.concat([encoded_df, df[engineered_cols].reset_index(drop=True)], axis=1)
-
-        for col in getattr(model, "feature_names_in_", []):
-            if col not in final_df.columns:
-                final_df[col] = 0
-        if hasattr(model, "feature_names_in_"):
-            final_df = final_df[model.feature_names_in_]
-
-        # ─── Predictions ─────────────────────────────
-        probs = model.predict_proba(final_df)[0]
-        classes = model.classes_
+        if explain not in explain_mod.EXPLAIN_MODES:
+            return jsonify({"error": f"explain must be one of {', '.join(explain_mod.EXPLAIN_MODES)}"}), 400
+
+        # ─── Features + predictions (precompiled engine) ─────
+        engine = get_engine()
+        with span("predict.features"):
+            d, engineered = engineer_features_row(data)
+        with span("predict.encode"):
+            row = engine.encode_row(d, engineered)
+        with span("predict.model"):
+            probs = engine.predict_proba_row(row)
+        classes = engine.classes
+        labels = engine.labels or inverse_mapping
 
         probabilities = {
-            inverse_mapping.get(int(cls), "other"): round(float(prob) * 100, 2)
+            labels.get(int(cls), "other"): round(float(prob) * 100, 2)
             for cls, prob in zip(classes, probs)
         }
 
@@ -390,45 +575,52 @@ def predict(current_user):
         confidence = top_predictions[0]["confidence"]
 
         # ─── Save to DB ─────────────────────────────
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO predictions (user_id, party, region, confidence, runner_up, timestamp)
-            VALUES (%s, %s, %s, %s, %s, NOW())
-            """,
-            (
-                current_user["id"],
-                winner,
-                data.get("constituency_leaning") or data.get("region"),
-                confidence,
-                top_predictions[1]["party"] if len(top_predictions) > 1 else None,
-            ),
-        )
+        region = data.get("constituency_leaning") or data.get("region")
+        with span("predict.db"):
+            conn = get_db_connection()
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT INTO predictions (user_id, party, region, confidence, runner_up, timestamp)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+                """,
+                (
+                    current_user["id"],
+                    winner,
+                    region,
+                    confidence,
+                    top_predictions[1]["party"] if len(top_predictions) > 1 else None,
+                ),
+            )
+            aggregates.record_predictions(cur, [(winner, region)])
 
-        cur.execute(
-            """
-            UPDATE users
-            SET dashboard_party = %s,
-                profile_completion = 1
-            WHERE id = %s
-            """,
-            (winner, current_user["id"])
-        )
+            cur.execute(
+                """
+                UPDATE users
+                SET dashboard_party = %s,
+                    profile_completion = 1
+                WHERE id = %s
+                """,
+                (winner, current_user["id"])
+            )
 
-        conn.commit()
-        cur.close(); conn.close()
+            conn.commit()
+            cur.close(); conn.close()
+        response_cache.invalidate("national")
 
-        # ─── SHAP values ─────────────────────────────
+        # ─── SHAP values (opt-in) ─────────────────────────────
         shap_values = None
-        try:
-            import shap
-            explainer = shap.TreeExplainer(model)
-            shap_raw = explainer.shap_values(final_df)
-            shap_values = dict(zip(final_df.columns, shap_raw[0].tolist()))
-        except Exception as shap_err:
-            print("⚠️ SHAP explanation failed:", shap_err)
-            shap_values = None
+        explanation = None
+        if explain == "sync":
+            try:
+                with span("predict.shap"):
+                    shap_values = explain_mod.explain_row(engine, row)
+            except Exception as shap_err:
+                print("⚠️ SHAP explanation failed:", shap_err)
+        elif explain == "deferred":
+            job_id = explain_mod.jobs.submit(current_user["id"], engine, row)
+            explanation = {"job_id": job_id, "status": "pending",
+                           "url": f"/predict/{job_id}/explanation"}
 
         # ─── Final Response ─────────────────────────────
         return jsonify({
@@ -437,7 +629,8 @@ def predict(current_user):
             "top_predictions": top_predictions,
             "probabilities": probabilities,
             "profileCompletion": 1,
-            "shap_values": shap_values  
+            "shap_values": shap_values,
+            "explanation": explanation,
         }), 200
 
     except Exception as e:
@@ -445,59 +638,232 @@ def predict(current_user):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/predict/<job_id>/explanation", methods=["GET"])
+@token_required
+def get_prediction_explanation(current_user, job_id):
+    status = explain_mod.jobs.get(job_id, current_user["id"])
+    if status is None:
+        return jsonify({"error": "Explanation not found"}), 404
+    if status["status"] == "pending":
+        return jsonify(status), 202
+    if status["status"] == "failed":
+        return jsonify(status), 500
+    return jsonify(status), 200
+
+
+# ─── Batch prediction ────────────────────────────────────────────────────────
+BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "50000"))
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+def _read_batch_payload():
+    """Return (surveys, error) from a JSON array, {"surveys": [...]} or NDJSON body."""
+    if request.mimetype in NDJSON_MIMETYPES:
+        surveys = []
+        for lineno, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                surveys.append(json.loads(line))
+            except ValueError:
+                return None, f"Invalid JSON on line {lineno}"
+    else:
+        surveys = request.get_json(silent=True)
+        if isinstance(surveys, dict):
+            surveys = surveys.get("surveys")
+
+    if not isinstance(surveys, list) or not surveys:
+        return None, "Expected a non-empty array of surveys"
+    if not all(isinstance(s, dict) and s for s in surveys):
+        return None, "Every survey must be a non-empty object"
+    return surveys, None
+
+
+@app.route("/predict/batch", methods=["POST"])
+@token_required
+def predict_batch(current_user):
+    try:
+        if load_model() is None:
+            return jsonify({"error": "Model is not loaded on server. Please try again later."}), 503
+
+        surveys, error = _read_batch_payload()
+        if error:
+            return jsonify({"error": error}), 400
+        if len(surveys) > BATCH_MAX_ROWS:
+            return jsonify({"error": f"Batch too large (max {BATCH_MAX_ROWS} surveys)"}), 413
+
+        from backend.inference import summarize_probabilities
+        engine = get_engine()
+        with span("predict_batch.model"):
+            probs = engine.predict_proba_batch(surveys)
+        results = summarize_probabilities(probs, engine.classes, engine.labels or inverse_mapping)
+
+        rows = [
+            (
+                current_user["id"],
+                res["winner"],
+                survey.get("constituency_leaning") or survey.get("region"),
+                res["confidence"],
+                res["runner_up"],
+            )
+            for survey, res in zip(surveys, results)
+        ]
+
+        with span("predict_batch.db"):
+            from psycopg2.extras import execute_values
+
+            conn = get_db_connection()
+            cur = conn.cursor()
+            try:
+                execute_values(
+                    cur,
+                    "INSERT INTO predictions (user_id, party, region, confidence, runner_up, timestamp) VALUES %s",
+                    rows,
+                    template="(%s, %s, %s, %s, %s, NOW())",
+                    page_size=1000,
+                )
+                aggregates.record_predictions(cur, [(row[1], row[2]) for row in rows])
+                if rows:
+                    # Same as /predict: the dashboard shows the latest winner.
+                    cur.execute(
+                        "UPDATE users SET dashboard_party = %s, profile_completion = 1 WHERE id = %s",
+                        (rows[-1][1], current_user["id"]),
+                    )
+                conn.commit()
+                response_cache.invalidate("national")
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close(); conn.close()
+
+        return jsonify({"count": len(results), "predictions": results}), 200
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
 # ─── User predictions (history) ──────────────────────────────────────────────
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+HISTORY_EXPORT_ITERSIZE = 1000
+
+# Newest first; `after` is the id of the last row of the previous page and the
+# (timestamp, id) row comparison walks the (user_id, timestamp, id) index.
+HISTORY_SQL = """
+    SELECT id, party, region,
+           to_char(timestamp, 'YYYY-MM-DD"T"HH24:MI:SS"Z"') AS timestamp
+    FROM predictions
+    WHERE user_id = %(user_id)s {after}
+    ORDER BY predictions.timestamp DESC, id DESC
+    {limit}
+"""
+HISTORY_AFTER_SQL = """
+      AND (predictions.timestamp, id) < (
+          SELECT timestamp, id FROM predictions WHERE id = %(after)s AND user_id = %(user_id)s
+      )"""
+
+
+def _history_query(after, limit=None):
+    return HISTORY_SQL.format(
+        after=HISTORY_AFTER_SQL if after is not None else "",
+        limit="LIMIT %(limit)s" if limit is not None else "",
+    )
+
+
+def _int_arg(name, default=None):
+    raw = request.args.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+
+
 @app.route("/me/prediction", methods=["GET"])
 @token_required
 def get_user_prediction(current_user):
+    try:
+        after = _int_arg("after")
+        limit = _int_arg("limit", HISTORY_DEFAULT_LIMIT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not 1 <= limit <= HISTORY_MAX_LIMIT:
+        return jsonify({"error": f"'limit' must be between 1 and {HISTORY_MAX_LIMIT}"}), 400
+
+    params = {"user_id": current_user["id"], "after": after}
+    if request.args.get("format") == "ndjson":
+        return _stream_history(params)
+
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute(
-            "SELECT party, region, timestamp FROM predictions WHERE user_id = %s ORDER BY timestamp DESC",
-            (current_user["id"],),
-        )
+        # One extra row tells us whether there is another page
+        cur.execute(_history_query(after, limit), {**params, "limit": limit + 1})
         history = cur.fetchall()
         cur.close(); conn.close()
 
-        # convert timestamps to ISO strings 
-        for row in history:
-            if row.get("timestamp"):
-                row["timestamp"] = row["timestamp"].isoformat(timespec="seconds") + "Z"
+        next_cursor = None
+        if len(history) > limit:
+            history = history[:limit]
+            next_cursor = history[-1]["id"]
 
-        if not history:
-            return jsonify({"saved_prediction": None, "history": []}), 200
-        return jsonify({"saved_prediction": history[0], "history": history}), 200
+        body = {"history": history, "next_cursor": next_cursor}
+        if after is None:
+            body["saved_prediction"] = history[0] if history else None
+        return jsonify(body), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+def _stream_history(params):
+    """Export the whole history as NDJSON through a server-side cursor."""
+    conn = get_db_connection()
+
+    def generate():
+        cur = conn.cursor(name=f"history_export_{params['user_id']}")
+        cur.itersize = HISTORY_EXPORT_ITERSIZE
+        try:
+            cur.execute(_history_query(params["after"]), params)
+            for row in cur:
+                yield json.dumps(row) + "\n"
+        finally:
+            cur.close()
+            conn.rollback()
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route("/me/prediction", methods=["DELETE"])
 @token_required
 def delete_user_prediction(current_user):
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute("DELETE FROM predictions WHERE user_id = %s", (current_user["id"],))
+        aggregates.delete_user_predictions(cur, current_user["id"])
         conn.commit()
         cur.close(); conn.close()
+        response_cache.invalidate("national")
         return jsonify({"message": "Prediction history cleared."}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 # ─── National aggregate ──────────────────────────────────────────────────────
 @app.route("/national", methods=["GET"])
+@cached_response("national", ttl=NATIONAL_CACHE_TTL, max_age=0)
 def national_prediction():
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute("SELECT party, region, timestamp FROM predictions")
-        rows = cur.fetchall()
+        raw_counts = aggregates.national_totals(cur)
         cur.close(); conn.close()
 
-        if not rows:
+        total = sum(raw_counts.values())
+        if not total:
             return jsonify({"message": "No predictions yet"}), 404
 
-        raw_counts = Counter([row["party"] for row in rows])
-        total = sum(raw_counts.values())
         percentages = {p: round((raw_counts.get(p, 0) / total) * 100, 1) for p in PARTIES}
         winner = max(percentages, key=percentages.get)
         return jsonify({
@@ -528,53 +894,101 @@ def normalize_user(user: dict, host_url: str) -> dict:
     }
 
 # ─── Dashboard ───────────────────────────────────────────────────────────────
+PARTY_LABELS = {
+    "lab": "Labour",
+    "con": "Conservative",
+    "ld": "Liberal Democrats",
+    "green": "Green",
+    "reform": "Reform UK",
+    "snp": "SNP",
+    "other": "Other",
+}
+
+# One round trip: the user row plus history, badges and regional counts
+# aggregated to JSON next to it.
+_DASHBOARD_SQL = """
+    WITH u AS (
+        SELECT id, username, email, display_name, constituency, streak,
+               profile_completion, chosen_alignment, dashboard_party, profile_pic_url
+        FROM users WHERE id = %(user_id)s
+    ),
+    h AS (
+        SELECT party, confidence, runner_up, timestamp AS ts
+        FROM predictions
+        WHERE user_id = %(user_id)s
+        ORDER BY timestamp DESC
+        LIMIT 10
+    ),
+    r AS (
+        SELECT party, count::int AS count
+        FROM party_region_totals
+        WHERE region = (SELECT COALESCE(NULLIF(constituency, ''), 'unknown') FROM u)
+          AND count > 0
+    )
+    SELECT u.*,
+        (SELECT COALESCE(json_agg(json_build_object(
+                    'party', party, 'confidence', confidence, 'runner_up', runner_up,
+                    'timestamp', to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS"Z"')
+                ) ORDER BY ts DESC), '[]'::json)
+         FROM h) AS history,
+        {badges} AS badges,
+        (SELECT COALESCE(json_agg(json_build_object('party', party, 'count', count)
+                ORDER BY count DESC), '[]'::json)
+         FROM r) AS region_counts
+    FROM u
+"""
+DASHBOARD_SQL = _DASHBOARD_SQL.format(badges="""(SELECT COALESCE(json_agg(json_build_object(
+                    'name', name, 'unlocked', unlocked,
+                    'progress_current', progress_current, 'progress_target', progress_target
+                )), '[]'::json)
+         FROM badges WHERE user_id = %(user_id)s)""")
+# Fallback when the badges table is missing or failing: the rest still loads.
+DASHBOARD_NO_BADGES_SQL = _DASHBOARD_SQL.format(badges="'[]'::json")
+
+
+def _label_prediction(row: dict) -> dict:
+    """Attach party labels and an ISO timestamp to a prediction row."""
+    code = row["party"]
+    row["partyLabel"] = PARTY_LABELS.get(code, code)
+    if row.get("runner_up"):
+        row["runnerUpLabel"] = PARTY_LABELS.get(row["runner_up"], row["runner_up"])
+    if row.get("timestamp") and not isinstance(row["timestamp"], str):
+        row["timestamp"] = row["timestamp"].isoformat(timespec="seconds") + "Z"
+    return row
+
+
 @app.route("/me/dashboard", methods=["GET"])
 @token_required
 def get_dashboard(current_user):
     try:
-        print("🔑 Current user from JWT:", current_user)
-
-        # Party label mapping (codes → full names)
-        party_labels = {
-            "lab": "Labour",
-            "con": "Conservative",
-            "ld": "Liberal Democrats",
-            "green": "Green",
-            "reform": "Reform UK",
-            "snp": "SNP",
-            "other": "Other",
-        }
-
-        # Fetch user info
-        with get_cursor() as cur:
-            cur.execute("""
-                SELECT id, username, email, display_name, constituency, streak,
-                       profile_completion, chosen_alignment, dashboard_party, profile_pic_url
-                FROM users WHERE id=%s
-            """, (current_user["id"],))
-            user = cur.fetchone()
+        params = {"user_id": current_user["id"]}
+        try:
+            with get_cursor() as cur:
+                cur.execute(DASHBOARD_SQL, params)
+                user = cur.fetchone()
+        except Exception:
+            current_app.logger.warning("dashboard badges unavailable", exc_info=True)
+            with get_cursor() as cur:
+                cur.execute(DASHBOARD_NO_BADGES_SQL, params)
+                user = cur.fetchone()
 
         if not user:
             return jsonify({"error": "User not found"}), 404
 
+        history = user.pop("history", None) or []
+        badges = user.pop("badges", None) or []
+        region_counts = user.pop("region_counts", None) or []
         user_normalized = normalize_user(user, request.host_url)
 
-        # Last prediction from predictions table
-        with get_cursor() as cur:
-            cur.execute("""
-                SELECT party, confidence, runner_up, timestamp
-                FROM predictions
-                WHERE user_id=%s
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (current_user["id"],))
-            last_prediction = cur.fetchone()
+        for row in history:
+            _label_prediction(row)
+        last_prediction = dict(history[0]) if history else None
 
         # ─── Fallback to dashboard_party if no prediction exists ───────────────
         if not last_prediction and user_normalized.get("dashboard_party"):
             last_prediction = {
                 "party": user_normalized["dashboard_party"],
-                "partyLabel": party_labels.get(
+                "partyLabel": PARTY_LABELS.get(
                     user_normalized["dashboard_party"],
                     user_normalized["dashboard_party"]
                 ),
@@ -583,74 +997,19 @@ def get_dashboard(current_user):
                 "timestamp": None,
             }
 
-        # Attach labels + timestamp formatting
-        if last_prediction:
-            code = last_prediction["party"]
-            last_prediction["partyLabel"] = party_labels.get(code, code)
-            if last_prediction.get("runner_up"):
-                last_prediction["runnerUpLabel"] = party_labels.get(
-                    last_prediction["runner_up"], last_prediction["runner_up"]
-                )
-            if last_prediction.get("timestamp") and not isinstance(last_prediction["timestamp"], str):
-                last_prediction["timestamp"] = (
-                    last_prediction["timestamp"].isoformat(timespec="seconds") + "Z"
-                )
-
-        # Prediction history
-        with get_cursor() as cur:
-            cur.execute("""
-                SELECT party, confidence, runner_up, timestamp
-                FROM predictions
-                WHERE user_id=%s
-                ORDER BY timestamp DESC
-                LIMIT 10
-            """, (current_user["id"],))
-            history = cur.fetchall()
-
-        for row in history:
-            code = row["party"]
-            row["partyLabel"] = party_labels.get(code, code)
-            if row.get("runner_up"):
-                row["runnerUpLabel"] = party_labels.get(row["runner_up"], row["runner_up"])
-            if row.get("timestamp"):
-                row["timestamp"] = row["timestamp"].isoformat(timespec="seconds") + "Z"
-
-        # Badges
-        try:
-            with get_cursor() as cur:
-                cur.execute("""
-                    SELECT name, unlocked, progress_current, progress_target
-                    FROM badges
-                    WHERE user_id=%s
-                """, (current_user["id"],))
-                badges = cur.fetchall()
-        except Exception:
-            badges = []
-
-        # Regional comparison (fallback to 'unknown')
-        region = user.get("constituency") or "unknown"
-        with get_cursor() as cur:
-            cur.execute("""
-                SELECT party, COUNT(*)::int AS count
-                FROM predictions
-                WHERE COALESCE(region, 'unknown') = %s
-                GROUP BY party
-            """, (region,))
-            region_counts = cur.fetchall()
-
         for r in region_counts:
-            code = r["party"]
-            r["partyLabel"] = party_labels.get(code, code)
+            r["partyLabel"] = PARTY_LABELS.get(r["party"], r["party"])
 
-        # Final response
-        response = {
+        return jsonify({
             "user": user_normalized,
             "lastPrediction": last_prediction or None,
-            "history": history or [],
-        }
-
-        print("✅ Dashboard response payload:", response)
-        return jsonify(response), 200
+            "history": history,
+            "badges": badges,
+            "regionComparison": {
+                "region": user.get("constituency") or "unknown",
+                "counts": region_counts,
+            },
+        }), 200
 
     except Exception as e:
         current_app.logger.exception("dashboard failed")
@@ -684,7 +1043,7 @@ def upload_profile_pic(current_user):
 
         # update DB
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = conn.cursor()
         cur.execute(
             "UPDATE users SET profile_pic_url=%s WHERE id=%s RETURNING profile_pic_url",
             (public_url, current_user["id"])
@@ -770,7 +1129,7 @@ def update_settings(current_user):
         profile_pic_url = data.get("profilePicUrl") 
 
         conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = conn.cursor()
 
         # Prevent duplicate emails
         if email:
@@ -0,0 +1,99 @@
+# backend/cache.py
+"""In-process cache for public, read-mostly JSON responses.
+
+Entries hold the serialized body plus a strong ETag (sha256 of the body), so
+a hit costs a dict lookup and a conditional GET from a browser or CDN whose
+ETag still matches is answered with an empty ``304 Not Modified``.
+
+Entries expire after ``ttl`` seconds and are dropped immediately by
+``invalidate`` (e.g. when a new prediction changes the national totals).
+Invalidation is per process; with several workers the TTL bounds how stale
+another worker's copy can be.
+"""
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import Response, make_response, request
+
+NATIONAL_CACHE_TTL = int(os.getenv("NATIONAL_CACHE_TTL", "30"))
+PARTY_META_CACHE_TTL = int(os.getenv("PARTY_META_CACHE_TTL", "86400"))
+
+
+class ResponseCache:
+    def __init__(self):
+        self._entries = {}      # key -> (body, etag, mimetype, expires_at)
+        self._generation = {}   # key -> bumped on every invalidation
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry
+
+    def generation(self, key) -> int:
+        with self._lock:
+            return self._generation.get(key, 0)
+
+    def put(self, key, body: bytes, mimetype: str, ttl: float, generation: int):
+        """Store ``body`` unless ``key`` was invalidated while it was being built."""
+        etag = hashlib.sha256(body).hexdigest()
+        entry = (body, etag, mimetype, time.monotonic() + ttl)
+        with self._lock:
+            if self._generation.get(key, 0) == generation:
+                self._entries[key] = entry
+        return entry
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generation[key] = self._generation.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            for key in self._entries:
+                self._generation[key] = self._generation.get(key, 0) + 1
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def _conditional(entry, max_age: int):
+    body, etag, mimetype, _ = entry
+    resp = Response(body, status=200, mimetype=mimetype)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
+    return resp.make_conditional(request)
+
+
+def cached_response(key: str, ttl: float, max_age: int = None):
+    """Cache a view's 200 responses under ``key`` and answer conditional GETs.
+
+    Non-200 responses (404 "no data yet", errors) pass through uncached and
+    are sent with ``Cache-Control: no-store``.
+    """
+    max_age = int(ttl if max_age is None else max_age)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            entry = response_cache.get(key)
+            if entry is None:
+                generation = response_cache.generation(key)
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    resp.headers["Cache-Control"] = "no-store"
+                    return resp
+                entry = response_cache.put(key, resp.get_data(), resp.mimetype, ttl, generation)
+            return _conditional(entry, max_age)
+        return wrapper
+    return decorator
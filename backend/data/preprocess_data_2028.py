@@ -1,81 +1,157 @@
-# ─── PREPROCESSING SCRIPT (OPTIMIZED) ─────────────────────────────────────
+# ─── PREPROCESSING SCRIPT (STREAMING) ────────────────────────────────────
+# Reads the raw survey in chunks with explicit dtypes: answers arrive as
+# `category`, so cleaning and the ordinal maps run once per distinct answer
+# and are applied to each row through the category codes. Peak memory is
+# bounded by the chunk size (`--chunksize`, or `--memory-budget` in MB).
+# The cleaned table is written through backend/datasets.py (Parquet when
+# pyarrow is installed, CSV otherwise).
+#
+#   python preprocess_data_2028.py [--chunksize N | --memory-budget MB]
 
+import argparse
 import os
+import sys
+
+import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend import datasets, features
+
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 RAW_PATH = os.path.join(BASE_DIR, '../data/raw/survey.csv')
-CLEAN_PATH = os.path.join(BASE_DIR, '../data/cleaned_dataset_2028.csv')
+CLEAN_PATH = os.path.join(BASE_DIR, '../data/cleaned_dataset_2028')
+MEMORY_BUDGET_MB = 256
 
 os.makedirs(os.path.dirname(CLEAN_PATH), exist_ok=True)
 
-def preprocess():
-    df = pd.read_csv(RAW_PATH)
-    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-    # ─── Normalize party names ────────────────────────────────────────────
-    party_map = {
-        "labour": "lab", "lab": "lab", "labour party": "lab", "lab.": "lab",
-        "conservative": "con", "con": "con", "tory": "con", "tories": "con",
-        "lib dem": "ld", "liberal democrat": "ld", "ld": "ld",
-        "green": "green", "green party": "green",
-        "reform": "reform", "reform uk": "reform",
-        "snp": "snp", "scottish national party": "snp"
-    }
-    df["2028__winner"] = (
-        df["2028__winner"]
-        .astype(str).str.lower().str.strip()
-        .map(party_map).fillna("other")
-    )
-
-    # ─── Standardize object columns ───────────────────────────────────────
-    for col in df.select_dtypes(include='object').columns:
-        df[col] = df[col].astype(str).str.strip().str.lower()
-
-    # ─── Map ordinal categorical responses ────────────────────────────────
-    satisfaction_map = {"very satisfied": 2, "somewhat satisfied": 1, "not satisfied": 0}
-    importance_map = {"very important": 2, "somewhat important": 1, "not important": 0}
-    trust_map = {"high": 2, "medium": 1, "low": 0}
-    binary_map = {"yes": 1, "no": 0}
-    immigration_map = {"more strict": 0, "same": 1, "more open": 2}
-
-    df["satisfaction_national_government"] = df["satisfaction_national_government"].map(satisfaction_map)
-    df["importance_economy"] = df["importance_economy"].map(importance_map)
-    df["importance_social_issues"] = df["importance_social_issues"].map(importance_map)
-    df["trust_mainstream_media"] = df["trust_mainstream_media"].map(trust_map)
-    df["trust_public_institutions"] = df["trust_public_institutions"].map(trust_map)
-    df["climate_priority"] = df["climate_priority"].map(binary_map)
-    df["support_welfare_spending"] = df["support_welfare_spending"].map(binary_map)
-    df["tax_on_wealthy"] = df["tax_on_wealthy"].map(binary_map)
-    df["concern_political_corruption"] = df["concern_political_corruption"].map(binary_map)
-    df["immigration_policy_stance"] = df["immigration_policy_stance"].map(immigration_map)
-
-    # ─── Optional: Encode age and income brackets numerically ─────────────
-    age_map = {
-        "under 18": 0, "18–24": 1, "25–34": 2, "35–44": 3,
-        "45–54": 4, "55–64": 5, "65+": 6
-    }
-    df["age_bracket"] = df["age_bracket"].map(age_map)
-
-    income_map = {
-        "under £20,000": 0,
-        "£20,000–£40,000": 1,
-        "£40,000–£60,000": 2,
-        "£60,000–£80,000": 3,
-        "£80,000+": 4
-    }
-    if "household_income" in df.columns:
-        df["household_income"] = df["household_income"].map(income_map)
-
-    # ─── Drop any remaining nulls ─────────────────────────────────────────
-    df.dropna(inplace=True)
-
-    # ─── Save and report class balance ────────────────────────────────────
+# ─── Ordinal answers (party names and income bands: backend/features.py) ──
+SATISFACTION_MAP = {"very satisfied": 2, "somewhat satisfied": 1, "not satisfied": 0}
+IMPORTANCE_MAP = {"very important": 2, "somewhat important": 1, "not important": 0}
+TRUST_MAP = {"high": 2, "medium": 1, "low": 0}
+BINARY_MAP = {"yes": 1, "no": 0}
+IMMIGRATION_MAP = {"more strict": 0, "same": 1, "more open": 2}
+AGE_MAP = {
+    "under 18": 0, "18–24": 1, "25–34": 2, "35–44": 3,
+    "45–54": 4, "55–64": 5, "65+": 6
+}
+ORDINAL_MAPS = {
+    "satisfaction_national_government": SATISFACTION_MAP,
+    "importance_economy": IMPORTANCE_MAP,
+    "importance_social_issues": IMPORTANCE_MAP,
+    "trust_mainstream_media": TRUST_MAP,
+    "trust_public_institutions": TRUST_MAP,
+    "climate_priority": BINARY_MAP,
+    "support_welfare_spending": BINARY_MAP,
+    "tax_on_wealthy": BINARY_MAP,
+    "concern_political_corruption": BINARY_MAP,
+    "immigration_policy_stance": IMMIGRATION_MAP,
+    "age_bracket": AGE_MAP,
+    "household_income": features.INCOME_MAP,
+}
+
+# Precomputed engineered columns are parsed as float64 (the C parser's fast
+# path) and the integer ones narrowed once missing rows are dropped; every
+# other column is read as `category`.
+NUMERIC_COLS = [
+    "is_fiscally_conservative", "is_climate_priority", "is_media_skeptic",
+    "is_snp_region", "is_reform_minded", "is_social_justice_focused",
+    "education_score", "income_score", "media_trust_score", "gov_satisfaction_score",
+]
+INTEGER_COLS = set(NUMERIC_COLS) - {"education_score", "income_score"} | set(ORDINAL_MAPS)
+
+
+def normalize_name(col: str) -> str:
+    return col.strip().lower().replace(" ", "_")
+
+
+def _clean(value) -> str:
+    # Same as the old `astype(str).str.strip().str.lower()`: missing -> "nan".
+    return str(value).strip().lower()
+
+
+# ─── Per-column transforms (work on categories, not rows) ─────────────────
+def _recode(series: pd.Series, lookup, dtype=object) -> np.ndarray:
+    """Apply ``lookup(category) -> value`` once per category, then by code."""
+    cat = series.astype("category")
+    values = [lookup(c) for c in cat.cat.categories] + [lookup(np.nan)]
+    codes = cat.cat.codes.to_numpy()  # -1 (missing) picks the trailing entry
+    return np.asarray(values, dtype=dtype)[codes]
+
+
+def clean_text(series: pd.Series) -> pd.Categorical:
+    return pd.Categorical(_recode(series, _clean))
+
+
+def map_ordinal(series: pd.Series, mapping: dict) -> np.ndarray:
+    return _recode(series, lambda v: mapping.get(_clean(v), np.nan), dtype="float64")
+
+
+def map_party(series: pd.Series) -> pd.Categorical:
+    return pd.Categorical(_recode(series, features.party_code))
+
+
+def preprocess_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns=normalize_name)
+    out = {}
+    for col in df.columns:
+        if col == "2028__winner":
+            out[col] = map_party(df[col])
+        elif col in ORDINAL_MAPS:
+            out[col] = map_ordinal(df[col], ORDINAL_MAPS[col])
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            out[col] = clean_text(df[col])
+        else:
+            out[col] = df[col]
+    clean = pd.DataFrame(out, index=df.index).dropna()
+    return clean.astype({c: "int64" for c in clean.columns if c in INTEGER_COLS})
+
+
+# ─── Chunk sizing ─────────────────────────────────────────────────────────
+def read_dtypes(path: str) -> dict:
+    header = pd.read_csv(path, nrows=0).columns
+    return {c: "float64" if normalize_name(c) in NUMERIC_COLS else "category" for c in header}
+
+
+def chunksize_for_budget(path: str, budget_mb: float, sample_rows: int = 2000) -> int:
+    """Rows per chunk that keep the parser and transforms within ``budget_mb``.
+
+    Measured from a sample read as plain strings (the parser's transient
+    form), with headroom for the cleaned copy made of each chunk.
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, dtype=str)
+    if sample.empty:
+        return sample_rows
+    bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+    return max(1000, int(budget_mb * 2**20 / (bytes_per_row * 3)))
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────
+def preprocess(raw_path=RAW_PATH, clean_path=CLEAN_PATH, chunksize=None, memory_budget_mb=MEMORY_BUDGET_MB):
+    chunksize = chunksize or chunksize_for_budget(raw_path, memory_budget_mb)
+    reader = pd.read_csv(raw_path, dtype=read_dtypes(raw_path), chunksize=chunksize)
+
+    class_counts = pd.Series(dtype="int64")
+    rows = 0
+    with datasets.FrameWriter(clean_path) as out:
+        for chunk in reader:
+            clean = preprocess_chunk(chunk)
+            out.write(clean)
+            counts = clean["2028__winner"].astype(str).value_counts()
+            class_counts = class_counts.add(counts, fill_value=0)
+            rows += len(clean)
+
+    # ─── Report class balance ─────────────────────────────────────────────
     print("🗳️ Final Class Distribution:")
-    print(df["2028__winner"].value_counts())
+    print(class_counts.astype("int64").sort_values(ascending=False))
+    print(f"✅ Preprocessed data saved to: {out.path} | Rows: {rows} | Chunk size: {chunksize}")
+    return rows
 
-    df.to_csv(CLEAN_PATH, index=False)
-    print(f"✅ Preprocessed data saved to: {CLEAN_PATH} | Rows: {len(df)}")
 
 if __name__ == "__main__":
-    preprocess()
+    parser = argparse.ArgumentParser(description="Clean the raw 2028 survey in bounded memory.")
+    parser.add_argument("--chunksize", type=int, default=None, help="rows per chunk")
+    parser.add_argument("--memory-budget", type=float, default=MEMORY_BUDGET_MB,
+                        help="approximate peak memory in MB, used when --chunksize is not given")
+    args = parser.parse_args()
+    preprocess(chunksize=args.chunksize, memory_budget_mb=args.memory_budget)
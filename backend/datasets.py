@@ -0,0 +1,166 @@
+# backend/datasets.py
+"""On-disk format of the intermediate training datasets.
+
+Tables (the processed survey, encoded labels) are written as Parquet when
+pyarrow is installed, with text columns stored as dictionary-encoded
+categoricals, and as CSV otherwise. The one-hot feature matrix is stored
+sparse: its CSR arrays and column names go into one compressed ``.npz``.
+
+Scripts refer to a dataset by path with or without an extension. Readers
+take the first of ``.parquet``, ``.feather``, ``.csv`` (``.npz`` first for
+matrices) that exists, so older CSV artifacts keep loading. A writer removes the
+dataset's Parquet, Feather and ``.npz`` files in other formats, which only
+these writers create, so a stale copy is never picked. CSVs are left in
+place (some are tracked in git); readers already prefer the newer formats.
+
+pandas, numpy and scipy are imported inside the functions so the API can
+resolve dataset paths without loading the data stack.
+"""
+import importlib.util
+import os
+
+FRAME_FORMATS = (".parquet", ".feather", ".csv")
+MATRIX_FORMATS = (".npz",) + FRAME_FORMATS
+COMPRESSION = "zstd"
+
+
+def arrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def default_format() -> str:
+    return ".parquet" if arrow_available() else ".csv"
+
+
+def stem(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return root if ext in MATRIX_FORMATS else path
+
+
+def resolve(path: str, formats=FRAME_FORMATS) -> str:
+    """The file holding the dataset at ``path``; ``FileNotFoundError`` if none."""
+    if os.path.isfile(path):
+        return path
+    for ext in formats:
+        candidate = stem(path) + ext
+        if os.path.isfile(candidate):
+            return candidate
+    raise FileNotFoundError(f"no dataset at {stem(path)} ({', '.join(formats)})")
+
+
+def _replace(tmp: str, target: str, formats):
+    os.replace(tmp, target)
+    for ext in formats:
+        other = stem(target) + ext
+        if ext != ".csv" and other != target and os.path.isfile(other):
+            os.remove(other)
+
+
+# ─── Tables ──────────────────────────────────────────────────────────────────
+def write_frame(df, path: str, fmt: str = None) -> str:
+    """Write ``df`` to ``path`` in ``fmt`` (default: Parquet if available); returns the file."""
+    fmt = fmt or default_format()
+    target = stem(path) + fmt
+    tmp = f"{target}.tmp"
+    if fmt == ".csv":
+        df.to_csv(tmp, index=False)
+    else:
+        text = df.select_dtypes(include="object").columns
+        df = df.reset_index(drop=True).astype({col: "category" for col in text})
+        if fmt == ".parquet":
+            df.to_parquet(tmp, index=False, compression=COMPRESSION)
+        elif fmt == ".feather":
+            df.to_feather(tmp, compression=COMPRESSION)
+        else:
+            raise ValueError(f"unknown table format {fmt!r}")
+    _replace(tmp, target, FRAME_FORMATS)
+    return target
+
+
+class FrameWriter:
+    """Append chunks to one table; the file only appears once the writer closes.
+
+    Streams to CSV or, with pyarrow, to Parquet (one row group per chunk).
+    """
+
+    def __init__(self, path: str, fmt: str = None):
+        self.fmt = fmt or default_format()
+        if self.fmt not in (".parquet", ".csv"):
+            raise ValueError(f"cannot stream table format {self.fmt!r}")
+        self.path = stem(path) + self.fmt
+        self._tmp = f"{self.path}.tmp"
+        self._out = None
+
+    def write(self, df):
+        if self.fmt == ".csv":
+            header = self._out is None
+            if header:
+                self._out = open(self._tmp, "w", newline="")
+            df.to_csv(self._out, index=False, header=header)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        text = df.select_dtypes(include="object").columns
+        table = pa.Table.from_pandas(df.astype({col: "category" for col in text}), preserve_index=False)
+        if self._out is None:
+            self._out = pq.ParquetWriter(self._tmp, table.schema, compression=COMPRESSION)
+        self._out.write_table(table.cast(self._out.schema))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._out is not None:
+            self._out.close()
+        if exc_type is not None:
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
+            return False
+        if self._out is None:
+            raise ValueError(f"nothing was written to {self.path}")
+        _replace(self._tmp, self.path, FRAME_FORMATS)
+
+
+def read_frame(path: str, columns=None):
+    """Load a table written by ``write_frame`` (or a legacy CSV)."""
+    import pandas as pd
+
+    path = resolve(path)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    if path.endswith(".feather"):
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+# ─── Sparse matrices ─────────────────────────────────────────────────────────
+def write_matrix(X, columns, path: str) -> str:
+    """Store ``X`` (dense or sparse) as float32 CSR in ``<stem>.npz``; returns the file."""
+    import numpy as np
+    from scipy import sparse
+
+    X = sparse.csr_matrix(X, dtype=np.float32)
+    if X.shape[1] != len(columns):
+        raise ValueError(f"{len(columns)} column names for {X.shape[1]} columns")
+    target = stem(path) + ".npz"
+    tmp = f"{target}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, data=X.data, indices=X.indices, indptr=X.indptr,
+                            shape=np.array(X.shape), columns=np.array(columns, dtype=str))
+    _replace(tmp, target, MATRIX_FORMATS)
+    return target
+
+
+def read_matrix(path: str):
+    """``(csr_matrix, column_names)`` from ``write_matrix`` output or a dense table."""
+    import numpy as np
+    from scipy import sparse
+
+    path = resolve(path, MATRIX_FORMATS)
+    if not path.endswith(".npz"):
+        df = read_frame(path)
+        return sparse.csr_matrix(df.to_numpy(dtype=np.float32)), df.columns.tolist()
+    with np.load(path) as f:
+        X = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+        return X, f["columns"].tolist()
@@ -1,31 +1,351 @@
 # backend/db.py
+# psycopg2 is imported on first use, so importing the app (and /health) does
+# not pay for the driver.
+import functools
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import threading
+import time
 from contextlib import contextmanager
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+from backend import metrics
+
+# ─── Pool settings ───────────────────────────────────────────────────────────
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+POOL_HEALTHCHECK_AFTER = float(os.getenv("DB_POOL_HEALTHCHECK_AFTER", "30"))
+
+
+@functools.lru_cache(maxsize=None)
+def timed_cursor_class():
+    """RealDictCursor subclass that records each statement in ``app_db_query_seconds``."""
+    from psycopg2.extras import RealDictCursor
+
+    class TimedCursor(RealDictCursor):
+        def execute(self, query, vars=None):
+            start = time.perf_counter()
+            try:
+                return super().execute(query, vars)
+            finally:
+                metrics.observe_query(query, time.perf_counter() - start)
+
+        def executemany(self, query, vars_list):
+            start = time.perf_counter()
+            try:
+                return super().executemany(query, vars_list)
+            finally:
+                metrics.observe_query(query, time.perf_counter() - start)
+
+    return TimedCursor
+
+
+class PoolTimeout(RuntimeError):
+    """No connection became available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections.
+
+    * keeps between ``min_size`` and ``max_size`` connections open,
+    * runs ``SELECT 1`` on checkout when a connection sat idle for longer than
+      ``healthcheck_after`` seconds,
+    * retires connections older than ``max_lifetime`` seconds,
+    * is bound to the process that created it (see ``get_pool``).
+    """
+
+    def __init__(self, dsn, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, timeout=POOL_TIMEOUT,
+                 max_lifetime=POOL_MAX_LIFETIME, max_idle=POOL_MAX_IDLE,
+                 healthcheck_after=POOL_HEALTHCHECK_AFTER, connect=None):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("pool needs 0 <= min_size <= max_size and max_size >= 1")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.healthcheck_after = healthcheck_after
+        self.pid = os.getpid()
+        self._connect = connect or self._default_connect
+        self._cond = threading.Condition()
+        self._idle = []      # [(conn, created_at, last_used)] — LIFO keeps hot connections hot
+        self._size = 0       # open connections, idle + in use
+        self._in_use = 0
+        self._closed = False
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "healthcheck_failures": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def _default_connect(self):
+        import psycopg2
+
+        return psycopg2.connect(self.dsn, cursor_factory=timed_cursor_class())
+
+    # ─── Checkout / return ───────────────────────────────────────────────────
+    def getconn(self):
+        """Check out a raw connection; returns ``(conn, created_at)``."""
+        deadline = time.monotonic() + self.timeout
+        started = time.monotonic()
+        while True:
+            conn, created, last_used = self._reserve(deadline)
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                created = time.monotonic()
+                with self._cond:
+                    self._stats["connections_created"] += 1
+            elif time.monotonic() - last_used > self.healthcheck_after and not self._healthy(conn):
+                with self._cond:
+                    self._stats["healthcheck_failures"] += 1
+                self._discard(conn)
+                self._release_slot()
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            return conn, created
+
+    def _reserve(self, deadline):
+        """Take an idle connection or a free slot, waiting up to ``deadline``."""
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        from psycopg2 import InterfaceError
+                        raise InterfaceError("connection pool is closed")
+                    now = time.monotonic()
+                    while self._idle:
+                        conn, created, last_used = self._idle.pop()
+                        if getattr(conn, "closed", 0) or now - created > self.max_lifetime:
+                            expired.append(conn)
+                            self._size -= 1
+                            continue
+                        self._in_use += 1
+                        return conn, created, last_used
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._in_use += 1
+                        return None, None, None
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats["checkout_timeouts"] += 1
+                        raise PoolTimeout(f"no database connection available after {self.timeout:.1f}s")
+                    self._cond.wait(remaining)
+        finally:
+            for conn in expired:
+                self._discard(conn)
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._cond.notify()
+
+    def putconn(self, conn, created, discard=False):
+        """Return a connection; broken, expired or foreign-process ones are dropped."""
+        if os.getpid() != self.pid:
+            return  # inherited across fork: the parent still owns the socket
+        if not discard:
+            try:
+                if getattr(conn, "closed", 0):
+                    discard = True
+                elif hasattr(conn, "get_transaction_status"):
+                    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+                    if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        discard = discard or self._closed or now - created > self.max_lifetime
+
+        stale = []
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._size -= 1
+            else:
+                self._idle.append((conn, created, now))
+                # Trim long-idle connections (oldest first) down to min_size.
+                while self._size > self.min_size and self._idle and now - self._idle[0][2] > self.max_idle:
+                    stale.append(self._idle.pop(0)[0])
+                    self._size -= 1
+            self._cond.notify()
+        if discard:
+            stale.append(conn)
+        for c in stale:
+            self._discard(c)
+
+    def connection(self):
+        """Check out a connection wrapped so that ``close()`` returns it here."""
+        conn, created = self.getconn()
+        return PooledConnection(self, conn, created)
+
+    # ─── Maintenance ─────────────────────────────────────────────────────────
+    def _healthy(self, conn) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["connections_closed"] += 1
+
+    def warm(self):
+        """Open connections until ``min_size`` are available."""
+        opened = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= self.min_size:
+                        break
+                opened.append(self.getconn())
+        finally:
+            for conn, created in opened:
+                self.putconn(conn, created)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                **self._stats,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            }
+
+
+class PooledConnection:
+    """Proxy for a pooled psycopg2 connection; ``close()`` hands it back."""
+
+    def __init__(self, pool, conn, created):
+        self._pool = pool
+        self._conn = conn
+        self._created = created
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            from psycopg2 import InterfaceError
+            raise InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn, self._created)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+# ─── Process-wide pool ───────────────────────────────────────────────────────
+_pool = None
+_pool_lock = threading.Lock()
+_inherited = []  # pools copied over fork; never closed here, never garbage collected
+
+
+def get_pool() -> ConnectionPool:
+    """Return this process's pool, creating a fresh one after a fork."""
+    global _pool
+    dsn = os.getenv("DATABASE_URL")
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid() and pool.dsn == dsn:
+        return pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid != os.getpid():
+            _inherited.append(_pool)
+        elif _pool is not None and _pool.dsn != dsn:
+            _pool.close()
+        if _pool is None or _pool.pid != os.getpid() or _pool.dsn != dsn:
+            _pool = ConnectionPool(dsn)
+        return _pool
+
+
+def close_pool():
+    """Close every idle connection and forget the pool (tests, shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+
+def pool_stats() -> dict:
+    return get_pool().stats()
+
 
 def get_db_connection():
-    """Return a raw DB connection."""
-    if not DATABASE_URL:
+    """Return a pooled DB connection; ``close()`` puts it back in the pool."""
+    if not os.getenv("DATABASE_URL"):
         raise RuntimeError("DATABASE_URL not set")
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    return get_pool().connection()
 
 @contextmanager
 def get_cursor(commit: bool = False):
-    """Context manager for queries."""
+    """Context manager for queries on a pooled connection."""
     conn = None
     cur = None
     try:
-        conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+        conn = get_pool().connection()
         cur = conn.cursor()
         yield cur
         if commit:
             conn.commit()
     except Exception as e:
         if conn:
-            conn.rollback()
+            import psycopg2
+
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
         raise e
     finally:
         if cur:
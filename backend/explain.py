@@ -0,0 +1,158 @@
+# backend/explain.py
+"""SHAP explanations for /predict: a cached explainer plus a deferred job pool."""
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+EXPLAIN_MODES = ("none", "sync", "deferred")
+SHAP_WORKERS = int(os.getenv("SHAP_WORKERS", "2"))
+SHAP_JOB_TTL = int(os.getenv("SHAP_JOB_TTL", "3600"))
+SHAP_MAX_JOBS = int(os.getenv("SHAP_MAX_JOBS", "10000"))
+SHAP_JOBS_DIR = os.getenv("SHAP_JOBS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "explain_jobs"))
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_explainer_lock = threading.Lock()
+
+
+def _build_explainer(model):
+    import shap
+    return shap.TreeExplainer(model)
+
+
+def get_explainer(engine):
+    """Return the TreeExplainer for ``engine``, building it on first use."""
+    explainer = getattr(engine, "explainer", None)
+    if explainer is None:
+        with _explainer_lock:
+            explainer = getattr(engine, "explainer", None)
+            if explainer is None:
+                explainer = _build_explainer(engine.model)
+                engine.explainer = explainer
+    return explainer
+
+
+def warmup(engine):
+    """Build ``engine``'s explainer ahead of the first request, if shap is installed."""
+    try:
+        get_explainer(engine)
+    except ImportError:
+        pass
+
+
+def explain_row(engine, row) -> dict:
+    """SHAP value per model feature for a single row built by ``engine.row``."""
+    import pandas as pd
+    frame = pd.DataFrame(row.reshape(1, -1), columns=engine.feature_names)
+    shap_raw = get_explainer(engine).shap_values(frame)
+    return dict(zip(engine.feature_names, shap_raw[0].tolist()))
+
+
+class ExplanationJobs:
+    """Pool that computes explanations after the response is sent.
+
+    Only the executor is per process. Each job's status is a JSON file in
+    ``jobs_dir``, replaced atomically on every change, so any gunicorn worker
+    can answer ``GET /predict/<id>/explanation``. Jobs expire after ``ttl``
+    seconds; an occasional sweep deletes expired files and the oldest ones
+    beyond ``max_jobs``.
+    """
+
+    def __init__(self, workers: int = SHAP_WORKERS, ttl: int = SHAP_JOB_TTL, max_jobs: int = SHAP_MAX_JOBS,
+                 jobs_dir: str = SHAP_JOBS_DIR, sweep_every: float = 60.0):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.jobs_dir = jobs_dir
+        self.sweep_every = sweep_every
+        self._executor = None
+        self._workers = workers
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="shap")
+        return self._executor
+
+    def _path(self, job_id: str) -> str:
+        if not _JOB_ID.match(job_id or ""):
+            raise KeyError(job_id)
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _write(self, job_id: str, job: dict):
+        path = self._path(job_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp, path)  # readers never see a half-written file
+
+    def _read(self, job_id: str):
+        try:
+            with open(self._path(job_id)) as f:
+                return json.load(f)
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def _sweep(self, now):
+        with self._lock:
+            if now - self._last_sweep < self.sweep_every:
+                return
+            self._last_sweep = now
+        entries = []
+        with os.scandir(self.jobs_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        pass
+        entries.sort()
+        excess = max(0, len(entries) - self.max_jobs)
+        for i, (mtime, path) in enumerate(entries):
+            if i < excess or now - mtime > self.ttl:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _run(self, job_id, job, engine, row):
+        try:
+            job.update(status="done", shap_values=explain_row(engine, row))
+        except Exception as e:
+            job.update(status="failed", error=str(e))
+        self._write(job_id, job)
+
+    def submit(self, user_id, engine, row) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._sweep(now)
+        job = {"user_id": user_id, "created": now, "status": "pending"}
+        self._write(job_id, job)
+        self._pool().submit(self._run, job_id, dict(job), engine, row)
+        return job_id
+
+    def get(self, job_id, user_id):
+        """Return the job status dict, or None if unknown/expired/not owned."""
+        job = self._read(job_id)
+        if not job or job["user_id"] != user_id or time.time() - job["created"] > self.ttl:
+            return None
+        if job["status"] == "pending":
+            return {"status": "pending"}
+        if job["status"] == "failed":
+            return {"status": "failed", "error": job["error"]}
+        return {"status": "done", "shap_values": job["shap_values"]}
+
+    def clear(self):
+        if not os.path.isdir(self.jobs_dir):
+            return
+        for name in os.listdir(self.jobs_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self.jobs_dir, name))
+
+
+jobs = ExplanationJobs()
@@ -0,0 +1,176 @@
+# backend/features.py
+"""Survey feature definitions shared by the data scripts, training and serving.
+
+Every lookup table lives here once, frozen at import: the party-name map,
+the class labels and the rules for the engineered columns. A rule is data,
+not code. A flag is set when each of its answers is in an allowed set; a
+score looks its answer up in a table, defaulting to ``SCORE_DEFAULT``. Both
+forms below run the same tables:
+
+- ``engineer_features_frame``: vectorised, for batches and training.
+- ``engineer_features_row``: scalar, for one ``/predict`` request.
+
+Nothing heavy is imported at module level, so the API can use the labels and
+the scalar form without loading pandas.
+"""
+from types import MappingProxyType
+
+# ─── Columns ─────────────────────────────────────────────────────────────────
+RAW_FEATURES = [
+    "age_bracket", "education_level", "household_income", "socioeconomic_class",
+    "housing_status", "constituency_leaning", "vote_national", "vote_local",
+    "satisfaction_national_government", "importance_economy", "importance_social_issues",
+    "support_welfare_spending", "tax_on_wealthy", "trust_mainstream_media",
+    "concern_political_corruption", "climate_priority", "immigration_policy_stance",
+    "trust_public_institutions",
+]
+ENGINEERED_COLS = [
+    "is_fiscally_conservative", "is_climate_priority", "is_media_skeptic",
+    "is_snp_region", "is_reform_minded", "is_social_justice_focused",
+    "education_score", "income_score", "media_trust_score", "gov_satisfaction_score",
+]
+TARGET = "2028__winner"
+MISSING = "unknown"  # stands in for an unanswered question
+
+# ─── Parties and class labels ────────────────────────────────────────────────
+PARTY_MAP = MappingProxyType({
+    "labour": "lab", "lab": "lab", "labour party": "lab", "lab.": "lab",
+    "conservative": "con", "con": "con", "tory": "con", "tories": "con",
+    "lib dem": "ld", "liberal democrat": "ld", "ld": "ld",
+    "green": "green", "green party": "green",
+    "reform": "reform", "reform uk": "reform",
+    "snp": "snp", "scottish national party": "snp",
+})
+OTHER_PARTY = "other"
+# Class index of each party code, as the deployed models were trained.
+LABELS = MappingProxyType({"lab": 0, "reform": 1, "con": 2, "ld": 3, "green": 4, "snp": 5, "other": 6})
+INVERSE_LABELS = MappingProxyType({v: k for k, v in LABELS.items()})
+
+# ─── Ordinal score tables ────────────────────────────────────────────────────
+EDUCATION_MAP = MappingProxyType({
+    "no qualification": 0, "gcse or equivalent": 1, "a-level or equivalent": 2,
+    "bachelors degree": 3, "masters degree": 4, "phd or higher": 5, "other": 2,
+})
+# The survey form writes "£60,000-£80,000" with a hyphen and "£80,000 +"
+# with a space; the en-dash and unspaced spellings score the same.
+INCOME_MAP = MappingProxyType({
+    "under £20,000": 0, "£20,000–£40,000": 1, "£40,000–£60,000": 2,
+    "£60,000-£80,000": 3, "£60,000–£80,000": 3, "£80,000 +": 4, "£80,000+": 4,
+})
+TRUST_MAP = MappingProxyType({"very low": 0, "low": 1, "medium": 2, "high": 3, "very high": 4})
+SATISFACTION_MAP = MappingProxyType({
+    "very dissatisfied": 0, "dissatisfied": 1, "neutral": 2,
+    "satisfied": 3, "very satisfied": 4,
+})
+SCORE_DEFAULT = 2
+
+# ─── Engineered column rules ─────────────────────────────────────────────────
+# flag -> ((question, answers that count), ...): 1 when every question matches.
+FLAG_RULES = MappingProxyType({
+    "is_fiscally_conservative": (("support_welfare_spending", frozenset({"no"})),
+                                 ("tax_on_wealthy", frozenset({"no"}))),
+    "is_climate_priority": (("climate_priority", frozenset({"yes"})),),
+    "is_media_skeptic": (("trust_mainstream_media", frozenset({"low", "very low"})),),
+    "is_snp_region": (("constituency_leaning", frozenset({"scotland"})),),
+    "is_reform_minded": (("concern_political_corruption", frozenset({"very concerned"})),
+                         ("immigration_policy_stance", frozenset({"restrictive", "very restrictive"}))),
+    "is_social_justice_focused": (("importance_social_issues", frozenset({"very important"})),
+                                  ("support_welfare_spending", frozenset({"yes"}))),
+})
+# score -> (question, table)
+SCORE_RULES = MappingProxyType({
+    "education_score": ("education_level", EDUCATION_MAP),
+    "income_score": ("household_income", INCOME_MAP),
+    "media_trust_score": ("trust_mainstream_media", TRUST_MAP),
+    "gov_satisfaction_score": ("satisfaction_national_government", SATISFACTION_MAP),
+})
+
+
+def clean(value):
+    """Lower-case and strip a string answer; anything else is returned as is."""
+    return value.lower().strip() if isinstance(value, str) else value
+
+
+def party_code(value) -> str:
+    """Party code for a free-text party name (``"other"`` if unrecognised)."""
+    return PARTY_MAP.get(clean(str(value)), OTHER_PARTY)
+
+
+# ─── Scalar form ─────────────────────────────────────────────────────────────
+# The rules are compiled once into one closure per column, so a request only
+# pays for the dict lookups themselves.
+def _compile_flag(rule):
+    if len(rule) == 1:
+        (q, a), = rule
+        return lambda get: int(get(q, MISSING) in a)
+    if len(rule) == 2:
+        (q1, a1), (q2, a2) = rule
+        return lambda get: int(get(q1, MISSING) in a1 and get(q2, MISSING) in a2)
+    return lambda get: int(all(get(q, MISSING) in a for q, a in rule))
+
+
+def _compile_score(question, table):
+    lookup = dict(table).get  # a plain dict: faster than going through the proxy
+    return lambda get: lookup(get(question, MISSING), SCORE_DEFAULT)
+
+
+_ROW_RULES = tuple(
+    [(name, _compile_flag(rule)) for name, rule in FLAG_RULES.items()]
+    + [(name, _compile_score(question, table)) for name, (question, table) in SCORE_RULES.items()]
+)
+
+
+def engineer_features_row(d: dict) -> tuple:
+    """Scalar form of ``engineer_features_frame`` for one request dict.
+
+    Returns ``(normalised, engineered)`` where ``engineered`` maps every name in
+    ``ENGINEERED_COLS`` to its value.
+    """
+    d = {(k or "").lower().strip(): (v.lower().strip() if isinstance(v, str) else v) for k, v in d.items()}
+    get = d.get
+    return d, {name: rule(get) for name, rule in _ROW_RULES}
+
+
+# ─── Vectorised form ─────────────────────────────────────────────────────────
+def normalize_frame(records):
+    """Build a DataFrame from survey dicts with lower-cased keys and string values."""
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(records)
+    df.columns = [str(c or "").lower().strip() for c in df.columns]
+    if df.columns.has_duplicates:
+        # One question under differently spelled keys: each row keeps the answer it gave.
+        merged = {name: df.loc[:, df.columns == name].ffill(axis=1).iloc[:, -1]
+                  for name in df.columns[df.columns.duplicated()].unique()}
+        df = df.loc[:, ~df.columns.duplicated(keep="last")].assign(**merged)
+    for col in df.columns.intersection(RAW_FEATURES):
+        if df[col].dtype == object:
+            df[col] = df[col].str.lower().str.strip()
+    return df
+
+
+def engineer_features_frame(df):
+    """``ENGINEERED_COLS`` (float64) for a frame of normalised answers."""
+    import numpy as np
+    import pandas as pd
+
+    def col(name):
+        if name in df.columns:
+            return df[name]
+        return pd.Series(MISSING, index=df.index, dtype=object)
+
+    out = {
+        name: np.logical_and.reduce([col(question).isin(answers).to_numpy() for question, answers in rule])
+        for name, rule in FLAG_RULES.items()
+    }
+    for name, (question, table) in SCORE_RULES.items():
+        out[name] = col(question).map(table).fillna(SCORE_DEFAULT)
+    return pd.DataFrame(out, index=df.index, columns=ENGINEERED_COLS).astype(np.float64)
+
+
+def party_codes(series):
+    """Vectorised ``party_code``: one lookup per distinct name."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(series.astype(str))
+    return pd.Categorical(pd.Index([party_code(u) for u in uniques], dtype=object)[codes])
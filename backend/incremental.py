@@ -0,0 +1,102 @@
+# backend/incremental.py
+"""Continued training (``train_model_2028.py --incremental``).
+
+An incremental fit starts from the active model's booster and adds trees
+fitted only on survey rows ingested since that model was trained. New rows
+are those in ``survey_responses`` (loaded by ``src/utils/etl.py``) with an id
+above the model's *watermark*. The watermark is stored in the registry
+manifest as ``{"survey_responses_id": N}``.
+
+A full fit reads the processed dataset, which is rebuilt from the same raw
+files the ETL loads, so it records the current highest id: every row
+ingested so far counts as seen.
+"""
+import numpy as np
+
+from backend.features import RAW_FEATURES, TARGET, engineer_features_frame
+from backend.inference import stack_sparse
+
+WATERMARK_KEY = "survey_responses_id"
+
+# Engineered columns are recomputed from the answers (see encode), as in training.
+DELTA_SQL = f"""
+    SELECT id, {', '.join(RAW_FEATURES)}, winner_2028 AS "{TARGET}"
+    FROM survey_responses
+    WHERE id > %s
+    ORDER BY id
+"""
+MAX_ID_SQL = "SELECT MAX(id) AS max_id FROM survey_responses"
+
+
+# ─── Watermark ───────────────────────────────────────────────────────────────
+def _row_value(row, key):
+    return row[key] if isinstance(row, dict) else row[0]
+
+
+def current_watermark(cur) -> dict:
+    """Watermark covering every row ingested so far."""
+    cur.execute(MAX_ID_SQL)
+    return {WATERMARK_KEY: int(_row_value(cur.fetchone(), "max_id") or 0)}
+
+
+def fetch_new_rows(cur, watermark: dict):
+    """``(rows, new_watermark)``: survey rows above ``watermark`` as a DataFrame."""
+    import pandas as pd
+
+    last_id = int((watermark or {}).get(WATERMARK_KEY, 0))
+    cur.execute(DELTA_SQL, (last_id,))
+    columns = ["id", *RAW_FEATURES, TARGET]
+    df = pd.DataFrame.from_records(cur.fetchall(), columns=columns)
+    if len(df):
+        last_id = int(df["id"].max())
+    return df.drop(columns="id"), {WATERMARK_KEY: last_id}
+
+
+# ─── Continued boosting ──────────────────────────────────────────────────────
+def encode(pipeline, df):
+    """Feature matrix of ``df`` in the layout the pipeline's model was fit on."""
+    encoder = pipeline.named_steps["encoder"]
+    onehot = encoder.transform(df[RAW_FEATURES])
+    engineered = engineer_features_frame(df).to_numpy(dtype=np.float32)
+    if getattr(encoder, "sparse_output", False):
+        return stack_sparse(onehot, engineered)
+    return np.hstack([onehot, engineered])
+
+
+def continue_boosting(model, X, y, rounds: int, n_jobs: int = None):
+    """A copy of ``model`` with ``rounds`` more trees fitted on ``X``/``y``.
+
+    Trees past an early-stopping best iteration are dropped first. Rows are
+    weighted so each class counts equally, standing in for SMOTE on a delta
+    too small to resample. Classes absent from the delta are padded with
+    zero-weight rows so the class layout matches the base model.
+    """
+    from scipy import sparse
+    from sklearn.utils.class_weight import compute_sample_weight
+    from xgboost import XGBClassifier
+
+    booster = model.get_booster().copy()
+    best = getattr(model, "best_iteration", None)
+    if best is not None:
+        booster = booster[: best + 1]
+    # The delta matrix carries no column names; they are restored on the result.
+    feature_names, booster.feature_names = booster.feature_names, None
+
+    y = np.asarray(y)
+    weight = compute_sample_weight("balanced", y)
+    absent = np.setdiff1d(model.classes_, y)
+    if len(absent):
+        pad = X[np.zeros(len(absent), dtype=np.intp)]
+        X = sparse.vstack([X, pad], format="csr") if sparse.issparse(X) else np.vstack([X, pad])
+        y = np.concatenate([y, absent])
+        weight = np.concatenate([weight, np.zeros(len(absent))])
+
+    params = model.get_params()
+    params.update(n_estimators=rounds, early_stopping_rounds=None)
+    if n_jobs:
+        params["n_jobs"] = n_jobs
+    continued = XGBClassifier(**params)
+    continued.fit(X, y, sample_weight=weight, xgb_model=booster)
+    if feature_names:
+        continued.get_booster().feature_names = feature_names
+    return continued
@@ -0,0 +1,232 @@
+# backend/inference.py
+"""Scoring helpers shared by the prediction routes."""
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+# Column layout, lookup tables and both feature-engineering forms live in
+# backend/features.py; they are re-exported here for the scoring code.
+from backend.features import (  # noqa: F401
+    ENGINEERED_COLS, RAW_FEATURES, engineer_features_frame, engineer_features_row, normalize_frame,
+)
+
+
+# ─── Batch scoring ───────────────────────────────────────────────────────────
+def stack_sparse(onehot, engineered: np.ndarray):
+    """CSR of ``onehot`` (sparse) followed by the dense ``engineered`` block.
+
+    XGBoost reads entries absent from a CSR matrix as missing, which is what an
+    unset one-hot column means; the engineered values are all stored, zeros
+    included, so a score of 0 stays 0.
+    """
+    from scipy import sparse
+
+    n, k = engineered.shape
+    block = sparse.csr_matrix(
+        (np.asarray(engineered, dtype=np.float32).ravel(), np.tile(np.arange(k), n), np.arange(0, n * k + 1, k)),
+        shape=(n, k),
+    )
+    return sparse.hstack([sparse.csr_matrix(onehot, dtype=np.float32), block], format="csr")
+
+
+def summarize_probabilities(probs: np.ndarray, classes, inverse_mapping: dict, top_n: int = 3):
+    """Turn a probability matrix into the per-row payload used by /predict."""
+    labels = [inverse_mapping.get(int(c), "other") for c in classes]
+    order = np.argsort(-probs, axis=1, kind="stable")[:, :top_n]
+
+    results = []
+    for raw, top in zip(probs.astype(np.float64).tolist(), order.tolist()):
+        row = [round(p * 100, 2) for p in raw]
+        top_predictions = [{"party": labels[i], "confidence": row[i]} for i in top]
+        results.append({
+            "winner": top_predictions[0]["party"],
+            "confidence": top_predictions[0]["confidence"],
+            "runner_up": top_predictions[1]["party"] if len(top_predictions) > 1 else None,
+            "top_predictions": top_predictions,
+            "probabilities": dict(zip(labels, row)),
+        })
+    return results
+
+
+# ─── Native model (booster + encoder spec) ───────────────────────────────────
+SPEC_FORMAT = 1
+
+
+def encoder_spec(pipeline, labels: dict = None) -> dict:
+    """JSON-serialisable description of a fitted encoder + XGBoost pipeline.
+
+    Together with the booster this is everything needed to score a survey:
+    the one-hot column of every ``(feature, category)`` pair, the model's
+    column order, its classes and (when known) the party label of each class.
+    ``sparse`` records that the model was fit on CSR input (a sparse encoder),
+    where an unset one-hot column is missing rather than 0.
+    """
+    encoder = pipeline.named_steps["encoder"]
+    model = pipeline.named_steps["model"]
+    if getattr(encoder, "drop_idx_", None) is not None or getattr(encoder, "_infrequent_enabled", False):
+        raise ValueError("InferenceEngine only supports plain one-hot encoders")
+
+    encoded_names = list(encoder.get_feature_names_out())
+    names = getattr(model, "feature_names_in_", None)
+    onehot = []
+    names_iter = iter(encoded_names)
+    for feature, categories in zip(encoder.feature_names_in_, encoder.categories_):
+        for category in categories:
+            onehot.append([str(feature), str(category), next(names_iter)])
+
+    missing = float(getattr(model, "missing", np.nan))
+    best = getattr(model, "best_iteration", None)  # only set when trained with early stopping
+    return {
+        "format": SPEC_FORMAT,
+        "feature_names": list(names) if names is not None else encoded_names + ENGINEERED_COLS,
+        "onehot": onehot,
+        "classes": [int(c) for c in model.classes_],
+        "sparse": bool(getattr(encoder, "sparse_output", False)),
+        "labels": {str(k): v for k, v in labels.items()} if labels else None,
+        "missing": None if math.isnan(missing) else missing,
+        "iteration_range": [0, best + 1] if best is not None else [0, 0],
+    }
+
+
+class NativeModel:
+    """A booster saved in XGBoost's UBJSON format plus its ``encoder_spec``.
+
+    Loads without unpickling sklearn objects; ``InferenceEngine`` accepts it
+    wherever it accepts the joblib pipeline.
+    """
+
+    def __init__(self, booster, spec: dict):
+        if spec.get("format") != SPEC_FORMAT:
+            raise ValueError(f"unsupported encoder spec format {spec.get('format')!r}")
+        self.booster = booster
+        self.spec = spec
+
+    @classmethod
+    def load(cls, booster_path: str, spec_path: str):
+        import xgboost as xgb
+        with open(spec_path) as f:
+            spec = json.load(f)
+        return cls(xgb.Booster(model_file=booster_path), spec)
+
+
+class InferenceEngine:
+    """Precompiled scorer for one loaded pipeline or ``NativeModel``.
+
+    Everything that does not depend on the request (the one-hot column of every
+    ``(feature, category)`` pair, the positions of the engineered columns and a
+    single-threaded booster) is resolved once here, so scoring a survey is a dict
+    walk, one small NumPy row and one ``inplace_predict`` call.
+    """
+
+    def __init__(self, pipeline):
+        if isinstance(pipeline, NativeModel):
+            spec, booster, model = pipeline.spec, pipeline.booster, pipeline.booster
+        else:
+            model = pipeline.named_steps["model"]
+            spec, booster = encoder_spec(pipeline), model.get_booster()
+
+        self.pipeline = pipeline
+        self.model = model  # what SHAP's TreeExplainer is built from
+        self.spec = spec
+        self.classes = np.asarray(spec["classes"])
+        self.labels = {int(k): v for k, v in spec["labels"].items()} if spec.get("labels") else None
+
+        self.feature_names = list(spec["feature_names"])
+        self.n_features = len(self.feature_names)
+        position = {name: i for i, name in enumerate(self.feature_names)}
+
+        self.onehot_index = {}
+        self.onehot_by_feature = {}
+        for feature, category, column in spec["onehot"]:
+            j = position.get(column)
+            if j is not None:
+                self.onehot_index[(feature, category)] = j
+                self.onehot_by_feature.setdefault(feature, {})[category] = j
+        encoded = {feature for feature, _, _ in spec["onehot"]}
+        self.raw_features = [f for f in RAW_FEATURES if f in encoded]
+        self.engineered_index = [(name, position[name]) for name in ENGINEERED_COLS if name in position]
+
+        # Private single-threaded copy: thread fan-out costs more than it saves on one row.
+        self.batch_booster = booster
+        self.booster = booster.copy()
+        self.booster.set_param({"nthread": 1})
+        self.missing = np.nan if spec.get("missing") is None else spec["missing"]
+        self.iteration_range = tuple(spec["iteration_range"])
+        # Models fit on CSR never saw a 0 in a one-hot column, only "missing".
+        self.sparse = bool(spec.get("sparse", False))
+        self.absent = self.missing if self.sparse else 0.0
+
+    def row(self, data: dict):
+        """Return ``(normalised, x)`` where ``x`` is the model-ordered float32 row."""
+        d, engineered = engineer_features_row(data)
+        return d, self.encode_row(d, engineered)
+
+    def encode_row(self, d: dict, engineered: dict) -> np.ndarray:
+        """One-hot + engineered values for a row from ``engineer_features_row``."""
+        x = np.full(self.n_features, self.absent, dtype=np.float32)
+        index = self.onehot_index
+        for feature in self.raw_features:
+            j = index.get((feature, d.get(feature, "unknown")))
+            if j is not None:
+                x[j] = 1.0
+        for name, j in self.engineered_index:
+            x[j] = engineered[name]
+        return x
+
+    def predict_proba_row(self, x: np.ndarray) -> np.ndarray:
+        """Class probabilities for a single row built by ``row``."""
+        probs = self.booster.inplace_predict(
+            x.reshape(1, -1), iteration_range=self.iteration_range, missing=self.missing
+        )
+        probs = np.asarray(probs).reshape(-1)
+        if probs.size == 1:  # binary:logistic returns P(class 1) only
+            probs = np.array([1.0 - probs[0], probs[0]])
+        return probs
+
+    def encode_frame(self, df: pd.DataFrame):
+        """Model-ordered float32 batch from ``normalize_frame``.
+
+        CSR for sparse models, so memory follows the non-zeros; dense otherwise.
+        """
+        rows = np.arange(len(df))
+        hit_rows, hit_cols = [], []
+        for feature in self.raw_features:
+            if feature in df.columns:
+                values = df[feature].fillna("unknown")
+            else:
+                values = pd.Series("unknown", index=df.index, dtype=object)
+            cols = values.map(self.onehot_by_feature[feature]).to_numpy(dtype=np.float64)
+            hit = ~np.isnan(cols)
+            hit_rows.append(rows[hit])
+            hit_cols.append(cols[hit].astype(np.intp))
+        hit_rows, hit_cols = np.concatenate(hit_rows or [rows[:0]]), np.concatenate(hit_cols or [rows[:0]])
+        engineered = engineer_features_frame(df)
+        eng_cols = np.array([j for _, j in self.engineered_index], dtype=np.intp)
+        eng_values = engineered[[name for name, _ in self.engineered_index]].to_numpy(dtype=np.float32)
+
+        if self.sparse:
+            from scipy import sparse
+
+            data = np.concatenate([np.ones(len(hit_rows), dtype=np.float32), eng_values.ravel()])
+            coo = sparse.coo_matrix(
+                (data, (np.concatenate([hit_rows, np.repeat(rows, len(eng_cols))]),
+                        np.concatenate([hit_cols, np.tile(eng_cols, len(rows))]))),
+                shape=(len(df), self.n_features),
+            )
+            return coo.tocsr()  # keeps the stored zeros of the engineered columns
+        X = np.zeros((len(df), self.n_features), dtype=np.float32)
+        X[hit_rows, hit_cols] = 1.0
+        X[:, eng_cols] = eng_values
+        return X
+
+    def predict_proba_batch(self, records) -> np.ndarray:
+        """Class probabilities for many survey dicts (one row each)."""
+        X = self.encode_frame(normalize_frame(records))
+        probs = np.asarray(self.batch_booster.inplace_predict(
+            X, iteration_range=self.iteration_range, missing=self.missing
+        ))
+        if probs.ndim == 1:
+            probs = np.column_stack([1.0 - probs, probs])
+        return probs
@@ -0,0 +1,102 @@
+# backend/metrics.py
+"""Latency histograms for the hot path, exported in Prometheus text format.
+
+``span("predict.model")`` times a block into ``app_stage_seconds``; every
+query run through a pooled connection lands in ``app_db_query_seconds``
+(see ``db.TimedCursor``) and every request in ``app_request_seconds``.
+
+Under gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` (``gunicorn.conf.py`` does)
+so each worker writes its samples to shared files and ``/metrics`` reports
+the sum over all workers instead of whichever worker served the scrape.
+If ``prometheus_client`` is not installed, spans are no-ops.
+"""
+import os
+import re
+import time
+from contextlib import contextmanager
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Histogram, multiprocess
+except ImportError:  # pragma: no cover - exercised only without the dependency
+    prometheus_client = None
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+if prometheus_client is not None:
+    STAGE_SECONDS = Histogram(
+        "app_stage_seconds", "Time spent in named hot-path stages.",
+        ["stage"], buckets=LATENCY_BUCKETS,
+    )
+    DB_QUERY_SECONDS = Histogram(
+        "app_db_query_seconds", "Database query latency by statement.",
+        ["query"], buckets=LATENCY_BUCKETS,
+    )
+    REQUEST_SECONDS = Histogram(
+        "app_request_seconds", "HTTP request latency by endpoint.",
+        ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS,
+    )
+
+
+def enabled() -> bool:
+    return prometheus_client is not None
+
+
+@contextmanager
+def span(stage: str):
+    """Time the enclosed block as ``stage``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if prometheus_client is not None:
+            STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+_VERB = re.compile(r"\s*([A-Za-z]+)")
+_TABLE = re.compile(
+    r"\b(?:(?:FROM|JOIN)\s+([A-Za-z_][\w.]*)\b(?!\s*\()"        # skip set-returning functions
+    r"|(?:INTO|UPDATE|TABLE|TRUNCATE)\s+([A-Za-z_][\w.]*))",
+    re.IGNORECASE,
+)
+
+
+def query_label(sql) -> str:
+    """Low-cardinality label such as ``select users``: leading keyword + first table."""
+    if isinstance(sql, bytes):
+        sql = sql[:1000].decode("utf-8", "replace")
+    sql = str(sql)[:1000]
+    verb = _VERB.match(sql)
+    if not verb:
+        return "other"
+    table = _TABLE.search(sql)
+    label = verb.group(1).lower()
+    return f"{label} {(table.group(1) or table.group(2)).lower()}" if table else label
+
+
+def observe_query(sql, seconds: float):
+    if prometheus_client is not None:
+        DB_QUERY_SECONDS.labels(query_label(sql)).observe(seconds)
+
+
+def observe_request(endpoint: str, method: str, status: int, seconds: float):
+    if prometheus_client is not None:
+        REQUEST_SECONDS.labels(endpoint, method, str(status)).observe(seconds)
+
+
+def render():
+    """Return ``(body, content_type)`` for the current process or all workers."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop a dead worker's live gauges (gunicorn ``child_exit`` hook)."""
+    if prometheus_client is not None and os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
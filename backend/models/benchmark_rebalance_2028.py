@@ -0,0 +1,98 @@
+# ─── benchmark_rebalance_2028.py ─────────────────────────────────────────────
+# Fit time, peak memory and held-out macro-F1 of each --rebalance method of
+# train_model_2028.py. Each method runs in its own process so peak RSS is its
+# own; the test rows are real rows split off before rebalancing.
+#
+#   python benchmark_rebalance_2028.py [--methods smote weights] [--scale N] [--nthread N]
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend import features, tuning
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DATA_PATH = os.path.join(BASE_DIR, '../data/processed_dataset_2028')
+
+
+def peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # KB on Linux
+
+
+def run(method: str, scale: int = 1, nthread: int = None) -> dict:
+    """Load, encode, split, rebalance and fit once; timings in seconds."""
+    import numpy as np
+    from scipy import sparse
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import OneHotEncoder
+    from xgboost import XGBClassifier
+    from backend import datasets
+    from backend.inference import stack_sparse
+
+    df = datasets.read_frame(DATA_PATH)
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32)
+    onehot = encoder.fit_transform(df[features.RAW_FEATURES])
+    X = stack_sparse(onehot, features.engineer_features_frame(df).to_numpy(dtype=np.float32))
+    y = df[features.TARGET].map(features.LABELS).to_numpy()
+    if scale > 1:
+        X, y = sparse.vstack([X] * scale, format="csr"), np.tile(y, scale)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+    loaded_mb = peak_rss_mb()
+
+    started = time.perf_counter()
+    X_fit, y_fit, weight = tuning.rebalance(X_train, y_train, onehot.shape[1], method)
+    rebalanced = time.perf_counter()
+    model = XGBClassifier(**tuning.FIXED_PARAMS, **tuning.DEFAULT_PARAMS, tree_method="hist",
+                          n_jobs=nthread or os.cpu_count(), random_state=42)
+    model.fit(X_fit, y_fit, sample_weight=weight)
+    fitted = time.perf_counter()
+
+    return {
+        "method": method,
+        "train_rows": X_train.shape[0],
+        "fit_rows": X_fit.shape[0],
+        "rebalance_s": round(rebalanced - started, 2),
+        "fit_s": round(fitted - rebalanced, 2),
+        "loaded_rss_mb": loaded_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "macro_f1": round(f1_score(y_test, model.predict(X_test), average="macro"), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the class-rebalancing methods of the 2028 model.")
+    parser.add_argument("--methods", nargs="+", choices=tuning.REBALANCE_METHODS, default=list(tuning.REBALANCE_METHODS))
+    parser.add_argument("--scale", type=int, default=1, help="stack the dataset N times to see how each method grows")
+    parser.add_argument("--nthread", type=int, default=None, help="XGBoost threads (default: all cores)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run(args.child, args.scale, args.nthread)))
+        return
+
+    results = []
+    for method in args.methods:
+        command = [sys.executable, __file__, "--child", method, "--scale", str(args.scale)]
+        if args.nthread:
+            command += ["--nthread", str(args.nthread)]
+        out = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+        print(f"✅ {method}: done")
+
+    print(f"\n📊 Rebalancing benchmark (scale x{args.scale}):")
+    columns = list(results[0])
+    print("  ".join(f"{c:>13}" for c in columns))
+    for result in results:
+        print("  ".join(f"{result[c]!s:>13}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,20 @@
 import os
+import sys
 import pandas as pd
 import joblib
 import json
-from sklearn.preprocessing import OneHotEncoder, LabelEncoder
+from sklearn.preprocessing import OneHotEncoder
 
-# ─── Paths ───────────────────────────────────────────────
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend import datasets, features
+from backend.inference import stack_sparse
+
+# ─── Paths (formats picked by backend.datasets) ──────────
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-DATA_PATH = os.path.join(BASE_DIR, '../data/processed_dataset_2028.csv')
-ENCODED_X_OUT = os.path.join(BASE_DIR, '../data/X_encoded_2028.csv')
-ENCODED_Y_OUT = os.path.join(BASE_DIR, '../data/y_encoded_2028.csv')
+DATA_PATH = os.path.join(BASE_DIR, '../data/processed_dataset_2028')
+ENCODED_X_OUT = os.path.join(BASE_DIR, '../data/X_encoded_2028')  # sparse .npz
+ENCODED_Y_OUT = os.path.join(BASE_DIR, '../data/y_encoded_2028')
 ENCODER_PATH = os.path.join(BASE_DIR, '../models/onehot_encoder_2028.pkl')
-LABEL_ENCODER_PATH = os.path.join(BASE_DIR, '../models/label_encoder_2028.pkl')
 LABEL_MAPPING_JSON = os.path.join(BASE_DIR, '../models/label_mapping_2028.json')
 
 # ─── Ensure Output Directories Exist ─────────────────────
@@ -18,7 +22,7 @@ os.makedirs(os.path.dirname(ENCODED_X_OUT), exist_ok=True)
 os.makedirs(os.path.dirname(ENCODER_PATH), exist_ok=True)
 
 # ─── Load Dataset ────────────────────────────────────────
-df = pd.read_csv(DATA_PATH)
+df = datasets.read_frame(DATA_PATH)
 df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
 
 # ─── Drop Duplicates ─────────────────────────────────────
@@ -35,38 +39,33 @@ X_raw = df.drop(columns=['2028_winner'])
 y_raw = df['2028_winner']
 
 # ─── Separate Categorical and Numeric Columns ────────────
-categorical_cols = X_raw.select_dtypes(include='object').columns.tolist()
-numeric_cols = X_raw.select_dtypes(exclude='object').columns.tolist()
+categorical_cols = X_raw.select_dtypes(include=['object', 'category']).columns.tolist()
+numeric_cols = X_raw.select_dtypes(exclude=['object', 'category']).columns.tolist()
 
 # ─── Encode Categorical Features ─────────────────────────
-onehot_encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+onehot_encoder = OneHotEncoder(sparse_output=True, handle_unknown='ignore')
 X_categorical_encoded = onehot_encoder.fit_transform(X_raw[categorical_cols])
-X_categorical_df = pd.DataFrame(X_categorical_encoded, columns=onehot_encoder.get_feature_names_out(categorical_cols))
 
 # ─── Combine Encoded + Numeric Features ──────────────────
-X_final = pd.concat([X_categorical_df, X_raw[numeric_cols].reset_index(drop=True)], axis=1)
+X_final = stack_sparse(X_categorical_encoded, X_raw[numeric_cols].to_numpy(dtype=float))
+feature_names = list(onehot_encoder.get_feature_names_out(categorical_cols)) + numeric_cols
 
-# ─── Encode Labels ───────────────────────────────────────
-label_encoder = LabelEncoder()
-y_encoded = label_encoder.fit_transform(y_raw)
-y_encoded_df = pd.DataFrame({'2028_winner_encoded': y_encoded})
+# ─── Encode Labels (class indices shared with training and the API) ──
+y_encoded = y_raw.map(features.LABELS).fillna(features.LABELS[features.OTHER_PARTY]).astype(int)
+y_encoded_df = pd.DataFrame({'2028_winner_encoded': y_encoded.to_numpy()})
 
 # ─── Save Outputs ────────────────────────────────────────
-X_final.to_csv(ENCODED_X_OUT, index=False)
-y_encoded_df.to_csv(ENCODED_Y_OUT, index=False)
+x_path = datasets.write_matrix(X_final, feature_names, ENCODED_X_OUT)
+y_path = datasets.write_frame(y_encoded_df, ENCODED_Y_OUT)
 joblib.dump(onehot_encoder, ENCODER_PATH)
-joblib.dump(label_encoder, LABEL_ENCODER_PATH)
 
 # ─── Save Label Mapping to JSON ──────────────────────────
-class_map = {
-    str(k): int(v)
-    for k, v in zip(label_encoder.classes_, label_encoder.transform(label_encoder.classes_))
-}
+class_map = dict(features.LABELS)
 with open(LABEL_MAPPING_JSON, 'w') as f:
     json.dump(class_map, f, indent=2)
 
 # ─── Output Summary ──────────────────────────────────────
-print("✅ Encoded features and labels saved successfully.")
-print(f"🧠 Label classes: {list(label_encoder.classes_)}")
+print(f"✅ Encoded features and labels saved to: {x_path}, {y_path}")
+print(f"🧠 Label classes: {list(class_map)}")
 print(f"📊 X shape: {X_final.shape}, Y shape: {y_encoded_df.shape}")
 print(f"🏷️ Label mapping: {class_map}")
@@ -1,131 +1,279 @@
 # ─── train_model_2028.py ─────────────────────────────────────────────────────
+#   python train_model_2028.py [--profile full|fast] [--nthread N] [--no-plots]
+#                              [--rebalance smote|weights]
+#                              [--tune [--trials N] [--folds K] [--workers W] [--n-jobs T]]
+#   python train_model_2028.py --incremental [--rounds N] [--min-rows N]
+import argparse
 import os
+import sys
+import json
 import joblib
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from xgboost import XGBClassifier, plot_importance
+from xgboost import XGBClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score, f1_score, ConfusionMatrixDisplay
+from sklearn.metrics import classification_report, accuracy_score, f1_score
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder
-from imblearn.over_sampling import SMOTE
 import warnings
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from backend import datasets, features, incremental, tuning
+from backend.inference import encoder_spec, stack_sparse
+
 # ─── Set Seeds ───
 np.random.seed(42)
 warnings.filterwarnings("ignore", category=UserWarning)
 
 # ─── Paths ───
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-DATA_PATH = os.path.join(BASE_DIR, '../data/processed_dataset_2028.csv')
+DATA_PATH = os.path.join(BASE_DIR, '../data/processed_dataset_2028')  # any format backend.datasets reads
 MODEL_PATH = os.path.join(BASE_DIR, '../models/xgb_model_2028.pkl')
 ENCODER_PATH = os.path.join(BASE_DIR, '../models/xgb_encoder_2028.pkl')
 PIPELINE_PATH = os.path.join(BASE_DIR, '../models/xgb_pipeline_2028.pkl')
+BOOSTER_PATH = os.path.join(BASE_DIR, '../models/xgb_booster_2028.ubj')
+ENCODER_SPEC_PATH = os.path.join(BASE_DIR, '../models/xgb_encoder_spec_2028.json')
 REPORT_PATH = os.path.join(BASE_DIR, '../data/xgb_report_2028.csv')
 CONF_MATRIX_PATH = os.path.join(BASE_DIR, '../data/xgb_conf_matrix_2028.png')
 FEATURE_IMPORTANCE_PATH = os.path.join(BASE_DIR, '../data/xgb_feature_importance_2028.png')
+TUNING_LOG_PATH = os.path.join(BASE_DIR, '../models/tuning_2028.jsonl')
+FINAL_MODEL_PATH = os.path.join(BASE_DIR, '../models/final_model.pkl')
+TRAIN_META_PATH = os.path.join(BASE_DIR, '../models/xgb_train_meta_2028.json')  # fit mode + watermark
 
-# ─── Label Mapping ───
-target_col = '2028__winner'
-label_mapping = {
-    "lab": 0, "reform": 1, "con": 2, "ld": 3,
-    "green": 4, "snp": 5, "other": 6
+# ─── Fit Profiles ───
+# full: every tree, 256 histogram bins, plots.
+# fast (what POST /train runs): 64 bins, twice the learning rate, early stopping
+# on real rows held out before rebalancing, class weights instead of SMOTE
+# (see benchmark_rebalance_2028.py), no plots.
+PROFILES = {
+    "full": {"params": {}, "max_bin": 256, "early_stopping_rounds": None, "rebalance": "smote", "plots": True},
+    "fast": {"params": {"learning_rate": 0.1}, "max_bin": 64, "early_stopping_rounds": 20, "rebalance": "weights",
+             "plots": False},
 }
-inverse_mapping = {v: k for k, v in label_mapping.items()}
+TEST_FRACTION = 0.2
+VALIDATION_FRACTION = 0.1
+
+# ─── CLI ───
+parser = argparse.ArgumentParser(description="Train the 2028 XGBoost survey model.")
+parser.add_argument("--profile", choices=sorted(PROFILES), default="full", help="fit settings (see PROFILES)")
+parser.add_argument("--nthread", type=int, default=os.cpu_count() or 1, help="XGBoost threads for the final fit")
+parser.add_argument("--plots", action=argparse.BooleanOptionalAction, default=None,
+                    help="write the confusion-matrix and importance plots (default: per profile)")
+parser.add_argument("--rebalance", choices=tuning.REBALANCE_METHODS, default=None,
+                    help="smote: synthetic minority rows; weights: inverse-frequency sample weights "
+                         "(default: per profile)")
+parser.add_argument("--tune", action="store_true", help="pick hyperparameters by k-fold CV search first")
+parser.add_argument("--trials", type=int, default=20, help="configs to try (the current defaults included)")
+parser.add_argument("--folds", type=int, default=5, help="CV folds per trial")
+parser.add_argument("--workers", type=int, default=None, help="trials run in parallel (default: one per core)")
+parser.add_argument("--n-jobs", type=int, default=None, help="XGBoost threads per trial (default: cores / workers)")
+parser.add_argument("--checkpoint", default=TUNING_LOG_PATH, help="JSONL of finished trials; a rerun resumes from it")
+parser.add_argument("--incremental", action="store_true",
+                    help="add trees to the active model using only survey rows ingested since it")
+parser.add_argument("--rounds", type=int, default=50, help="trees an incremental fit adds")
+parser.add_argument("--min-rows", type=int, default=100, help="skip an incremental fit with fewer new rows")
+args = parser.parse_args()
+profile = PROFILES[args.profile]
+make_plots = profile["plots"] if args.plots is None else args.plots
+rebalance = args.rebalance or profile["rebalance"]
+
+# ─── Label Mapping (backend/features.py, shared with the API) ───
+target_col = features.TARGET
+label_mapping = dict(features.LABELS)
+inverse_mapping = dict(features.INVERSE_LABELS)
 
 # ─── Feature Setup ───
-raw_features = [
-    "age_bracket", "education_level", "household_income", "socioeconomic_class",
-    "housing_status", "constituency_leaning", "vote_national", "vote_local",
-    "satisfaction_national_government", "importance_economy", "importance_social_issues",
-    "support_welfare_spending", "tax_on_wealthy", "trust_mainstream_media",
-    "concern_political_corruption", "climate_priority", "immigration_policy_stance",
-    "trust_public_institutions"
-]
-engineered_features = [
-    "is_fiscally_conservative", "is_climate_priority", "is_media_skeptic",
-    "is_snp_region", "is_reform_minded", "is_social_justice_focused",
-    "education_score", "income_score", "media_trust_score", "gov_satisfaction_score"
-]
+raw_features = features.RAW_FEATURES
+engineered_features = features.ENGINEERED_COLS
 all_features = raw_features + engineered_features
 
+
+# ─── Metadata (read by backend/training.py into the registry manifest) ───
+def read_meta() -> dict:
+    try:
+        with open(TRAIN_META_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_meta(**meta):
+    with open(TRAIN_META_PATH, "w") as f:
+        json.dump(meta, f)
+
+
+def db_watermark():
+    """Highest ``survey_responses`` id, or None when the database is unavailable."""
+    if not os.getenv("DATABASE_URL"):
+        return None
+    from backend.db import get_cursor
+    try:
+        with get_cursor() as cur:
+            return incremental.current_watermark(cur)
+    except Exception as e:
+        print(f"⚠️ No watermark recorded: {e}")
+        return None
+
+
+# ─── Evaluate & Save (shared by the full and incremental fits) ───
+def evaluate(model, X_test, y_test, plots=False):
+    y_pred = model.predict(X_test)
+
+    report = classification_report(y_test, y_pred, labels=list(inverse_mapping),
+                                   target_names=list(inverse_mapping.values()), output_dict=True, zero_division=0)
+    report_df = pd.DataFrame(report).transpose()
+    report_df.to_csv(REPORT_PATH)
+
+    print("\n📊 Classification Report:")
+    print(report_df)
+    print(f"\n✅ Accuracy: {accuracy_score(y_test, y_pred):.2f}")
+    print(f"✅ F1 Macro: {f1_score(y_test, y_pred, average='macro'):.2f}")
+
+    # ─── Plots (optional; matplotlib is only imported here) ───
+    if plots:
+        import matplotlib.pyplot as plt
+        from sklearn.metrics import ConfusionMatrixDisplay
+        from xgboost import plot_importance
+
+        # ─── Confusion Matrix ───
+        ConfusionMatrixDisplay.from_predictions(y_test, y_pred, display_labels=list(inverse_mapping.values()), xticks_rotation=45)
+        plt.tight_layout()
+        plt.savefig(CONF_MATRIX_PATH)
+
+        # ─── Feature Importance ───
+        plt.figure(figsize=(10, 8))
+        plot_importance(model, max_num_features=15)
+        plt.tight_layout()
+        plt.savefig(FEATURE_IMPORTANCE_PATH)
+
+
+def save(encoder, model, **meta):
+    joblib.dump(encoder, ENCODER_PATH)
+    joblib.dump(model, MODEL_PATH)
+
+    # ─── Save Pipeline ───
+    pipeline = Pipeline([
+        ('encoder', encoder),
+        ('model', model)
+    ])
+    joblib.dump(pipeline, FINAL_MODEL_PATH)
+    print("\n✅ Final model saved at:", FINAL_MODEL_PATH)
+
+    # ─── Native export (what the API loads) ───
+    model.get_booster().save_model(BOOSTER_PATH)
+    with open(ENCODER_SPEC_PATH, "w") as f:
+        json.dump(encoder_spec(pipeline, inverse_mapping), f)
+    print("✅ Booster + encoder spec saved at:", BOOSTER_PATH, ENCODER_SPEC_PATH)
+    write_meta(**meta)
+
+
+# ─── Incremental: continue the base model's boosting on rows added since it ───
+# The base is the registry's active version, else the last local fit. New
+# rows are weighted per class instead of SMOTE-resampled; a fifth is held
+# out for the report.
+if args.incremental:
+    from backend import registry
+    from backend.db import get_cursor
+
+    base_version = registry.active_version()
+    if base_version:
+        base_path, base_watermark = registry.model_path(base_version), registry.manifest(base_version).get("watermark")
+    else:
+        base_path, base_watermark = FINAL_MODEL_PATH, read_meta().get("watermark")
+    if not base_watermark or not os.path.exists(base_path):
+        sys.exit("❌ No base model with a watermark; run a full fit first.")
+
+    base = joblib.load(base_path)
+    with get_cursor() as cur:
+        delta, watermark = incremental.fetch_new_rows(cur, base_watermark)
+    print(f"\n🔁 Incremental fit on {base_version or base_path}: {len(delta)} rows after {base_watermark}")
+    if len(delta) < args.min_rows:
+        write_meta(mode="incremental", base_version=base_version, watermark=base_watermark,
+                   new_rows=len(delta), skipped=f"fewer than {args.min_rows} new rows")
+        print(f"⏭️ Fewer than {args.min_rows} new rows; keeping the current model.")
+        sys.exit(0)
+
+    y_delta = delta[target_col].map(label_mapping).to_numpy()
+    print(pd.Series(y_delta).value_counts().rename(index=inverse_mapping))
+    stratify = y_delta if np.bincount(y_delta)[np.unique(y_delta)].min() >= 2 else None
+    X_train, X_test, y_train, y_test = train_test_split(
+        incremental.encode(base, delta), y_delta, test_size=0.2, stratify=stratify, random_state=42
+    )
+    model = incremental.continue_boosting(base.named_steps["model"], X_train, y_train, args.rounds, n_jobs=args.nthread)
+    print(f"\n➕ Added {args.rounds} trees ({model.get_booster().num_boosted_rounds()} rounds in total)")
+
+    evaluate(model, X_test, y_test, make_plots)
+    save(base.named_steps["encoder"], model, mode="incremental", base_version=base_version,
+         watermark=watermark, new_rows=len(delta))
+    sys.exit(0)
+
 # ─── Load & Clean Data ───
-df = pd.read_csv(DATA_PATH)
+watermark = db_watermark()  # rows ingested before this fit count as seen
+df = datasets.read_frame(DATA_PATH)
 df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+# Engineered columns come from the answers through the same rules /predict uses.
+df[engineered_features] = features.engineer_features_frame(df)
 X_raw = df[all_features]
 y_raw = df[target_col].map(label_mapping)
 
 print("\n🔍 Original Class Distribution:")
 print(y_raw.value_counts().rename(index=inverse_mapping))
 
-# ─── Encode Categorical ───
+# ─── Encode Categorical (CSR: memory and fit time follow the non-zeros) ───
 categorical_cols = raw_features
-encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32)
 X_encoded = encoder.fit_transform(df[categorical_cols])
-encoded_feature_names = encoder.get_feature_names_out(categorical_cols)
-encoded_df = pd.DataFrame(X_encoded, columns=encoded_feature_names)
-
-df_engineered = df[engineered_features].reset_index(drop=True)
-X_full = pd.concat([encoded_df, df_engineered], axis=1)
+n_onehot = X_encoded.shape[1]
+feature_names = list(encoder.get_feature_names_out(categorical_cols)) + engineered_features
 
-joblib.dump(encoder, ENCODER_PATH)
+X_full = stack_sparse(X_encoded, df[engineered_features].to_numpy(dtype=np.float32))
 
-# ─── Balance with SMOTE ───
-smote = SMOTE(sampling_strategy="auto", random_state=42)
-X_resampled, y_resampled = smote.fit_resample(X_full, y_raw)
+# ─── Tune (optional): CV on the real rows, SMOTE inside each training fold ───
+params = {**tuning.DEFAULT_PARAMS, **profile["params"]}
+if args.tune:
+    best = tuning.search(X_full, y_raw.to_numpy(), n_onehot, trials=args.trials, folds=args.folds,
+                         workers=args.workers, n_jobs=args.n_jobs, checkpoint=args.checkpoint,
+                         method=rebalance)
+    params = {**best["params"], "n_estimators": best["best_n_estimators"]}
+print(f"\n⚙️ Profile: {args.profile} | Params: {params} | Rebalance: {rebalance} | Threads: {args.nthread}")
 
-print("\n✅ Balanced Class Distribution:")
-print(pd.Series(y_resampled).value_counts().rename(index=inverse_mapping))
-
-# ─── Split ───
+# ─── Split (real rows only: nothing synthetic reaches the test set) ───
 X_train, X_test, y_train, y_test = train_test_split(
-    X_resampled, y_resampled, test_size=0.2, stratify=y_resampled, random_state=42
+    X_full, y_raw.to_numpy(), test_size=TEST_FRACTION, stratify=y_raw, random_state=42
 )
 
+# ─── Hold Out Real Rows for Early Stopping ───
+eval_set = None
+if profile["early_stopping_rounds"]:
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train, y_train, test_size=VALIDATION_FRACTION, stratify=y_train, random_state=42
+    )
+    eval_set = [(X_val, y_val)]
+
+# ─── Rebalance the Training Rows ───
+X_train, y_train, sample_weight = tuning.rebalance(X_train, y_train, n_onehot, rebalance)
+
+print("\n✅ Balanced Class Distribution (total weight per class):")
+weights = np.ones(len(y_train)) if sample_weight is None else sample_weight
+print(pd.Series(weights).groupby(y_train).sum().round(1).rename(index=inverse_mapping))
+
 # ─── Train ───
 model = XGBClassifier(
     objective="multi:softprob", num_class=7,
     eval_metric="mlogloss", use_label_encoder=False,
-    max_depth=6,             # Increased depth
-    learning_rate=0.05,      # Lower for better generalization
-    n_estimators=300,        # More trees
-    subsample=0.9,           # More rows per tree
     colsample_bytree=0.9,    # More features per tree
-    random_state=42
+    tree_method="hist", max_bin=profile["max_bin"],
+    early_stopping_rounds=profile["early_stopping_rounds"],
+    n_jobs=args.nthread,
+    random_state=42,
+    **params,                # depth / learning rate / trees / subsample (tuning.DEFAULT_PARAMS or tuned)
 )
-model.fit(X_train, y_train)
-joblib.dump(model, MODEL_PATH)
-
-# ─── Evaluate ───
-y_pred = model.predict(X_test)
-probs = model.predict_proba(X_test)
-
-report = classification_report(y_test, y_pred, target_names=list(inverse_mapping.values()), output_dict=True)
-report_df = pd.DataFrame(report).transpose()
-report_df.to_csv(REPORT_PATH)
-
-print("\n📊 Classification Report:")
-print(report_df)
-print(f"\n✅ Accuracy: {accuracy_score(y_test, y_pred):.2f}")
-print(f"✅ F1 Macro: {f1_score(y_test, y_pred, average='macro'):.2f}")
-
-# ─── Confusion Matrix ───
-ConfusionMatrixDisplay.from_predictions(y_test, y_pred, display_labels=list(inverse_mapping.values()), xticks_rotation=45)
-plt.tight_layout()
-plt.savefig(CONF_MATRIX_PATH)
-
-# ─── Feature Importance ───
-plt.figure(figsize=(10, 8))
-plot_importance(model, max_num_features=15)
-plt.tight_layout()
-plt.savefig(FEATURE_IMPORTANCE_PATH)
-
-# ─── Save Pipeline ───
-pipeline = Pipeline([
-    ('encoder', encoder),
-    ('model', model)
-])
-FINAL_MODEL_PATH = os.path.join(BASE_DIR, '../models/final_model.pkl')
-joblib.dump(pipeline, FINAL_MODEL_PATH)
-print("\n✅ Final model saved at:", FINAL_MODEL_PATH)
+model.fit(X_train, y_train, sample_weight=sample_weight, eval_set=eval_set, verbose=False)
+if eval_set:
+    print(f"⏹️ Early stopping kept {model.best_iteration + 1} of {params['n_estimators']} trees")
+model.get_booster().feature_names = feature_names
+
+# ─── Evaluate & Save ───
+evaluate(model, X_test, y_test, make_plots)
+save(encoder, model, mode="full", base_version=None, watermark=watermark, new_rows=len(y_raw),
+     rebalance=rebalance)
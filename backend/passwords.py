@@ -0,0 +1,94 @@
+# backend/passwords.py
+"""bcrypt hashing on a small, bounded thread pool.
+
+bcrypt releases the GIL while it works, so running it on a dedicated pool
+caps how many cores password checks can take from a worker's other
+requests, however many logins arrive at once. When the pool and its queue
+are full, ``HasherBusy`` is raised straight away (the app answers 429 with
+``Retry-After``) instead of letting requests pile up behind it.
+
+``BCRYPT_ROUNDS`` sets the work factor for new hashes. A successful login
+whose stored hash used a different cost is rehashed (see ``verify``).
+bcrypt itself is imported on the first hash, not when the app starts.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))  # running + queued
+HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+
+class HasherBusy(RuntimeError):
+    """Every hashing slot is taken; the client should retry later."""
+
+    def __init__(self, retry_after: int = HASH_RETRY_AFTER):
+        super().__init__("password hashing is saturated")
+        self.retry_after = retry_after
+
+
+def hash_cost(pw_hash) -> int:
+    """Work factor of a ``$2b$<cost>$...`` hash, or 0 if it can't be read."""
+    if isinstance(pw_hash, bytes):
+        pw_hash = pw_hash.decode("ascii", "replace")
+    try:
+        return int(pw_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = HASH_WORKERS,
+                 max_pending: int = HASH_MAX_PENDING):
+        self.rounds = rounds
+        self._workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._workers,
+                                                        thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def _hash(self, password: bytes) -> str:
+        import bcrypt
+
+        return bcrypt.hashpw(password, bcrypt.gensalt(rounds=self.rounds)).decode("utf-8")
+
+    def _verify(self, password: bytes, pw_hash: bytes):
+        import bcrypt
+
+        if not bcrypt.checkpw(password, pw_hash):
+            return False, None
+        if hash_cost(pw_hash) != self.rounds:
+            return True, self._hash(password)
+        return True, None
+
+    def hash(self, password: str) -> str:
+        return self._run(self._hash, password.encode("utf-8"))
+
+    def verify(self, password: str, pw_hash):
+        """Return ``(matches, new_hash)``; ``new_hash`` is set when the cost changed."""
+        if isinstance(pw_hash, str):
+            pw_hash = pw_hash.encode("utf-8")
+        return self._run(self._verify, password.encode("utf-8"), pw_hash)
+
+
+hasher = PasswordHasher()
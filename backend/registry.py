@@ -0,0 +1,182 @@
+# backend/registry.py
+"""Versioned model registry.
+
+Layout under ``MODEL_REGISTRY_DIR`` (default ``backend/models/registry``)::
+
+    <version>/final_model.pkl   the fitted encoder + XGBoost pipeline
+    <version>/model.ubj          the booster in XGBoost's native format  } preferred
+    <version>/encoder_spec.json  one-hot layout, classes, labels        } when present
+    <version>/manifest.json     version, data hash, metrics, provenance
+    ACTIVE                      name of the version workers should serve
+
+Versions are written to a temporary directory and renamed into place, and
+``ACTIVE`` is replaced atomically, so a reader never sees a half-written
+model. Each web worker polls ``ACTIVE`` (see ``ModelWatcher``) and swaps its
+in-memory pipeline once the new version is loaded and warmed up.
+"""
+import datetime as dt
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from backend import datasets
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(BASE_DIR, "models", "registry"))
+MODEL_FILE = "final_model.pkl"
+BOOSTER_FILE = "model.ubj"
+SPEC_FILE = "encoder_spec.json"
+MANIFEST_FILE = "manifest.json"
+POLL_SECONDS = float(os.getenv("MODEL_POLL_SECONDS", "5"))
+
+
+class UnknownVersion(KeyError):
+    pass
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def version_dir(version: str) -> str:
+    if not version or os.sep in version or version.startswith("."):
+        raise UnknownVersion(version)
+    return os.path.join(REGISTRY_DIR, version)
+
+
+def model_path(version: str) -> str:
+    return os.path.join(version_dir(version), MODEL_FILE)
+
+
+# ─── Reading ─────────────────────────────────────────────────────────────────
+def active_version():
+    """Version named by ``ACTIVE``, or None when nothing has been promoted."""
+    try:
+        with open(os.path.join(REGISTRY_DIR, "ACTIVE")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def manifest(version: str) -> dict:
+    try:
+        with open(os.path.join(version_dir(version), MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise UnknownVersion(version)
+
+
+def list_versions() -> list:
+    """Manifests of every registered version, oldest first."""
+    if not os.path.isdir(REGISTRY_DIR):
+        return []
+    names = sorted(
+        n for n in os.listdir(REGISTRY_DIR)
+        if not n.startswith(".") and os.path.isfile(os.path.join(REGISTRY_DIR, n, MANIFEST_FILE))
+    )
+    return [manifest(n) for n in names]
+
+
+def load(version: str):
+    """The version's ``NativeModel`` if it has one, else its joblib pipeline."""
+    booster = os.path.join(version_dir(version), BOOSTER_FILE)
+    spec = os.path.join(version_dir(version), SPEC_FILE)
+    if os.path.exists(booster) and os.path.exists(spec):
+        from backend.inference import NativeModel
+        return NativeModel.load(booster, spec)
+    import joblib
+    return joblib.load(model_path(version))
+
+
+# ─── Writing ─────────────────────────────────────────────────────────────────
+def register(pipeline_path: str, data_path: str = None, metrics: dict = None,
+             promote: bool = False, booster_path: str = None, spec_path: str = None,
+             **provenance) -> dict:
+    """Copy a trained pipeline (and its native export) into the registry."""
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    model_hash = file_sha256(pipeline_path)
+    data_path = datasets.resolve(data_path) if data_path else None
+    now = dt.datetime.now(dt.UTC)
+    version = f"{now:%Y%m%d-%H%M%S}-{model_hash[:8]}"
+    info = {
+        "version": version,
+        "created_at": now.isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "model_sha256": model_hash,
+        "data_path": os.path.relpath(data_path, BASE_DIR) if data_path else None,
+        "data_sha256": file_sha256(data_path) if data_path else None,
+        "metrics": metrics or {},
+        **provenance,
+    }
+
+    staging = os.path.join(REGISTRY_DIR, f".staging-{uuid.uuid4().hex}")
+    os.makedirs(staging)
+    try:
+        shutil.copy2(pipeline_path, os.path.join(staging, MODEL_FILE))
+        if booster_path and spec_path:
+            shutil.copy2(booster_path, os.path.join(staging, BOOSTER_FILE))
+            shutil.copy2(spec_path, os.path.join(staging, SPEC_FILE))
+        with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+            json.dump(info, f, indent=2)
+        os.rename(staging, version_dir(version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if promote:
+        promote_version(version)
+    return info
+
+
+def promote_version(version: str):
+    """Point ``ACTIVE`` at ``version``; workers pick it up on their next poll."""
+    manifest(version)  # raises UnknownVersion
+    tmp = os.path.join(REGISTRY_DIR, f".ACTIVE.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(REGISTRY_DIR, "ACTIVE"))
+
+
+# ─── Workers ─────────────────────────────────────────────────────────────────
+class ModelWatcher:
+    """Background thread that calls ``on_change(version)`` when ACTIVE moves.
+
+    ``on_change`` runs in the watcher thread, so loading and warming a new
+    model never happens on a request. A version that failed to load is not
+    retried until ACTIVE changes again.
+    """
+
+    def __init__(self, current, on_change, interval: float = POLL_SECONDS):
+        self.current = current
+        self.on_change = on_change
+        self.interval = interval
+        self.pid = os.getpid()
+        self._failed = None
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def check(self):
+        version = active_version()
+        if version is None or version in (self.current, self._failed):
+            return
+        try:
+            self.on_change(version)
+            self.current = version
+        except Exception as e:
+            self._failed = version
+            print(f"❌ Failed to load model version {version}: {e}")
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
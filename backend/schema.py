@@ -0,0 +1,82 @@
+# backend/schema.py
+"""DDL for tables and indexes owned by the API (applied by ``flask init-db``)."""
+
+SCHEMA_STATEMENTS = [
+    # Running national / regional totals kept in step with `predictions`
+    """
+    CREATE TABLE IF NOT EXISTS party_totals (
+        party TEXT PRIMARY KEY,
+        count BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS party_region_totals (
+        party  TEXT NOT NULL,
+        region TEXT NOT NULL,
+        count  BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (region, party)
+    )
+    """,
+    # Keyset pagination of a user's history, newest first (GET /me/prediction)
+    """
+    CREATE INDEX IF NOT EXISTS predictions_user_timestamp_id_idx
+        ON predictions (user_id, "timestamp" DESC, id DESC)
+    """,
+    # Bulk-loaded poll responses (src/utils/etl.py). A batch row is written in
+    # the same transaction as its COPY, so re-running a load skips it. No
+    # foreign key on batch_id: a per-row RI check would dominate COPY time.
+    """
+    CREATE TABLE IF NOT EXISTS survey_ingest_batches (
+        id          BIGSERIAL PRIMARY KEY,
+        batch_key   TEXT NOT NULL UNIQUE,
+        source_file TEXT NOT NULL,
+        first_row   BIGINT NOT NULL,
+        row_count   INTEGER NOT NULL,
+        loaded_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS survey_responses (
+        id BIGSERIAL PRIMARY KEY,
+        batch_id BIGINT NOT NULL,
+        age_bracket TEXT,
+        education_level TEXT,
+        household_income TEXT,
+        socioeconomic_class TEXT,
+        housing_status TEXT,
+        constituency_leaning TEXT,
+        vote_national TEXT,
+        vote_local TEXT,
+        satisfaction_national_government TEXT,
+        importance_economy TEXT,
+        importance_social_issues TEXT,
+        support_welfare_spending TEXT,
+        tax_on_wealthy TEXT,
+        trust_mainstream_media TEXT,
+        concern_political_corruption TEXT,
+        climate_priority TEXT,
+        immigration_policy_stance TEXT,
+        trust_public_institutions TEXT,
+        winner_2028 TEXT NOT NULL,
+        is_fiscally_conservative REAL,
+        is_climate_priority REAL,
+        is_media_skeptic REAL,
+        is_snp_region REAL,
+        is_reform_minded REAL,
+        is_social_justice_focused REAL,
+        education_score REAL,
+        income_score REAL,
+        media_trust_score REAL,
+        gov_satisfaction_score REAL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS survey_responses_batch_id_idx ON survey_responses (batch_id)
+    """,
+]
+
+
+def ensure_schema(cur):
+    """Create any missing tables/indexes; safe to run repeatedly."""
+    for statement in SCHEMA_STATEMENTS:
+        cur.execute(statement)
@@ -1,10 +1,27 @@
+import os
 import pytest
 import jwt
 import datetime as dt
+import pandas as pd
 from backend.app import app   # ✅ import the Flask app instance directly
+from backend import datasets, db
+from backend.cache import response_cache
+from backend.features import LABELS, RAW_FEATURES, engineer_features_frame
 
 SECRET = app.config["SECRET_KEY"]
 
+@pytest.fixture(autouse=True)
+def _reset_db_pool():
+    """Don't let pooled (often fake) connections leak between tests."""
+    yield
+    db.close_pool()
+
+@pytest.fixture(autouse=True)
+def _reset_response_cache():
+    """Each test sees freshly computed responses."""
+    response_cache.clear()
+    yield
+
 @pytest.fixture
 def client():
     """Provides a Flask test client for all tests."""
@@ -26,3 +43,70 @@ def make_token():
             algorithm="HS256"
         )
     return _make
+
+
+# ─── Model fixtures ──────────────────────────────────────────────────────────
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "processed_dataset_2028")
+
+@pytest.fixture(scope="session")
+def small_pipeline():
+    """A tiny encoder + XGBoost pipeline trained on the processed survey sample."""
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+    from xgboost import XGBClassifier
+
+    df = datasets.read_frame(DATA_PATH).head(600)
+    encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+    encoded = pd.DataFrame(
+        encoder.fit_transform(df[RAW_FEATURES]),
+        columns=encoder.get_feature_names_out(RAW_FEATURES),
+    )
+    X = pd.concat([encoded, engineer_features_frame(df)], axis=1)
+    y = df["2028__winner"].map(LABELS).fillna(6).astype(int)
+    y.iloc[:7] = range(7)  # make sure every class is present
+    model = XGBClassifier(n_estimators=5, max_depth=3, objective="multi:softprob")
+    model.fit(X, y)
+    return Pipeline([("encoder", encoder), ("model", model)])
+
+
+@pytest.fixture(scope="session")
+def sparse_pipeline():
+    """Like ``small_pipeline`` but fit on CSR input, as the training script does."""
+    import numpy as np
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+    from xgboost import XGBClassifier
+    from backend.inference import stack_sparse
+
+    df = datasets.read_frame(DATA_PATH).head(600)
+    encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32)
+    X = stack_sparse(encoder.fit_transform(df[RAW_FEATURES]), engineer_features_frame(df).to_numpy())
+    y = df["2028__winner"].map(LABELS).fillna(6).astype(int).to_numpy()
+    y[:7] = range(7)
+    model = XGBClassifier(n_estimators=5, max_depth=3, objective="multi:softprob")
+    model.fit(X, y)
+    return Pipeline([("encoder", encoder), ("model", model)])
+
+@pytest.fixture
+def survey():
+    """A complete survey submission as the frontend sends it."""
+    return {
+        "age_bracket": "18–24",
+        "education_level": "Bachelors Degree",
+        "household_income": "£20,000–£40,000",
+        "socioeconomic_class": "working class",
+        "housing_status": "renter",
+        "constituency_leaning": "scotland",
+        "vote_national": "yes",
+        "vote_local": "yes",
+        "satisfaction_national_government": "dissatisfied",
+        "importance_economy": "very important",
+        "importance_social_issues": "very important",
+        "support_welfare_spending": "yes",
+        "tax_on_wealthy": "yes",
+        "trust_mainstream_media": "low",
+        "concern_political_corruption": "very concerned",
+        "climate_priority": "yes",
+        "immigration_policy_stance": "more open",
+        "trust_public_institutions": "medium",
+    }
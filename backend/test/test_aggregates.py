@@ -0,0 +1,69 @@
+import json
+
+from backend import aggregates
+
+
+class RecordingCursor:
+    def __init__(self, rows=None):
+        self.calls = []
+        self.rows = rows or []
+    def execute(self, q, p=None): self.calls.append((q, p))
+    def fetchall(self): return self.rows
+
+
+def test_record_predictions_sends_grouped_deltas_in_one_statement():
+    cur = RecordingCursor()
+    aggregates.record_predictions(cur, [("lab", "london"), ("lab", "london"), ("con", None), ("green", "wales")])
+    assert len(cur.calls) == 1
+    sql, (payload,) = cur.calls[0]
+    assert "party_totals" in sql and "party_region_totals" in sql
+    # Sorted by (party, region) so every writer locks totals rows in the same order
+    assert json.loads(payload) == [
+        {"party": "con", "region": "unknown", "n": 1},
+        {"party": "green", "region": "wales", "n": 1},
+        {"party": "lab", "region": "london", "n": 2},
+    ]
+
+
+def test_record_predictions_skips_empty_batches():
+    cur = RecordingCursor()
+    aggregates.record_predictions(cur, [])
+    assert cur.calls == []
+
+
+def test_national_totals_maps_rows():
+    cur = RecordingCursor([{"party": "lab", "count": 3}, {"party": "snp", "count": 1}])
+    assert aggregates.national_totals(cur) == {"lab": 3, "snp": 1}
+
+
+def test_delete_user_predictions_updates_totals_with_the_delete():
+    cur = RecordingCursor()
+    aggregates.delete_user_predictions(cur, 42)
+    (sql, params), = cur.calls
+    assert "DELETE FROM predictions" in sql and "party_totals" in sql
+    assert "ORDER BY party, region" in sql
+    assert params == (42,)
+
+
+def test_empty_region_is_recorded_and_deleted_as_unknown():
+    import sqlite3
+
+    cur = RecordingCursor()
+    aggregates.record_predictions(cur, [("lab", ""), ("lab", None)])
+    recorded = {(d["party"], d["region"]): d["n"] for d in json.loads(cur.calls[0][1][0])}
+
+    # The region expression the DELETE hands back to the totals update.
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE predictions (user_id INTEGER, party TEXT, region TEXT)")
+    db.executemany("INSERT INTO predictions VALUES (7, 'lab', ?)", [("",), (None,)])
+    deleted = db.execute(
+        f"DELETE FROM predictions WHERE user_id = 7 RETURNING party, {aggregates.REGION_SQL}"
+    ).fetchall()
+
+    assert recorded == {("lab", "unknown"): 2}
+    assert deleted == [("lab", "unknown")] * 2
+    assert aggregates.REGION_SQL in aggregates.DELETE_USER_PREDICTIONS_SQL
+
+    rebuilt = RecordingCursor()
+    aggregates.rebuild(rebuilt)
+    assert any(aggregates.REGION_SQL in sql for sql, _ in rebuilt.calls)
@@ -0,0 +1,75 @@
+import datetime as dt
+
+import jwt
+import pytest
+from flask import Flask
+
+from backend import auth
+from backend.auth import ExpiringLRU, token_required
+
+
+@pytest.fixture
+def auth_app():
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test-secret"
+
+    @app.route("/whoami")
+    @token_required
+    def whoami(current_user):
+        return current_user
+
+    auth.token_cache.clear()
+    yield app
+    auth.token_cache.clear()
+
+
+def _token(secret="test-secret", **claims):
+    claims.setdefault("exp", dt.datetime.now(dt.UTC) + dt.timedelta(hours=1))
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def _get(app, path, token):
+    return app.test_client().get(path, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_accepts_user_id_and_legacy_id_claims(auth_app):
+    assert _get(auth_app, "/whoami", _token(user_id=5, username="a")).json == {"id": 5, "username": "a"}
+    assert _get(auth_app, "/whoami", _token(id=6, username="b")).json == {"id": 6, "username": "b"}
+    assert _get(auth_app, "/whoami", _token(username="c")).status_code == 401
+
+
+def test_verified_token_is_decoded_once(auth_app, monkeypatch):
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **k: calls.append(1) or real_decode(*a, **k))
+    token = _token(user_id=1)
+    for _ in range(3):
+        assert _get(auth_app, "/whoami", token).status_code == 200
+    assert len(calls) == 1
+
+
+def test_rejects_bad_signature_and_expired_tokens(auth_app):
+    assert _get(auth_app, "/whoami", _token(secret="other", user_id=1)).json == {"message": "Token invalid"}
+    expired = _token(user_id=1, exp=dt.datetime.now(dt.UTC) - dt.timedelta(seconds=1))
+    assert _get(auth_app, "/whoami", expired).json == {"message": "Token expired"}
+    assert auth_app.test_client().get("/whoami").status_code == 401
+
+
+def test_cached_token_stops_working_at_exp(auth_app):
+    token = _token(user_id=1)
+    assert _get(auth_app, "/whoami", token).status_code == 200
+    [(key, (_, expires_at))] = auth.token_cache._entries.items()
+    assert auth.token_cache.get(key, now=expires_at - 1) is not None
+    assert auth.token_cache.get(key, now=expires_at) is None
+    assert len(auth.token_cache) == 0
+
+
+def test_expiring_lru_is_bounded():
+    cache = ExpiringLRU(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
@@ -0,0 +1,102 @@
+import json
+import datetime as dt
+
+import jwt
+import pytest
+
+from backend import app
+
+SECRET = app.app.config["SECRET_KEY"]
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode(
+        {"user_id": 7, "username": "panel", "exp": dt.datetime.now(dt.UTC) + dt.timedelta(hours=1)},
+        SECRET, algorithm="HS256",
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def fake_db(monkeypatch, small_pipeline):
+    class Inserted(list):
+        pass
+    inserted = Inserted()
+    inserted.executed = []  # other statements, in order
+
+    class DummyCursor:
+        def execute(self, q, p=None): inserted.executed.append((q, p))
+        def close(self): pass
+
+    class DummyConn:
+        def cursor(self, *a, **k): return DummyCursor()
+        def commit(self): pass
+        def rollback(self): pass
+        def close(self): pass
+
+    def fake_execute_values(cur, sql, rows, **kwargs):
+        assert "INSERT INTO predictions" in sql
+        inserted.extend(rows)
+
+    monkeypatch.setattr("backend.app.pipeline", small_pipeline)
+    monkeypatch.setattr("backend.app.get_db_connection", lambda: DummyConn())
+    monkeypatch.setattr("psycopg2.extras.execute_values", fake_execute_values)
+    return inserted
+
+
+def test_batch_requires_auth(client, survey):
+    r = client.post("/predict/batch", json=[survey])
+    assert r.status_code == 401
+
+
+def test_batch_json_array_bulk_inserts(client, auth_headers, fake_db, survey):
+    surveys = [survey, {**survey, "constituency_leaning": "london"}, {"age_bracket": "65+"}]
+    r = client.post("/predict/batch", json=surveys, headers=auth_headers)
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data["count"] == 3
+    assert len(fake_db) == 3
+    assert {row[0] for row in fake_db} == {7}
+    assert [row[2] for row in fake_db] == ["scotland", "london", None]
+    [(sql, params)] = [(q, p) for q, p in fake_db.executed if "UPDATE users" in q]
+    assert "dashboard_party" in sql
+    assert params == (data["predictions"][-1]["winner"], 7)
+    for pred in data["predictions"]:
+        assert pred["winner"] == pred["top_predictions"][0]["party"]
+        assert 95 <= sum(pred["probabilities"].values()) <= 105
+
+
+def test_batch_accepts_ndjson(client, auth_headers, fake_db, survey):
+    body = "\n".join(json.dumps(s) for s in [survey, survey]) + "\n"
+    r = client.post(
+        "/predict/batch", data=body,
+        content_type="application/x-ndjson", headers=auth_headers,
+    )
+    assert r.status_code == 200
+    assert r.get_json()["count"] == 2
+    assert len(fake_db) == 2
+
+
+def test_batch_rejects_bad_payloads(client, auth_headers, fake_db):
+    assert client.post("/predict/batch", json=[], headers=auth_headers).status_code == 400
+    assert client.post("/predict/batch", json=["nope"], headers=auth_headers).status_code == 400
+    r = client.post(
+        "/predict/batch", data='{"age_bracket": "65+"}\n{oops',
+        content_type="application/x-ndjson", headers=auth_headers,
+    )
+    assert r.status_code == 400
+    assert "line 2" in r.get_json()["error"]
+    assert fake_db == []
+
+
+def test_batch_matches_single_prediction(client, auth_headers, fake_db, survey):
+    single = client.post("/predict", json=survey, headers=auth_headers).get_json()
+    batch = client.post("/predict/batch", json={"surveys": [survey]}, headers=auth_headers).get_json()
+    assert batch["predictions"][0]["probabilities"] == single["probabilities"]
+    assert batch["predictions"][0]["winner"] == single["winner"]
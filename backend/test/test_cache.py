@@ -0,0 +1,81 @@
+import datetime as dt
+
+import jwt
+
+from backend import app
+from backend.routes.party_meta import PARTY_META
+
+SECRET = app.app.config["SECRET_KEY"]
+
+
+def _fake_totals(monkeypatch, totals):
+    calls = []
+
+    class DummyCursor:
+        def execute(self, q, p=None): calls.append(q)
+        def fetchall(self): return [{"party": p, "count": n} for p, n in totals.items()]
+        def close(self): pass
+
+    class DummyConn:
+        def cursor(self, *a, **k): return DummyCursor()
+        def commit(self): pass
+        def close(self): pass
+
+    monkeypatch.setattr("backend.app.get_db_connection", lambda: DummyConn())
+    return calls
+
+
+def test_party_meta_etag_and_304(client):
+    r = client.get("/api/partyMeta")
+    assert r.status_code == 200
+    assert r.get_json() == PARTY_META
+    etag = r.headers["ETag"]
+    assert not etag.startswith("W/")
+    assert "public" in r.headers["Cache-Control"]
+
+    r = client.get("/api/partyMeta", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.data == b""
+    assert r.headers["ETag"] == etag
+
+
+def test_national_is_cached_until_invalidated(client, monkeypatch):
+    totals = {"lab": 2, "con": 1}
+    calls = _fake_totals(monkeypatch, totals)
+
+    first = client.get("/national")
+    assert first.status_code == 200
+    assert client.get("/national").data == first.data
+    assert len(calls) == 1
+
+    r = client.get("/national", headers={"If-None-Match": first.headers["ETag"]})
+    assert r.status_code == 304
+    assert len(calls) == 1
+
+    totals["con"] = 5
+    app.response_cache.invalidate("national")
+    r = client.get("/national", headers={"If-None-Match": first.headers["ETag"]})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != first.headers["ETag"]
+    assert r.get_json()["national_winner"] == "con"
+
+
+def test_national_empty_is_not_cached(client, monkeypatch):
+    calls = _fake_totals(monkeypatch, {})
+    assert client.get("/national").status_code == 404
+    r = client.get("/national")
+    assert r.status_code == 404
+    assert r.headers["Cache-Control"] == "no-store"
+    assert len(calls) == 2
+
+
+def test_delete_prediction_invalidates_national(client, monkeypatch):
+    calls = _fake_totals(monkeypatch, {"lab": 1})
+    client.get("/national")
+    token = jwt.encode(
+        {"user_id": 1, "username": "u", "exp": dt.datetime.now(dt.UTC) + dt.timedelta(hours=1)},
+        SECRET, algorithm="HS256",
+    )
+    assert client.delete("/me/prediction", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    client.get("/national")
+    assert sum("party_totals" in q and q.lstrip().startswith("SELECT") for q in calls) == 2
@@ -39,3 +39,66 @@ def test_dashboard_with_token(client, make_token, monkeypatch):
     token = make_token()
     r = client.get("/me/dashboard", headers={"Authorization": f"Bearer {token}"})
     assert r.status_code in (200, 503)
+
+
+def test_dashboard_single_round_trip(client, make_token, monkeypatch):
+    executed = []
+
+    class DummyCursor:
+        def execute(self, q, p=None): executed.append((q, p))
+        def fetchone(self):
+            return {
+                "id": 1, "username": "pytestuser", "email": "p@example.com",
+                "display_name": None, "constituency": "London", "streak": 2,
+                "profile_completion": 1, "chosen_alignment": None,
+                "dashboard_party": "lab", "profile_pic_url": None,
+                "history": [
+                    {"party": "lab", "confidence": 61.2, "runner_up": "green", "timestamp": "2025-05-01T10:00:00Z"},
+                    {"party": "con", "confidence": 40.0, "runner_up": None, "timestamp": "2025-04-01T10:00:00Z"},
+                ],
+                "badges": [{"name": "first_vote", "unlocked": True, "progress_current": 1, "progress_target": 1}],
+                "region_counts": [{"party": "lab", "count": 3}, {"party": "snp", "count": 1}],
+            }
+
+    class DummyContext:
+        def __enter__(self): return DummyCursor()
+        def __exit__(self, *a): pass
+
+    monkeypatch.setattr("backend.app.get_cursor", lambda: DummyContext())
+
+    token = make_token()
+    r = client.get("/me/dashboard", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    assert len(executed) == 1
+
+    data = r.get_json()
+    assert data["lastPrediction"]["partyLabel"] == "Labour"
+    assert data["lastPrediction"]["runnerUpLabel"] == "Green"
+    assert [h["party"] for h in data["history"]] == ["lab", "con"]
+    assert data["badges"][0]["name"] == "first_vote"
+    assert data["regionComparison"]["region"] == "London"
+    assert data["regionComparison"]["counts"][1]["partyLabel"] == "SNP"
+
+
+def test_dashboard_survives_a_failing_badges_table(client, make_token, monkeypatch):
+    executed = []
+
+    class DummyCursor:
+        def execute(self, q, p=None):
+            executed.append(q)
+            if "FROM badges" in q:
+                raise RuntimeError('relation "badges" does not exist')
+        def fetchone(self):
+            return {"id": 1, "username": "pytestuser", "email": "p@example.com", "constituency": None,
+                    "dashboard_party": None, "history": [], "badges": [], "region_counts": []}
+
+    class DummyContext:
+        def __enter__(self): return DummyCursor()
+        def __exit__(self, *a): pass
+
+    monkeypatch.setattr("backend.app.get_cursor", lambda: DummyContext())
+
+    r = client.get("/me/dashboard", headers={"Authorization": f"Bearer {make_token()}"})
+    assert r.status_code == 200
+    assert r.get_json()["badges"] == []
+    assert executed == [app.DASHBOARD_SQL, app.DASHBOARD_NO_BADGES_SQL]
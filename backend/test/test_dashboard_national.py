@@ -75,10 +75,10 @@ def test_national_percentages_sum_to_100(client, monkeypatch):
 
     class DummyCursor:
         def execute(self, q, params=None):
+            assert "party_totals" in q
             self.result = [
-                {"party": "lab", "region": "London", "timestamp": dt.datetime.now(dt.UTC)},
-                {"party": "con", "region": "London", "timestamp": dt.datetime.now(dt.UTC)},
-                {"party": "lab", "region": "London", "timestamp": dt.datetime.now(dt.UTC)},
+                {"party": "lab", "count": 2},
+                {"party": "con", "count": 1},
             ]
         def fetchall(self): return self.result
         def close(self): pass
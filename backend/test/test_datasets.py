@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from backend import datasets
+
+FORMATS = [".csv"] + ([".parquet", ".feather"] if datasets.arrow_available() else [])
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_frame_round_trip_and_stale_copies_removed(tmp_path, fmt):
+    stem = str(tmp_path / "processed")
+    (tmp_path / "processed.csv").write_text("stale\n1\n")
+    (tmp_path / "processed.feather").write_bytes(b"stale")
+    df = pd.DataFrame({"party": ["lab", "con", "lab"], "score": [1.5, 2.0, 0.0]})
+
+    path = datasets.write_frame(df, stem + ".csv", fmt=fmt)
+    assert path == stem + fmt
+    # A CSV may be tracked source data: it is kept, and the new format is read first.
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted({"processed.csv", f"processed{fmt}"})
+
+    out = datasets.read_frame(stem)
+    assert out["party"].astype(str).tolist() == ["lab", "con", "lab"]
+    assert out["score"].tolist() == [1.5, 2.0, 0.0]
+    assert datasets.read_frame(stem, columns=["score"]).columns.tolist() == ["score"]
+
+
+@pytest.mark.parametrize("fmt", [".csv"] + ([".parquet"] if datasets.arrow_available() else []))
+def test_frame_writer_streams_chunks(tmp_path, fmt):
+    stem = str(tmp_path / "clean")
+    with datasets.FrameWriter(stem, fmt=fmt) as out:
+        out.write(pd.DataFrame({"party": pd.Categorical(["lab"]), "n": [1]}))
+        out.write(pd.DataFrame({"party": pd.Categorical(["snp", "con"]), "n": [2, 3]}))
+    df = datasets.read_frame(stem)
+    assert df["party"].astype(str).tolist() == ["lab", "snp", "con"] and df["n"].tolist() == [1, 2, 3]
+
+    with pytest.raises(RuntimeError), datasets.FrameWriter(stem, fmt=fmt) as out:
+        out.write(pd.DataFrame({"party": ["x"], "n": [9]}))
+        raise RuntimeError("boom")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"clean{fmt}"]  # old file kept, tmp removed
+
+
+def test_matrix_is_stored_sparse_and_reads_legacy_dense_csv(tmp_path):
+    X = sparse.random(50, 40, density=0.05, format="csr", random_state=0)
+    columns = [f"f{i}" for i in range(40)]
+    path = datasets.write_matrix(X, columns, str(tmp_path / "X_encoded.csv"))
+    assert path.endswith(".npz")
+    back, names = datasets.read_matrix(str(tmp_path / "X_encoded"))
+    assert names == columns
+    np.testing.assert_allclose(back.toarray(), X.toarray().astype(np.float32))
+
+    legacy = tmp_path / "old.csv"
+    pd.DataFrame(X.toarray()[:, :3], columns=columns[:3]).to_csv(legacy, index=False)
+    dense, names = datasets.read_matrix(str(tmp_path / "old"))
+    assert sparse.issparse(dense) and names == columns[:3]
+
+    with pytest.raises(ValueError):
+        datasets.write_matrix(X, columns[:5], str(tmp_path / "bad"))
+    with pytest.raises(FileNotFoundError):
+        datasets.read_frame(str(tmp_path / "missing"))
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+from psycopg2 import extensions
+
+from backend import db
+
+
+class FakeCursor:
+    def __init__(self, conn): self.conn = conn
+    def execute(self, q, p=None):
+        if self.conn.broken:
+            raise RuntimeError("server closed the connection")
+    def close(self): pass
+    def __enter__(self): return self
+    def __exit__(self, *a): pass
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.in_transaction = False
+        self.rollbacks = 0
+    def cursor(self, *a, **k): return FakeCursor(self)
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_INTRANS if self.in_transaction else extensions.TRANSACTION_STATUS_IDLE
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+    def commit(self): self.in_transaction = False
+    def close(self): self.closed = 1
+
+
+@pytest.fixture
+def made():
+    return []
+
+
+@pytest.fixture
+def make_pool(made):
+    def _make(**kwargs):
+        def connect():
+            conn = FakeConn()
+            made.append(conn)
+            return conn
+        kwargs.setdefault("min_size", 0)
+        kwargs.setdefault("max_size", 2)
+        kwargs.setdefault("timeout", 0.05)
+        return db.ConnectionPool("postgresql://fake", connect=connect, **kwargs)
+    return _make
+
+
+def test_connections_are_reused(make_pool, made):
+    pool = make_pool()
+    for _ in range(5):
+        conn = pool.connection()
+        conn.close()
+    assert len(made) == 1
+    stats = pool.stats()
+    assert stats["checkouts"] == 5
+    assert stats["connections_created"] == 1
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+
+
+def test_checkout_times_out_when_exhausted(make_pool):
+    pool = make_pool(max_size=1)
+    held = pool.connection()
+    with pytest.raises(db.PoolTimeout):
+        pool.connection()
+    assert pool.stats()["checkout_timeouts"] == 1
+
+    # A waiter is woken up as soon as the connection comes back
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.connection()))
+    pool.timeout = 2
+    waiter.start()
+    held.close()
+    waiter.join(2)
+    assert got and got[0].closed == 0
+
+
+def test_open_transaction_is_rolled_back_on_return(make_pool, made):
+    pool = make_pool()
+    conn = pool.connection()
+    made[0].in_transaction = True
+    conn.close()
+    assert made[0].rollbacks == 1
+    assert pool.stats()["idle"] == 1
+
+
+def test_closed_and_expired_connections_are_replaced(make_pool, made):
+    pool = make_pool(max_lifetime=0)
+    pool.connection().close()
+    pool.connection().close()
+    assert len(made) == 2
+    assert made[0].closed == 1
+
+
+def test_failed_healthcheck_discards_connection(make_pool, made):
+    pool = make_pool(healthcheck_after=0)
+    pool.connection().close()
+    made[0].broken = True
+    conn = pool.connection()
+    assert len(made) == 2
+    assert pool.stats()["healthcheck_failures"] == 1
+    conn.close()
+
+
+def test_warm_opens_min_size(make_pool, made):
+    pool = make_pool(min_size=2, max_size=3)
+    pool.warm()
+    assert len(made) == 2
+    assert pool.stats()["idle"] == 2
+
+
+def test_pool_is_recreated_after_fork(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://fake")
+    parent = db.get_pool()
+    assert db.get_pool() is parent
+    monkeypatch.setattr(db.os, "getpid", lambda: parent.pid + 1)
+    child = db.get_pool()
+    assert child is not parent
+    assert child.pid == parent.pid + 1
+
+
+def test_get_db_connection_returns_pooled_proxy(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://fake")
+    monkeypatch.setattr("psycopg2.connect", lambda *a, **k: FakeConn())
+    conn = db.get_db_connection()
+    assert isinstance(conn, db.PooledConnection)
+    conn.close()
+    assert db.pool_stats()["idle"] == 1
@@ -0,0 +1,129 @@
+import pandas as pd
+import pytest
+
+from backend.features import ENGINEERED_COLS, RAW_FEATURES, engineer_features_frame
+from src.utils import etl
+
+
+def _raw(rows):
+    """Raw-CSV-shaped frame: every feature set, then per-row overrides."""
+    base = {col: "Some Answer" for col in RAW_FEATURES}
+    base.update({col: "1" for col in ENGINEERED_COLS})
+    return pd.DataFrame([{**base, **row} for row in rows], dtype=object)
+
+
+def test_normalize_chunk_cleans_like_feature_engineer():
+    raw = _raw([
+        {"2028__winner": " Tory ", "age_bracket": " 18–24 "},
+        {"2028__winner": "Reform UK"},
+        {"2028__winner": "Monster Raving Loony"},
+        {"2028__winner": "LABOUR", "climate_priority": None},   # missing feature: dropped
+        {"2028__winner": "Reform UK"},                          # duplicate: dropped
+    ]).rename(columns={"age_bracket": "Age Bracket "})
+
+    out = etl.normalize_chunk(raw)
+    assert list(out.columns) == etl.COLUMNS
+    assert out["winner_2028"].tolist() == ["con", "reform", "other"]
+    assert out["age_bracket"].tolist() == ["18–24", "some answer", "some answer"]
+    assert out["education_score"].tolist() == [2.0, 2.0, 2.0]   # CSV's "1" ignored: unknown level
+
+
+def test_normalize_chunk_computes_engineered_columns_from_answers():
+    raw = _raw([{"2028__winner": "reform", "concern_political_corruption": "Very Concerned",
+                 "immigration_policy_stance": "restrictive", "education_level": "PhD or higher",
+                 "is_reform_minded": "0", "education_score": "0"}])
+    out = etl.normalize_chunk(raw)
+    expected = engineer_features_frame(out[RAW_FEATURES].astype(object))
+    pd.testing.assert_frame_equal(out[ENGINEERED_COLS], expected)
+    assert out[["is_reform_minded", "education_score"]].values.tolist() == [[1.0, 5.0]]
+
+
+def test_normalize_chunk_requires_survey_columns():
+    with pytest.raises(ValueError, match="2028__winner"):
+        etl.normalize_chunk(_raw([{}]))
+
+
+def test_copy_text_escapes_and_writes_nulls():
+    chunk = etl.normalize_chunk(_raw([{"2028__winner": "snp", "vote_local": "a\tb\\c"}]))
+    chunk["income_score"] = float("nan")
+    [line] = etl.to_copy_text(chunk, 42).splitlines()
+    fields = line.split("\t")
+    assert fields[0] == "42"
+    assert fields[1 + etl.COLUMNS.index("vote_local")] == "a\\tb\\\\c"
+    assert fields[1 + etl.COLUMNS.index("income_score")] == "\\N"
+    assert len(fields) == len(etl.COLUMNS) + 1
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+    def execute(self, q, params=None):
+        if q is etl.LOADED_ROWS_SQL:
+            spans = [first + count for src, first, count in self.conn.batches.values() if src == params[0]]
+            self.row = {"loaded": max(spans, default=0)}
+            return
+        key = params[0]
+        self.row = None if key in self.conn.batches else {"id": len(self.conn.batches) + 1}
+        if self.row:
+            self.conn.pending = (key, params[1:])
+    def fetchone(self): return self.row
+    def copy_expert(self, sql, f):
+        self.conn.copied.append(f.read())
+    def close(self): pass
+
+
+class FakeConn:
+    def __init__(self):
+        self.batches, self.copied, self.pending = {}, [], None
+    def cursor(self): return FakeCursor(self)
+    def commit(self):
+        key, span = self.pending
+        self.batches[key] = span
+    def rollback(self): self.pending = None
+
+
+def _write_poll(path, parties, mode="w"):
+    _raw([{"2028__winner": p, "vote_local": str(i)} for i, p in parties]).to_csv(
+        path, index=False, mode=mode, header=mode == "w"
+    )
+
+
+def test_load_file_is_idempotent_per_batch(tmp_path):
+    path = tmp_path / "poll.csv"
+    _write_poll(path, enumerate(["lab", "con", "ld"] * 3))
+    conn = FakeConn()
+
+    first = etl.load_file(conn, str(path), chunksize=4)
+    assert first == {"batches_loaded": 3, "batches_skipped": 0, "rows_loaded": 9, "rows_read": 9}
+    assert sum(len(text.splitlines()) for text in conn.copied) == 9
+
+    again = etl.load_file(conn, str(path), chunksize=4)
+    assert again == {"batches_loaded": 0, "batches_skipped": 0, "rows_loaded": 0, "rows_read": 0}
+    assert len(conn.copied) == 3
+
+
+def test_load_file_only_copies_rows_appended_since_last_load(tmp_path):
+    path = tmp_path / "poll.csv"
+    _write_poll(path, enumerate(["lab", "con", "ld"] * 3))   # last chunk of 4 is partly full
+    conn = FakeConn()
+    etl.load_file(conn, str(path), chunksize=4)
+
+    _write_poll(path, enumerate(["snp", "green", "reform"], start=9), mode="a")
+    grown = etl.load_file(conn, str(path), chunksize=4)
+    assert grown == {"batches_loaded": 1, "batches_skipped": 0, "rows_loaded": 3, "rows_read": 3}
+
+    copied = [line.split("\t")[1 + etl.COLUMNS.index("vote_local")]
+              for text in conn.copied for line in text.splitlines()]
+    assert sorted(copied, key=int) == [str(i) for i in range(12)]
+    assert sorted(span for span in conn.batches.values()) == [
+        ("poll.csv", 0, 4), ("poll.csv", 4, 4), ("poll.csv", 8, 1), ("poll.csv", 9, 3),
+    ]
+
+
+def test_load_chunk_records_span_of_fully_dropped_chunk():
+    conn = FakeConn()
+    empty = etl.normalize_chunk(_raw([{"2028__winner": "lab", "climate_priority": None}]))
+    assert empty.empty
+    assert etl.load_chunk(conn, empty, "poll.csv", 0, 1)
+    assert conn.copied == []
+    assert etl.loaded_rows(conn, "poll.csv") == 1
@@ -0,0 +1,119 @@
+import os
+import time
+import datetime as dt
+
+import jwt
+import numpy as np
+import pytest
+
+from backend import app, explain
+
+SECRET = app.app.config["SECRET_KEY"]
+
+
+def _headers(user_id):
+    token = jwt.encode(
+        {"user_id": user_id, "username": "pytestuser", "exp": dt.datetime.now(dt.UTC) + dt.timedelta(hours=1)},
+        SECRET, algorithm="HS256",
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.fixture
+def built(monkeypatch, small_pipeline, tmp_path):
+    """Patch the DB and count how many explainers get built."""
+    class DummyCursor:
+        def execute(self, q, p=None): pass
+        def close(self): pass
+
+    class DummyConn:
+        def cursor(self, *a, **k): return DummyCursor()
+        def commit(self): pass
+        def close(self): pass
+
+    class FakeExplainer:
+        def shap_values(self, frame):
+            return np.ones((1, frame.shape[1]))
+
+    calls = []
+
+    def fake_build(model):
+        calls.append(model)
+        return FakeExplainer()
+
+    monkeypatch.setattr("backend.app.pipeline", small_pipeline)
+    monkeypatch.setattr("backend.app.get_db_connection", lambda: DummyConn())
+    monkeypatch.setattr(explain, "_build_explainer", fake_build)
+    monkeypatch.setattr(app, "_engine", None)
+    monkeypatch.setattr(explain.jobs, "jobs_dir", str(tmp_path))
+    return calls
+
+
+def test_default_skips_shap(client, built, survey):
+    r = client.post("/predict", json=survey, headers=_headers(1))
+    assert r.status_code == 200
+    assert r.get_json()["shap_values"] is None
+    assert built == []
+
+
+def test_sync_builds_explainer_once(client, built, survey):
+    for _ in range(3):
+        r = client.post("/predict?explain=sync", json=survey, headers=_headers(1))
+        assert r.status_code == 200
+        shap_values = r.get_json()["shap_values"]
+        assert set(shap_values) == set(app.get_engine().feature_names)
+    assert len(built) == 1
+
+
+def test_deferred_explanation_job(client, built, survey):
+    r = client.post("/predict", json={**survey, "explain": "deferred"}, headers=_headers(1))
+    assert r.status_code == 200
+    job = r.get_json()["explanation"]
+    assert job["status"] == "pending"
+
+    for _ in range(50):
+        r = client.get(job["url"], headers=_headers(1))
+        if r.status_code != 202:
+            break
+        time.sleep(0.02)
+    assert r.status_code == 200
+    assert r.get_json()["status"] == "done"
+
+    # Only the user who asked for the prediction can read the explanation
+    assert client.get(job["url"], headers=_headers(2)).status_code == 404
+
+
+def test_invalid_explain_mode(client, built, survey):
+    r = client.post("/predict?explain=always", json=survey, headers=_headers(1))
+    assert r.status_code == 400
+
+
+def test_explanation_is_readable_from_another_worker(built, small_pipeline, survey):
+    engine = app.get_engine()
+    worker_a = explain.ExplanationJobs(jobs_dir=explain.jobs.jobs_dir)
+    worker_b = explain.ExplanationJobs(jobs_dir=explain.jobs.jobs_dir)
+
+    job_id = worker_a.submit(7, engine, engine.row(survey)[1])
+    worker_a._pool().shutdown(wait=True)
+
+    status = worker_b.get(job_id, 7)
+    assert status["status"] == "done"
+    assert set(status["shap_values"]) == set(engine.feature_names)
+    assert worker_b.get(job_id, 8) is None
+    assert worker_b.get("../../etc/passwd", 7) is None
+
+
+def test_sweep_drops_expired_and_excess_jobs(tmp_path):
+    jobs = explain.ExplanationJobs(ttl=60, max_jobs=2, jobs_dir=str(tmp_path), sweep_every=0)
+    now = time.time()
+    for i, age in enumerate([120, 30, 20, 10]):
+        job_id = f"{i:032x}"
+        jobs._write(job_id, {"user_id": 1, "created": now - age, "status": "pending"})
+        os.utime(jobs._path(job_id), (now - age, now - age))
+    jobs._sweep(now)
+    assert sorted(os.listdir(tmp_path)) == [f"{2:032x}.json", f"{3:032x}.json"]
@@ -3,7 +3,7 @@ import pytest
 import jwt
 import bcrypt
 import datetime as dt
-from backend.app import app, get_db_connection  
+from backend.app import app
 from backend import db
 
 SECRET = app.config["SECRET_KEY"]   
@@ -85,7 +85,7 @@ def test_cursor_context_manager(monkeypatch):
         def cursor(self, *a, **k): return DummyCur()
         def close(self): called["closed"] = True
 
-    monkeypatch.setattr("backend.db.psycopg2.connect", lambda *a, **k: DummyConn())
+    monkeypatch.setattr("psycopg2.connect", lambda *a, **k: DummyConn())
 
     with db.get_cursor() as cur:
         cur.execute("SELECT 1")
@@ -136,7 +136,7 @@ def test_dashboard_user_not_found(client, monkeypatch, make_token):
         def cursor(self, *a, **k): return DummyCur()
         def close(self): pass
 
-    monkeypatch.setattr("backend.db.psycopg2.connect", lambda *a, **k: DummyConn())
+    monkeypatch.setattr("psycopg2.connect", lambda *a, **k: DummyConn())
 
     resp = client.get("/me/dashboard", headers={"Authorization": f"Bearer {token}"})
     assert resp.status_code == 404
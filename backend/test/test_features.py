@@ -0,0 +1,78 @@
+import importlib.util
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import datasets, features
+from backend.test.conftest import DATA_PATH
+from src.utils import etl
+
+HERE = os.path.dirname(__file__)
+
+EDGE_CASES = [
+    {},                                                                   # nothing answered
+    {"Support_Welfare_Spending ": " NO", "tax_on_wealthy": "No "},        # keys and values normalised
+    {"household_income": "£60,000–£80,000"},                              # en-dash spelling
+    {"household_income": "£80,000+", "education_level": "PhD or higher"},
+    {"trust_mainstream_media": None, "climate_priority": "maybe"},        # missing / unknown answers
+    {"concern_political_corruption": "very concerned", "immigration_policy_stance": "very restrictive",
+     "importance_social_issues": "very important", "support_welfare_spending": "yes",
+     "constituency_leaning": "scotland"},
+]
+
+
+def _load_script(name, path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, "..", *path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_scalar_and_vectorised_forms_agree():
+    survey = datasets.read_frame(DATA_PATH)[features.RAW_FEATURES]
+    records = survey.to_dict("records") + EDGE_CASES
+
+    batch = features.engineer_features_frame(features.normalize_frame(records))
+    rows = pd.DataFrame([features.engineer_features_row(r)[1] for r in records], dtype=np.float64)
+    assert list(batch.columns) == list(rows.columns) == features.ENGINEERED_COLS
+    pd.testing.assert_frame_equal(batch.reset_index(drop=True), rows)
+
+    edge = batch.tail(len(EDGE_CASES)).reset_index(drop=True)
+    assert edge.loc[1, "is_fiscally_conservative"] == 1
+    assert edge.loc[2, "income_score"] == edge.loc[3, "income_score"] - 1 == 3
+    assert edge.loc[4, ["media_trust_score", "is_climate_priority"]].tolist() == [features.SCORE_DEFAULT, 0]
+    assert edge.loc[5, ["is_reform_minded", "is_social_justice_focused", "is_snp_region"]].tolist() == [1, 1, 1]
+
+
+def test_lookup_tables_are_frozen():
+    with pytest.raises(TypeError):
+        features.INCOME_MAP["£100,000+"] = 5
+    with pytest.raises(TypeError):
+        features.LABELS["new party"] = 7
+    assert all(isinstance(answers, frozenset) for rule in features.FLAG_RULES.values() for _, answers in rule)
+
+
+def test_every_pipeline_maps_party_names_the_same_way():
+    names = pd.Series([" Tory", "Reform UK", "LABOUR", "lib dem", "SNP", "Green Party", "monster raving loony", None])
+    expected = ["con", "reform", "lab", "ld", "snp", "green", "other", "other"]
+    assert [features.party_code(n) for n in names] == expected
+    assert features.party_codes(names).tolist() == expected
+
+    preprocess = _load_script("preprocess_data_2028", ("data", "preprocess_data_2028.py"))
+    engineer = _load_script("feature_engieer", ("data", "feature_engieer.py"))
+    assert preprocess.map_party(names).tolist() == expected
+    assert etl._clean_text(names.fillna(""), etl.PARTY_MAP).tolist() == expected
+    frame = engineer.feature_engineer(pd.DataFrame({features.TARGET: names, "vote_local": [str(i) for i in range(8)]}))
+    assert frame[features.TARGET].tolist() == expected
+
+
+def test_labels_match_the_api_and_the_encoded_label_file():
+    from backend.app import inverse_mapping
+
+    assert inverse_mapping == dict(features.INVERSE_LABELS)
+    with open(os.path.join(HERE, "..", "models", "label_mapping_2028.json")) as f:
+        assert json.load(f) == dict(features.LABELS)
+    assert sorted(features.LABELS.values()) == list(range(len(features.LABELS)))
@@ -0,0 +1,68 @@
+import copy
+import json
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from backend import datasets, incremental
+from backend.inference import ENGINEERED_COLS, RAW_FEATURES, InferenceEngine, NativeModel, encoder_spec
+from backend.test.conftest import DATA_PATH, LABELS
+
+
+class DummyCursor:
+    def __init__(self, rows):
+        self.rows, self.queries = rows, []
+    def execute(self, q, params=None):
+        self.queries.append((q, params))
+        self.params = params
+    def fetchall(self):
+        return [r for r in self.rows if r["id"] > self.params[0]]
+    def fetchone(self):
+        return {"max_id": max((r["id"] for r in self.rows), default=None)}
+
+
+def _rows(df, first_id):
+    return [{"id": first_id + i, **row} for i, row in enumerate(df.to_dict("records"))]
+
+
+def test_fetch_new_rows_advances_the_watermark():
+    df = datasets.read_frame(DATA_PATH).head(5)[RAW_FEATURES + ["2028__winner"] + ENGINEERED_COLS]
+    cur = DummyCursor(_rows(df, 11))
+
+    assert incremental.current_watermark(cur) == {"survey_responses_id": 15}
+    delta, watermark = incremental.fetch_new_rows(cur, {"survey_responses_id": 12})
+    assert watermark == {"survey_responses_id": 15}
+    assert len(delta) == 3 and "id" not in delta.columns
+    assert delta["2028__winner"].tolist() == df["2028__winner"].iloc[2:].tolist()
+
+    delta, watermark = incremental.fetch_new_rows(cur, watermark)
+    assert delta.empty and watermark == {"survey_responses_id": 15}
+    assert incremental.current_watermark(DummyCursor([])) == {"survey_responses_id": 0}
+
+
+def test_continue_boosting_adds_trees_and_keeps_every_class(tmp_path, sparse_pipeline, survey):
+    base = copy.deepcopy(sparse_pipeline.named_steps["model"])
+    encoder = sparse_pipeline.named_steps["encoder"]
+    feature_names = list(encoder.get_feature_names_out(RAW_FEATURES)) + ENGINEERED_COLS
+    base.get_booster().feature_names = feature_names  # as the training script sets them
+    base_rounds = base.get_booster().num_boosted_rounds()
+    delta = datasets.read_frame(DATA_PATH).iloc[600:700]
+    delta = delta[delta["2028__winner"].isin(["lab", "con", "reform"])]  # several classes absent
+    X = incremental.encode(sparse_pipeline, delta)
+    y = delta["2028__winner"].map(LABELS).to_numpy()
+
+    model = incremental.continue_boosting(base, X, y, rounds=3)
+    assert model.get_booster().num_boosted_rounds() == base_rounds + 3
+    assert base.get_booster().num_boosted_rounds() == base_rounds  # the base is untouched
+    assert list(model.classes_) == list(range(7))
+    assert model.get_booster().feature_names == feature_names
+    assert model.predict_proba(X).shape == (len(y), 7)
+
+    # the continued model serves like any other, pickled or as a native export
+    pipeline = Pipeline([("encoder", encoder), ("model", model)])
+    booster_path, spec_path = tmp_path / "model.ubj", tmp_path / "encoder_spec.json"
+    model.get_booster().save_model(booster_path)
+    spec_path.write_text(json.dumps(encoder_spec(pipeline)))
+    native = InferenceEngine(NativeModel.load(str(booster_path), str(spec_path)))
+    np.testing.assert_allclose(native.predict_proba_batch([survey, {}]),
+                               InferenceEngine(pipeline).predict_proba_batch([survey, {}]), rtol=1e-6)
@@ -0,0 +1,112 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from backend.inference import (
+    ENGINEERED_COLS, RAW_FEATURES, InferenceEngine, NativeModel, encoder_spec,
+    engineer_features_frame, normalize_frame, stack_sparse,
+)
+
+
+# Reference implementation: the pandas/sklearn path the engine must match.
+def build_feature_matrix(pipeline, df: pd.DataFrame) -> pd.DataFrame:
+    """One-hot encode a normalised batch and align it with the model's columns."""
+    encoder = pipeline.named_steps["encoder"]
+    model = pipeline.named_steps["model"]
+
+    raw = df.reindex(columns=RAW_FEATURES).fillna("unknown")
+    encoded = encoder.transform(raw)
+    if hasattr(encoded, "toarray"):  # fit on CSR: an unset one-hot column is missing (see stack_sparse)
+        encoded = encoded.toarray()
+        encoded[encoded == 0] = np.nan
+    engineered = engineer_features_frame(df).to_numpy()
+
+    X = pd.DataFrame(
+        np.hstack([encoded, engineered]),
+        columns=[*encoder.get_feature_names_out(), *ENGINEERED_COLS],
+    )
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        X = X.reindex(columns=names, fill_value=0)
+    return X
+
+
+@pytest.fixture(scope="module")
+def engine(small_pipeline):
+    return InferenceEngine(small_pipeline)
+
+
+def test_engine_row_matches_pandas_path(engine, small_pipeline, survey):
+    expected = build_feature_matrix(small_pipeline, normalize_frame([survey]))
+    _, row = engine.row(survey)
+    assert engine.feature_names == list(expected.columns)
+    np.testing.assert_array_equal(row, expected.to_numpy(dtype=np.float32)[0])
+
+
+def test_engine_probabilities_match_predict_proba(engine, small_pipeline, survey):
+    partial = {"age_bracket": "65+", "climate_priority": "No", "unexpected": "value"}
+    for data in (survey, partial):
+        _, row = engine.row(data)
+        X = build_feature_matrix(small_pipeline, normalize_frame([data]))
+        expected = small_pipeline.named_steps["model"].predict_proba(X)[0]
+        np.testing.assert_allclose(engine.predict_proba_row(row), expected, rtol=1e-6)
+
+
+def test_engine_ignores_unknown_categories(engine):
+    _, row = engine.row({"age_bracket": "not a bracket"})
+    onehot_cols = set(engine.onehot_index.values())
+    assert not any(row[j] for j in onehot_cols)
+
+
+def test_native_model_matches_pipeline(tmp_path, engine, small_pipeline, survey):
+    booster_path, spec_path = tmp_path / "model.ubj", tmp_path / "encoder_spec.json"
+    small_pipeline.named_steps["model"].get_booster().save_model(booster_path)
+    spec_path.write_text(json.dumps(encoder_spec(small_pipeline, {0: "lab", 1: "con"})))
+
+    native = InferenceEngine(NativeModel.load(str(booster_path), str(spec_path)))
+    assert native.feature_names == engine.feature_names
+    assert native.labels == {0: "lab", 1: "con"}
+
+    partial = {"age_bracket": "65+", "climate_priority": "No"}
+    for data in (survey, partial):
+        np.testing.assert_allclose(
+            native.predict_proba_row(native.row(data)[1]),
+            engine.predict_proba_row(engine.row(data)[1]), rtol=1e-6,
+        )
+    np.testing.assert_allclose(
+        native.predict_proba_batch([survey, partial]),
+        engine.predict_proba_batch([survey, partial]), rtol=1e-6,
+    )
+
+
+def test_native_model_rejects_unknown_spec_format(tmp_path, small_pipeline):
+    spec = encoder_spec(small_pipeline)
+    spec["format"] = 99
+    with pytest.raises(ValueError):
+        NativeModel(small_pipeline.named_steps["model"].get_booster(), spec)
+
+
+def test_sparse_model_scores_rows_like_its_training_matrix(tmp_path, sparse_pipeline, survey):
+    encoder, model = sparse_pipeline.named_steps["encoder"], sparse_pipeline.named_steps["model"]
+    records = [survey, {"age_bracket": "65+", "climate_priority": "No"}, {}]
+    df = normalize_frame(records)
+    # the CSR layout training used: unset one-hot columns absent, engineered zeros stored
+    expected = model.predict_proba(stack_sparse(
+        encoder.transform(df.reindex(columns=RAW_FEATURES).fillna("unknown")),
+        engineer_features_frame(df).to_numpy(),
+    ))
+
+    booster_path, spec_path = tmp_path / "model.ubj", tmp_path / "encoder_spec.json"
+    model.get_booster().save_model(booster_path)
+    spec_path.write_text(json.dumps(encoder_spec(sparse_pipeline)))
+    for engine in (InferenceEngine(sparse_pipeline),
+                   InferenceEngine(NativeModel.load(str(booster_path), str(spec_path)))):
+        assert engine.sparse
+        assert sparse.issparse(engine.encode_frame(df))
+        np.testing.assert_allclose(engine.predict_proba_batch(records), expected, rtol=1e-6)
+        rows = [engine.predict_proba_row(engine.row(d)[1]) for d in records]
+        np.testing.assert_allclose(rows, expected, rtol=1e-6)
+    np.testing.assert_allclose(model.predict_proba(build_feature_matrix(sparse_pipeline, df)), expected, rtol=1e-6)
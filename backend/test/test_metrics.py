@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import datetime as dt
+
+import jwt
+import pytest
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+from backend import app, metrics
+
+SECRET = app.app.config["SECRET_KEY"]
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+
+
+def _count(name, labels):
+    return prometheus_client.REGISTRY.get_sample_value(f"{name}_count", labels) or 0
+
+
+@pytest.mark.parametrize("sql, label", [
+    ("SELECT id FROM users WHERE id = %s", "select users"),
+    ("\n  INSERT INTO predictions (user_id) VALUES (%s)", "insert predictions"),
+    ("UPDATE users SET streak = 1", "update users"),
+    ("SELECT * FROM json_to_recordset(%s) AS d(a int) JOIN party_totals t USING (party)", "select party_totals"),
+    (b"INSERT INTO predictions (user_id) VALUES (1),(2)", "insert predictions"),
+    ("SELECT 1", "select"),
+    ("", "other"),
+])
+def test_query_label(sql, label):
+    assert metrics.query_label(sql) == label
+
+
+def test_predict_records_stage_spans(client, monkeypatch, small_pipeline, survey):
+    class DummyCursor:
+        def execute(self, q, p=None): pass
+        def close(self): pass
+
+    class DummyConn:
+        def cursor(self, *a, **k): return DummyCursor()
+        def commit(self): pass
+        def close(self): pass
+
+    monkeypatch.setattr("backend.app.pipeline", small_pipeline)
+    monkeypatch.setattr("backend.app._engine", None)
+    monkeypatch.setattr("backend.app.get_db_connection", lambda: DummyConn())
+    stages = ("predict.features", "predict.encode", "predict.model", "predict.db")
+    before = {s: _count("app_stage_seconds", {"stage": s}) for s in stages}
+    requests_before = _count("app_request_seconds", {"endpoint": "predict", "method": "POST", "status": "200"})
+
+    token = jwt.encode(
+        {"user_id": 1, "username": "u", "exp": dt.datetime.now(dt.UTC) + dt.timedelta(hours=1)},
+        SECRET, algorithm="HS256",
+    )
+    r = client.post("/predict", json=survey, headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+
+    for s in stages:
+        assert _count("app_stage_seconds", {"stage": s}) == before[s] + 1
+    assert _count("app_request_seconds", {"endpoint": "predict", "method": "POST", "status": "200"}) == requests_before + 1
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'app_stage_seconds_bucket{le="0.001",stage="predict.model"}' in body
+
+
+def test_timed_cursor_observes_queries(monkeypatch):
+    from backend import db
+    seen = []
+    monkeypatch.setattr(metrics, "observe_query", lambda sql, seconds: seen.append(sql))
+    from psycopg2.extras import RealDictCursor
+    monkeypatch.setattr(RealDictCursor, "execute", lambda self, q, v=None: None)
+    TimedCursor = db.timed_cursor_class()
+    cur = TimedCursor.__new__(TimedCursor)
+    cur.execute("SELECT 1")
+    assert seen == ["SELECT 1"]
+
+
+def test_multiprocess_metrics_are_summed_across_workers(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = "from backend import metrics\nwith metrics.span('predict.model'): pass"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], cwd=ROOT, env=env, check=True)
+
+    scrape = "from backend import metrics\nprint(metrics.render()[0].decode())"
+    out = subprocess.run([sys.executable, "-c", scrape], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    assert 'app_stage_seconds_count{stage="predict.model"} 2.0' in out
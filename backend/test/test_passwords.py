@@ -0,0 +1,101 @@
+import threading
+from contextlib import contextmanager
+
+import bcrypt
+import pytest
+
+from backend.passwords import HasherBusy, PasswordHasher, hash_cost
+
+
+def test_hash_and_verify_roundtrip():
+    hasher = PasswordHasher(rounds=4)
+    pw_hash = hasher.hash("s3cret!")
+    assert hash_cost(pw_hash) == 4
+    assert hasher.verify("s3cret!", pw_hash) == (True, None)
+    assert hasher.verify("wrong", pw_hash.encode()) == (False, None)
+
+
+def test_verify_rehashes_when_cost_changed():
+    old = bcrypt.hashpw(b"s3cret!", bcrypt.gensalt(rounds=4))
+    matches, new_hash = PasswordHasher(rounds=5).verify("s3cret!", old)
+    assert matches
+    assert hash_cost(new_hash) == 5
+    assert bcrypt.checkpw(b"s3cret!", new_hash.encode())
+
+
+def _saturated_hasher():
+    """A one-slot hasher whose only slot is held until the returned event is set."""
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1)
+    release, started = threading.Event(), threading.Event()
+    def block():
+        started.set()
+        release.wait(5)
+    threading.Thread(target=hasher._run, args=(block,), daemon=True).start()
+    assert started.wait(5)
+    return hasher, release
+
+
+def test_saturated_hasher_raises_busy_then_recovers():
+    hasher, release = _saturated_hasher()
+    with pytest.raises(HasherBusy):
+        hasher.hash("s3cret!")
+    release.set()
+    for _ in range(50):
+        try:
+            assert hasher.hash("s3cret!")
+            break
+        except HasherBusy:
+            threading.Event().wait(0.01)
+    else:
+        pytest.fail("hasher never freed its slot")
+
+
+def test_login_returns_429_when_hashing_is_saturated(client, monkeypatch):
+    class DummyCursor:
+        def execute(self, q, p=None): pass
+        def fetchone(self):
+            return {"id": 1, "username": "pytest", "email": "p@example.com", "pw_hash": "$2b$04$x"}
+        def close(self): pass
+    class DummyConn:
+        def cursor(self, *a, **k): return DummyCursor()
+        def close(self): pass
+
+    hasher, release = _saturated_hasher()
+    monkeypatch.setattr("backend.app.hasher", hasher)
+    monkeypatch.setattr("backend.app.get_db_connection", lambda: DummyConn())
+    try:
+        resp = client.post("/auth/login", json={"username": "pytest", "password": "pytest123"})
+    finally:
+        release.set()
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_login_upgrades_hash_to_configured_cost(client, monkeypatch):
+    old = bcrypt.hashpw(b"pytest123", bcrypt.gensalt(rounds=4)).decode()
+    updates = []
+
+    class DummyCursor:
+        def execute(self, q, p=None):
+            if q.lstrip().startswith("UPDATE"):
+                updates.append(p)
+        def fetchone(self):
+            return {"id": 7, "username": "pytest", "email": "p@example.com", "pw_hash": old,
+                    "profile_pic_url": None, "chosen_alignment": None, "profile_completion": 0}
+        def close(self): pass
+    class DummyConn:
+        def cursor(self, *a, **k): return DummyCursor()
+        def close(self): pass
+
+    @contextmanager
+    def fake_get_cursor(commit=False):
+        yield DummyCursor()
+
+    monkeypatch.setattr("backend.app.hasher", PasswordHasher(rounds=5))
+    monkeypatch.setattr("backend.app.get_db_connection", lambda: DummyConn())
+    monkeypatch.setattr("backend.app.get_cursor", fake_get_cursor)
+
+    resp = client.post("/auth/login", json={"username": "pytest", "password": "pytest123"})
+    assert resp.status_code == 200
+    [(new_hash, user_id)] = updates
+    assert user_id == 7 and hash_cost(new_hash) == 5
@@ -0,0 +1,244 @@
+"""Latency / throughput benchmarks for the hot API endpoints.
+
+Opt-in: the baselines are absolute timings from one machine, so the suite
+only runs with ``PERF_BENCHMARKS=1`` on a host comparable to the one that
+recorded them, e.g. ``PERF_BENCHMARKS=1 pytest --no-cov -s
+backend/test/test_performance.py``.
+
+Each scenario drives an endpoint through the Flask test client against an
+in-memory fake database, then reports p50/p95/p99 latency, throughput and the
+peak Python memory allocated per request (tracemalloc, measured in a separate
+pass so tracing does not distort the timings).
+
+Results are compared with ``perf_baselines.json``; a scenario fails when its
+p95 latency exceeds ``PERF_TOLERANCE`` times the baseline (default 3x,
+generous because CI machines are noisy) plus ``PERF_SLACK_MS`` (default 2ms),
+or its allocations exceed ``PERF_ALLOC_TOLERANCE`` times the baseline
+(default 1.5x). Baselines are only written with ``PERF_UPDATE_BASELINE=1``;
+a scenario without one fails. Run with ``-s`` to see the report.
+
+Under a tracer (coverage, debugger) the numbers are reported but not
+compared.
+"""
+import datetime as dt
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import bcrypt
+import jwt
+import pytest
+
+from backend import app as app_module
+from backend.cache import response_cache
+from backend.passwords import hasher
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "perf_baselines.json")
+ITERATIONS = int(os.getenv("PERF_ITERATIONS", "200"))
+WARMUP = 20
+TOLERANCE = float(os.getenv("PERF_TOLERANCE", "3.0"))
+LATENCY_SLACK_MS = float(os.getenv("PERF_SLACK_MS", "2.0"))  # scheduler noise on sub-ms requests
+ALLOC_TOLERANCE = float(os.getenv("PERF_ALLOC_TOLERANCE", "1.5"))
+ALLOC_SLACK_KIB = 2.0  # absorbs allocator noise on tiny responses
+UPDATE_BASELINE = os.getenv("PERF_UPDATE_BASELINE") == "1"
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("PERF_BENCHMARKS") != "1" and not UPDATE_BASELINE,
+    reason="latency benchmarks are opt-in; set PERF_BENCHMARKS=1",
+)
+
+SECRET = app_module.app.config["SECRET_KEY"]
+PASSWORD = "correct horse battery staple"
+# Cost 4 keeps the login scenario about the request path, not the KDF.
+PW_HASH = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+
+
+# ─── Fake database ───────────────────────────────────────────────────────────
+def _dashboard_row():
+    history = [
+        {"id": i, "party": "lab", "confidence": 61.5, "runner_up": "con",
+         "timestamp": f"2025-05-{i + 1:02d}T10:00:00Z"}
+        for i in range(20)
+    ]
+    return {
+        "id": 1, "username": "bench", "email": "bench@example.com", "display_name": "Bench",
+        "constituency": "london", "streak": 3, "profile_completion": 1,
+        "chosen_alignment": "lab", "dashboard_party": "lab", "profile_pic_url": None,
+        "history": history,
+        "badges": [{"name": "First prediction", "earned_at": "2025-05-01T10:00:00Z"}],
+        "region_counts": [{"party": "lab", "count": 120}, {"party": "con", "count": 80}],
+    }
+
+
+class FakeCursor:
+    def execute(self, q, params=None):
+        if "FROM users" in q and "pw_hash" in q:
+            self.result = [{
+                "id": 1, "username": "bench", "email": "bench@example.com", "pw_hash": PW_HASH,
+                "profile_pic_url": None, "chosen_alignment": None, "profile_completion": 1,
+            }]
+        elif "party_totals" in q and q.lstrip().startswith("SELECT"):
+            self.result = [{"party": p, "count": 1000 + i} for i, p in enumerate(app_module.PARTIES)]
+        elif "WITH u AS" in q:
+            self.result = [_dashboard_row()]
+        else:
+            self.result = []
+    def fetchone(self): return self.result[0] if self.result else None
+    def fetchall(self): return self.result
+    def close(self): pass
+
+
+class FakeConn:
+    def cursor(self, *a, **k): return FakeCursor()
+    def commit(self): pass
+    def rollback(self): pass
+    def close(self): pass
+
+
+@contextmanager
+def fake_get_cursor(commit=False):
+    yield FakeCursor()
+
+
+# ─── Harness ─────────────────────────────────────────────────────────────────
+def _percentile(sorted_values, pct):
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run_benchmark(call, iterations=ITERATIONS, warmup=WARMUP) -> dict:
+    """Time ``call`` (which must return a response) and sample its allocations."""
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        resp = call()
+        latencies.append(time.perf_counter() - t0)
+        assert resp.status_code < 400, resp.get_data(as_text=True)
+    elapsed = time.perf_counter() - started
+
+    samples = max(10, iterations // 10)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "throughput_rps": round(iterations / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "alloc_kib_per_request": round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+def _load_baselines() -> dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def check_against_baseline(name: str, result: dict):
+    print(
+        f"\n[perf] {name:<16} {result['throughput_rps']:>8.1f} req/s  "
+        f"p50 {result['p50_ms']:.2f}ms  p95 {result['p95_ms']:.2f}ms  p99 {result['p99_ms']:.2f}ms  "
+        f"{result['alloc_kib_per_request']:.1f} KiB/req"
+    )
+    if sys.gettrace() is not None:
+        pytest.skip("timings under coverage/debugger tracing are not comparable with the baseline")
+    baselines = _load_baselines()
+    baseline = baselines.get(name)
+    if UPDATE_BASELINE:
+        baselines[name] = {k: result[k] for k in ("p50_ms", "p95_ms", "p99_ms", "alloc_kib_per_request")}
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return
+    if baseline is None:
+        pytest.fail(f"{name}: no baseline in perf_baselines.json; record one with PERF_UPDATE_BASELINE=1")
+
+    assert result["p95_ms"] <= baseline["p95_ms"] * TOLERANCE + LATENCY_SLACK_MS, (
+        f"{name}: p95 {result['p95_ms']}ms regressed past {TOLERANCE}x baseline {baseline['p95_ms']}ms"
+    )
+    alloc_limit = baseline["alloc_kib_per_request"] * ALLOC_TOLERANCE + ALLOC_SLACK_KIB
+    assert result["alloc_kib_per_request"] <= alloc_limit, (
+        f"{name}: {result['alloc_kib_per_request']} KiB/request regressed past "
+        f"{ALLOC_TOLERANCE}x baseline {baseline['alloc_kib_per_request']} KiB"
+    )
+
+
+# ─── Scenarios ───────────────────────────────────────────────────────────────
+@pytest.fixture
+def bench_client(monkeypatch, small_pipeline):
+    monkeypatch.setattr("backend.app.pipeline", small_pipeline)
+    monkeypatch.setattr("backend.app._engine", None)
+    monkeypatch.setattr("backend.app.get_db_connection", lambda: FakeConn())
+    monkeypatch.setattr("backend.app.get_cursor", fake_get_cursor)
+    monkeypatch.setattr(hasher, "rounds", 4)
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode(
+        {"user_id": 1, "username": "bench", "exp": dt.datetime.now(dt.UTC) + dt.timedelta(hours=1)},
+        SECRET, algorithm="HS256",
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_perf_predict(bench_client, auth_headers, survey):
+    result = run_benchmark(lambda: bench_client.post("/predict", json=survey, headers=auth_headers))
+    check_against_baseline("predict", result)
+
+
+def test_perf_predict_with_shap(bench_client, auth_headers, survey):
+    pytest.importorskip("shap")
+    result = run_benchmark(
+        lambda: bench_client.post("/predict?explain=sync", json=survey, headers=auth_headers),
+        iterations=max(20, ITERATIONS // 4),
+    )
+    check_against_baseline("predict_shap", result)
+
+
+def test_perf_national_uncached(bench_client):
+    def call():
+        response_cache.invalidate("national")
+        return bench_client.get("/national")
+    check_against_baseline("national", run_benchmark(call))
+
+
+def test_perf_national_revalidate(bench_client):
+    etag = bench_client.get("/national").headers["ETag"]
+    result = run_benchmark(lambda: bench_client.get("/national", headers={"If-None-Match": etag}))
+    check_against_baseline("national_304", result)
+
+
+def test_perf_dashboard(bench_client, auth_headers):
+    result = run_benchmark(lambda: bench_client.get("/me/dashboard", headers=auth_headers))
+    check_against_baseline("dashboard", result)
+
+
+def test_perf_login(bench_client):
+    body = {"username": "bench", "password": PASSWORD}
+    result = run_benchmark(lambda: bench_client.post("/auth/login", json=body))
+    check_against_baseline("login", result)
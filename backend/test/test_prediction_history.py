@@ -35,3 +35,63 @@ def test_prediction_history_delete(client, make_token, monkeypatch):
     token = make_token()
     r = client.delete("/me/prediction", headers={"Authorization": f"Bearer {token}"})
     assert r.status_code in (200, 503)
+
+def _history_db(monkeypatch, rows):
+    from backend import app
+    executed = []
+    class DummyCursor:
+        itersize = None
+        def execute(self, q, p=None):
+            executed.append((q, p))
+            self.rows = rows[:p["limit"]] if "limit" in (p or {}) else rows
+        def fetchall(self): return self.rows
+        def __iter__(self): return iter(self.rows)
+        def close(self): pass
+    class DummyConn:
+        def cursor(self, *a, **k):
+            executed.append(("cursor", k))
+            return DummyCursor()
+        def rollback(self): pass
+        def close(self): pass
+    monkeypatch.setattr(app, "get_db_connection", lambda: DummyConn())
+    return executed
+
+def _rows(n):
+    return [{"id": 100 - i, "party": "lab", "region": "london", "timestamp": "2025-01-01T00:00:00Z"} for i in range(n)]
+
+def test_prediction_history_keyset_pages(client, make_token, monkeypatch):
+    executed = _history_db(monkeypatch, _rows(4))
+    headers = {"Authorization": f"Bearer {make_token()}"}
+
+    r = client.get("/me/prediction?limit=3", headers=headers)
+    data = r.get_json()
+    assert r.status_code == 200
+    assert [h["id"] for h in data["history"]] == [100, 99, 98]
+    assert data["next_cursor"] == 98
+    assert data["saved_prediction"]["id"] == 100
+    assert executed[-1][1]["limit"] == 4
+
+    r = client.get("/me/prediction?limit=3&after=98", headers=headers)
+    data = r.get_json()
+    q, params = executed[-1]
+    assert "(predictions.timestamp, id) <" in q and params["after"] == 98
+    assert "saved_prediction" not in data
+
+def test_prediction_history_rejects_bad_params(client, make_token, monkeypatch):
+    _history_db(monkeypatch, [])
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    assert client.get("/me/prediction?limit=0", headers=headers).status_code == 400
+    assert client.get("/me/prediction?limit=501", headers=headers).status_code == 400
+    assert client.get("/me/prediction?after=abc", headers=headers).status_code == 400
+
+def test_prediction_history_ndjson_export(client, make_token, monkeypatch):
+    import json
+    executed = _history_db(monkeypatch, _rows(3))
+    r = client.get("/me/prediction?format=ndjson", headers={"Authorization": f"Bearer {make_token()}"})
+    assert r.status_code == 200
+    assert r.mimetype == "application/x-ndjson"
+    lines = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+    assert [l["id"] for l in lines] == [100, 99, 98]
+    # Rows come from a named (server-side) cursor, without a LIMIT
+    assert any(q == "cursor" and p.get("name") for q, p in executed)
+    assert "LIMIT" not in executed[-1][0]
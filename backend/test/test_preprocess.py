@@ -0,0 +1,63 @@
+import importlib.util
+import os
+
+import pandas as pd
+
+from backend import datasets
+
+HERE = os.path.dirname(__file__)
+spec = importlib.util.spec_from_file_location(
+    "preprocess_data_2028", os.path.join(HERE, "..", "data", "preprocess_data_2028.py")
+)
+pp = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pp)
+
+ROW = {
+    "Age Bracket": "25–34", "household_income": "£80,000+",
+    "satisfaction_national_government": " Somewhat Satisfied", "importance_economy": "Very important",
+    "importance_social_issues": "not important", "support_welfare_spending": "YES ",
+    "tax_on_wealthy": "no", "trust_mainstream_media": "Low", "concern_political_corruption": "yes",
+    "climate_priority": "No", "immigration_policy_stance": "Same", "trust_public_institutions": "high",
+    "education_level": "Masters Degree", "2028__winner": " Tory ",
+    "is_snp_region": 1, "education_score": 4.0, "media_trust_score": 0,
+}
+
+
+def _write(tmp_path, rows):
+    path = tmp_path / "survey.csv"
+    pd.DataFrame([{**ROW, **row} for row in rows]).to_csv(path, index=False)
+    return path
+
+
+def test_preprocess_cleans_maps_and_drops_incomplete_rows(tmp_path):
+    raw = _write(tmp_path, [
+        {},
+        {"2028__winner": "Monster Raving Loony", "Age Bracket": "65+"},
+        {"climate_priority": "maybe"},          # unmapped ordinal: dropped
+        {"education_score": None},              # missing engineered value: dropped
+    ])
+    out_path = tmp_path / "clean"
+    assert pp.preprocess(str(raw), str(out_path), chunksize=2) == 2
+
+    out = datasets.read_frame(str(out_path))
+    assert out["2028__winner"].tolist() == ["con", "other"]
+    assert out["age_bracket"].tolist() == [2, 6]
+    assert out.loc[0, ["household_income", "satisfaction_national_government", "tax_on_wealthy"]].tolist() == [4, 1, 0]
+    assert out["education_level"].tolist() == ["masters degree"] * 2
+    assert out["education_score"].tolist() == [4.0, 4.0]
+    assert out["tax_on_wealthy"].dtype.kind == "i" and out["media_trust_score"].dtype.kind == "i"
+
+
+def test_output_does_not_depend_on_chunksize(tmp_path):
+    answers = ["Labour", "reform uk", "SNP", "green party", "Lib Dem", "??"]
+    raw = _write(tmp_path, [
+        {"2028__winner": answers[i % 6], "trust_mainstream_media": ["low", "medium", "High", "x"][i % 4]}
+        for i in range(50)
+    ])
+    outputs = []
+    for chunksize in (7, 50):
+        out_path = str(tmp_path / f"clean_{chunksize}")
+        pp.preprocess(str(raw), out_path, chunksize=chunksize)
+        outputs.append(datasets.read_frame(out_path).astype({"2028__winner": str, "education_level": str}))
+    pd.testing.assert_frame_equal(outputs[0], outputs[1])
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
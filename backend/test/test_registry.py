@@ -0,0 +1,73 @@
+import joblib
+import pytest
+
+from backend import app, registry
+
+
+@pytest.fixture
+def registry_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(registry, "REGISTRY_DIR", str(tmp_path / "registry"))
+    # install_model rebinds these module globals; put them back afterwards
+    for name in ("pipeline", "model_version", "_engine"):
+        monkeypatch.setattr(app, name, getattr(app, name))
+    return tmp_path
+
+
+@pytest.fixture
+def pipeline_file(registry_dir, small_pipeline):
+    path = registry_dir / "final_model.pkl"
+    joblib.dump(small_pipeline, path)
+    return str(path)
+
+
+def test_register_writes_manifest_and_promote_moves_active(registry_dir, pipeline_file):
+    data = registry_dir / "data.csv"
+    data.write_text("a,b\n1,2\n")
+    info = registry.register(pipeline_file, data_path=str(data), metrics={"macro_f1": 0.7}, job_id="abc")
+    assert registry.active_version() is None
+
+    manifest = registry.manifest(info["version"])
+    assert manifest["data_sha256"] == registry.file_sha256(str(data))
+    assert manifest["metrics"] == {"macro_f1": 0.7}
+    assert manifest["job_id"] == "abc"
+
+    registry.promote_version(info["version"])
+    assert registry.active_version() == info["version"]
+    assert [m["version"] for m in registry.list_versions()] == [info["version"]]
+
+    with pytest.raises(registry.UnknownVersion):
+        registry.promote_version("nope")
+
+
+def test_watcher_swaps_in_promoted_model(client, registry_dir, pipeline_file, small_pipeline):
+    info = registry.register(pipeline_file, promote=True)
+    watcher = registry.ModelWatcher(None, app.install_model)
+    watcher.check()
+
+    assert watcher.current == info["version"]
+    assert app.model_version == info["version"]
+    engine = app._engine
+    assert engine.pipeline is app.pipeline
+    assert app.get_engine() is engine  # already compiled and warm, no rebuild on the request path
+
+    body = client.get("/model").get_json()
+    assert body["version"] == body["active_version"] == info["version"]
+    assert body["manifest"]["model_sha256"] == info["model_sha256"]
+
+
+def test_watcher_keeps_serving_when_a_version_fails_to_load(registry_dir, pipeline_file):
+    bad = registry_dir / "bad.pkl"
+    bad.write_bytes(b"not a pickle")
+    info = registry.register(str(bad), promote=True)
+    before = app.pipeline
+    calls = []
+
+    def install(version):
+        calls.append(version)
+        app.install_model(version)
+
+    watcher = registry.ModelWatcher(None, install)
+    watcher.check()
+    watcher.check()
+    assert calls == [info["version"]]  # not retried until ACTIVE moves again
+    assert app.pipeline is before and watcher.current is None
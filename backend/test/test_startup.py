@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+from backend import app as app_module
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+HEAVY_MODULES = ("pandas", "numpy", "joblib", "sklearn", "xgboost", "shap", "psycopg2", "bcrypt")
+# Importing the app and answering /health took ~1.3s when the model and
+# pandas were loaded at import; it is ~0.35s without them.
+STARTUP_BUDGET = float(os.getenv("STARTUP_BUDGET_SECONDS", "0.75"))
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import backend.app
+status = backend.app.app.test_client().get("/health").status_code
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "status": status,
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def test_health_does_not_import_the_model_stack():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["status"] == 200
+    assert result["heavy"] == []
+    assert result["seconds"] < STARTUP_BUDGET, f"cold /health took {result['seconds']:.2f}s"
+
+
+def test_model_is_loaded_once_on_first_use(monkeypatch, small_pipeline):
+    calls = []
+    def fake_load():
+        calls.append(1)
+        return small_pipeline, "v1"
+    monkeypatch.setattr(app_module, "_load_serving_model", fake_load)
+    monkeypatch.setattr(app_module, "pipeline", None)
+    monkeypatch.setattr(app_module, "model_version", None)
+    monkeypatch.setattr(app_module, "_model_loaded", False)
+    monkeypatch.setattr(app_module, "_engine", None)
+    watchers = []
+    class FakeWatcher:
+        pid = os.getpid()
+        def __init__(self, current, on_change):
+            watchers.append(current)
+        def start(self):
+            return self
+    monkeypatch.setattr(app_module.registry, "ModelWatcher", FakeWatcher)
+    monkeypatch.setattr(app_module, "_watcher", None)
+
+    assert app_module.load_model() is small_pipeline
+    assert app_module.load_model() is small_pipeline
+    assert calls == [1]
+    assert app_module.model_version == "v1"
+    assert watchers == ["v1"]  # started from the resolved version, so v1 is not loaded twice
+
+
+def test_create_app_preloads_and_warmup_compiles(monkeypatch, small_pipeline):
+    monkeypatch.setattr(app_module, "_load_serving_model", lambda: (small_pipeline, None))
+    monkeypatch.setattr(app_module, "pipeline", None)
+    monkeypatch.setattr(app_module, "_model_loaded", False)
+    monkeypatch.setattr(app_module, "_engine", None)
+    monkeypatch.setattr(app_module, "_ensure_model_watcher", lambda: None)
+
+    assert app_module.create_app(preload_model=True) is app_module.app
+    assert app_module._engine.pipeline is small_pipeline
+
+    app_module.warmup()
+    assert app_module._engine.pipeline is small_pipeline
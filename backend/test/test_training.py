@@ -0,0 +1,182 @@
+import json
+import sys
+import textwrap
+import time
+
+import pytest
+
+from backend import auth, registry, training
+
+REPORT = textwrap.dedent("""\
+    ,precision,recall,f1-score,support
+    lab,0.9,0.8,0.85,10
+    accuracy,0.8125,0.8125,0.8125,0.8125
+    macro avg,0.8,0.7,0.75,10
+    weighted avg,0.81,0.8,0.79,10
+""")
+
+
+@pytest.fixture
+def client(client, make_token, monkeypatch):
+    """Test client authenticated as an admin (user 1)."""
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", frozenset({"1"}))
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {make_token(1)}"
+    return client
+
+
+@pytest.fixture
+def trainer(monkeypatch, tmp_path):
+    """Point the job runner at a tiny fake training script."""
+    jobs_dir = tmp_path / "jobs"
+    report = tmp_path / "report.csv"
+    gate = tmp_path / "gate"
+    script = tmp_path / "train.py"
+    script.write_text(textwrap.dedent(f"""
+        import os, time
+        print("loading data")
+        while not os.path.exists({str(gate)!r}):
+            time.sleep(0.02)
+        open({str(report)!r}, "w").write({REPORT!r})
+        print("done")
+    """))
+    monkeypatch.setattr(training, "JOBS_DIR", str(jobs_dir))
+    monkeypatch.setattr(registry, "REGISTRY_DIR", str(tmp_path / "registry"))
+    monkeypatch.setitem(training.TRAINERS, "fake", {
+        "command": [sys.executable, "-u", str(script)], "report": str(report),
+    })
+    return gate
+
+
+def _wait_for(job_id, states=("succeeded", "failed"), timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = training.get(job_id)
+        if job["status"] in states:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job stuck in {job['status']}")
+
+
+def test_train_returns_immediately_and_allows_one_job_per_model(client, trainer):
+    r = client.post("/train", json={"model": "fake"})
+    assert r.status_code == 202
+    job_id = r.get_json()["job_id"]
+    assert r.headers["Location"] == f"/train/{job_id}"
+
+    r = client.post("/train", json={"model": "fake"})
+    assert r.status_code == 409
+    assert r.get_json()["job_id"] == job_id
+
+    trainer.write_text("go")
+    job = _wait_for(job_id)
+    assert job["status"] == "succeeded"
+    assert job["metrics"]["accuracy"] == 0.8125
+    assert job["metrics"]["macro_f1"] == 0.75
+
+    r = client.get(f"/train/{job_id}")
+    assert r.get_json()["status"] == "succeeded"
+    logs = client.get(f"/train/{job_id}/logs").get_data(as_text=True)
+    assert "loading data" in logs and "done" in logs
+
+    # The lock is released with the runner, so a new job can start
+    trainer.write_text("go")
+    r = client.post("/train", json={"model": "fake"})
+    assert r.status_code == 202
+    _wait_for(r.get_json()["job_id"])
+
+
+def test_follow_streams_until_the_job_ends(client, trainer):
+    job_id = client.post("/train", json={"model": "fake"}).get_json()["job_id"]
+    _wait_for(job_id, states=("running",))
+    trainer.write_text("go")
+    logs = client.get(f"/train/{job_id}/logs?follow=1").get_data(as_text=True)
+    assert logs.rstrip().endswith("done")
+
+
+def test_failed_training_is_reported(client, trainer, monkeypatch):
+    monkeypatch.setitem(training.TRAINERS, "fake", {
+        "command": [sys.executable, "-c", "raise SystemExit(3)"], "report": "unused",
+    })
+    job_id = client.post("/train", json={"model": "fake"}).get_json()["job_id"]
+    job = _wait_for(job_id)
+    assert job["status"] == "failed"
+    assert job["exit_code"] == 3
+
+
+def test_successful_job_is_registered(client, trainer, monkeypatch, tmp_path):
+    artifact = tmp_path / "model.pkl"
+    artifact.write_bytes(b"model")
+    monkeypatch.setitem(training.TRAINERS["fake"], "artifact", str(artifact))
+    trainer.write_text("go")
+    job_id = client.post("/train", json={"model": "fake", "promote": True}).get_json()["job_id"]
+    job = _wait_for(job_id)
+    assert job["status"] == "succeeded"
+    assert registry.active_version() == job["version"]
+    assert registry.manifest(job["version"])["metrics"]["accuracy"] == 0.8125
+
+
+def test_unknown_model_and_job(client, trainer):
+    assert client.post("/train", json={"model": "nope"}).status_code == 400
+    assert client.get("/train/" + "0" * 32).status_code == 404
+    assert client.get("/train/not-a-job").status_code == 404
+
+
+def _meta_script(tmp_path, report, meta):
+    script = tmp_path / "train_meta.py"
+    script.write_text(textwrap.dedent(f"""
+        import json, sys
+        meta = {meta!r}
+        if not meta.get("skipped"):
+            open({str(report)!r}, "w").write({REPORT!r})
+        json.dump(dict(meta, args=sys.argv[1:]), open({str(tmp_path / "meta.json")!r}, "w"))
+    """))
+    return script
+
+
+def test_incremental_job_records_its_watermark(client, trainer, monkeypatch, tmp_path):
+    artifact = tmp_path / "model.pkl"
+    artifact.write_bytes(b"model")
+    meta = {"mode": "incremental", "base_version": "v1", "watermark": {"survey_responses_id": 42}, "new_rows": 300}
+    script = _meta_script(tmp_path, tmp_path / "report.csv", meta)
+    (tmp_path / "meta.json").write_text(json.dumps({"mode": "full", "watermark": None}))  # stale
+    monkeypatch.setitem(training.TRAINERS["fake"], "command", [sys.executable, str(script)])
+    monkeypatch.setitem(training.TRAINERS["fake"], "artifact", str(artifact))
+    monkeypatch.setitem(training.TRAINERS["fake"], "meta", str(tmp_path / "meta.json"))
+    monkeypatch.setitem(training.TRAINERS["fake"], "incremental_args", ["--incremental"])
+
+    job_id = client.post("/train", json={"model": "fake", "incremental": True}).get_json()["job_id"]
+    job = _wait_for(job_id)
+    assert job["status"] == "succeeded" and job["incremental"]
+    manifest = registry.manifest(job["version"])
+    assert manifest["watermark"] == {"survey_responses_id": 42}
+    assert manifest["mode"] == "incremental" and manifest["data_path"] is None
+    assert manifest["args"] == ["--incremental"]
+
+
+def test_incremental_job_without_new_rows_is_not_registered(client, trainer, monkeypatch, tmp_path):
+    artifact = tmp_path / "model.pkl"
+    artifact.write_bytes(b"model")
+    meta = {"mode": "incremental", "watermark": {"survey_responses_id": 42}, "new_rows": 3,
+            "skipped": "fewer than 100 new rows"}
+    script = _meta_script(tmp_path, tmp_path / "report.csv", meta)
+    monkeypatch.setitem(training.TRAINERS["fake"], "command", [sys.executable, str(script)])
+    monkeypatch.setitem(training.TRAINERS["fake"], "artifact", str(artifact))
+    monkeypatch.setitem(training.TRAINERS["fake"], "meta", str(tmp_path / "meta.json"))
+
+    job_id = client.post("/train", json={"model": "fake", "incremental": True}).get_json()["job_id"]
+    job = _wait_for(job_id)
+    assert job["status"] == "succeeded"
+    assert job["skipped"] == "fewer than 100 new rows" and job["new_rows"] == 3
+    assert "version" not in job and registry.list_versions() == []
+
+
+def test_training_routes_are_admin_only(client, trainer, make_token):
+    job_id = client.post("/train", json={"model": "fake"}).get_json()["job_id"]
+    trainer.touch()
+    anonymous = {"HTTP_AUTHORIZATION": ""}
+    user = {"HTTP_AUTHORIZATION": f"Bearer {make_token(2)}"}
+    for method, path in [("post", "/train"), ("get", f"/train/{job_id}"), ("get", f"/train/{job_id}/logs")]:
+        call = getattr(client, method)
+        assert call(path, json={"model": "fake", "promote": True}, environ_base=anonymous).status_code == 401
+        assert call(path, json={"model": "fake", "promote": True}, environ_base=user).status_code == 403
+    _wait_for(job_id)
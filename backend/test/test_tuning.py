@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from backend import tuning
+
+
+@pytest.fixture(scope="module")
+def data():
+    """Three separable classes: 6 one-hot columns + 2 engineered ones."""
+    rng = np.random.default_rng(0)
+    y = np.repeat([0, 1, 2], [40, 30, 20])
+    onehot = np.zeros((len(y), 6), dtype=np.float32)
+    onehot[np.arange(len(y)), y * 2 + rng.integers(0, 2, len(y))] = 1
+    engineered = np.column_stack([y + rng.normal(0, 0.3, len(y)), rng.integers(0, 3, len(y))])
+    return sparse.csr_matrix(onehot), engineered, y
+
+
+def _X(data):
+    from backend.inference import stack_sparse
+    onehot, engineered, y = data
+    return stack_sparse(onehot, engineered), y
+
+
+def test_sample_trials_starts_with_defaults_and_is_deterministic():
+    trials = tuning.sample_trials(5, seed=1)
+    assert trials[0] == tuning.DEFAULT_PARAMS
+    assert trials == tuning.sample_trials(5, seed=1)
+    assert len({json.dumps(t, sort_keys=True) for t in trials}) == 5
+
+
+def test_cross_validate_early_stops_and_scores(data):
+    X, y = _X(data)
+    scores = tuning.cross_validate({"max_depth": 2, "learning_rate": 0.3, "n_estimators": 200, "subsample": 1.0},
+                                   X, y, n_onehot=6, folds=3)
+    assert scores["macro_f1"] > 0.9
+    assert 1 <= scores["best_n_estimators"] < 200
+
+
+def test_search_runs_on_a_pool_and_resumes_from_checkpoint(tmp_path, data):
+    X, y = _X(data)
+    checkpoint = tmp_path / "trials.jsonl"
+    logs = []
+    best = tuning.search(X, y, 6, trials=3, folds=2, workers=2, n_jobs=1,
+                         checkpoint=str(checkpoint), log=logs.append)
+    lines = checkpoint.read_text().splitlines()
+    assert len(lines) == 3
+    assert best["mlogloss"] == min(json.loads(line)["mlogloss"] for line in lines)
+    assert "3 trials to run, 0 resumed" in logs[0]
+
+    with open(checkpoint, "a") as f:
+        f.write('{"key": "cut sh')  # an interrupted append
+    logs.clear()
+    again = tuning.search(X, y, 6, trials=4, folds=2, workers=1, checkpoint=str(checkpoint), log=logs.append)
+    assert "1 trials to run, 3 resumed" in logs[0]
+    assert again["mlogloss"] <= best["mlogloss"]
+    assert len(tuning.read_checkpoint(str(checkpoint))) == 4
+
+
+def test_rebalance_by_weights_keeps_rows_and_equalizes_classes(data):
+    X, y = _X(data)
+    X_w, y_w, weight = tuning.rebalance(X, y, 6, "weights")
+    assert X_w is X and len(weight) == len(y)
+    totals = np.bincount(y_w, weights=weight)
+    np.testing.assert_allclose(totals, totals[0])
+
+    X_s, y_s, none = tuning.rebalance(X, y, 6, "smote")
+    assert none is None and np.bincount(y_s).tolist() == [40, 40, 40]
+    with pytest.raises(ValueError):
+        tuning.rebalance(X, y, 6, "undersample")
+
+
+def test_cross_validate_with_class_weights(data):
+    X, y = _X(data)
+    scores = tuning.cross_validate({"max_depth": 2, "learning_rate": 0.3, "n_estimators": 200, "subsample": 1.0},
+                                   X, y, n_onehot=6, folds=3, method="weights")
+    assert scores["macro_f1"] > 0.9
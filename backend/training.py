@@ -0,0 +1,284 @@
+# backend/training.py
+"""Background training jobs for ``POST /train``.
+
+Each job gets a directory ``TRAIN_JOBS_DIR/<job_id>/`` holding ``status.json``
+and ``train.log``. ``submit`` starts a detached runner process
+(``python -m backend.training run <job_id>``) which runs the model's training
+script, streams its output into the log and records the outcome, so web
+workers return immediately and a worker restart does not kill the fit.
+
+At most one job runs per model, across all gunicorn workers: ``submit`` takes
+an exclusive ``flock`` on ``locks/<model>.lock`` and hands the locked file
+descriptor to the runner, which holds it until it exits.
+"""
+import csv
+import datetime as dt
+import fcntl
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from backend import registry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+JOBS_DIR = os.getenv("TRAIN_JOBS_DIR", os.path.join(BASE_DIR, "train_jobs"))
+
+# model name -> how to train it and where it writes its classification report
+TRAINERS = {
+    "xgb_2028": {
+        "command": [sys.executable, "-u", os.path.join(BASE_DIR, "models", "train_model_2028.py"),
+                    "--profile", "fast"],
+        "report": os.path.join(BASE_DIR, "data", "xgb_report_2028.csv"),
+        "artifact": os.path.join(BASE_DIR, "models", "final_model.pkl"),
+        "booster": os.path.join(BASE_DIR, "models", "xgb_booster_2028.ubj"),
+        "encoder_spec": os.path.join(BASE_DIR, "models", "xgb_encoder_spec_2028.json"),
+        "data": os.path.join(BASE_DIR, "data", "processed_dataset_2028"),  # see backend.datasets
+        "meta": os.path.join(BASE_DIR, "models", "xgb_train_meta_2028.json"),  # fit mode + watermark
+        "incremental_args": ["--incremental"],
+    },
+}
+DEFAULT_MODEL = "xgb_2028"
+ACTIVE_STATES = ("queued", "running")
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UnknownModel(ValueError):
+    pass
+
+
+class JobAlreadyRunning(RuntimeError):
+    def __init__(self, job_id):
+        super().__init__(f"a training job is already running ({job_id})")
+        self.job_id = job_id
+
+
+# ─── Files ───────────────────────────────────────────────────────────────────
+def _now() -> str:
+    return dt.datetime.now(dt.UTC).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def job_dir(job_id: str) -> str:
+    if not _JOB_ID.match(job_id or ""):
+        raise KeyError(job_id)
+    return os.path.join(JOBS_DIR, job_id)
+
+
+def log_path(job_id: str) -> str:
+    return os.path.join(job_dir(job_id), "train.log")
+
+
+def _lock_path(model: str) -> str:
+    return os.path.join(JOBS_DIR, "locks", f"{model}.lock")
+
+
+def _write_status(job_id: str, /, **fields) -> dict:
+    path = os.path.join(job_dir(job_id), "status.json")
+    status = _read_status(job_id) or {}
+    status.update(fields)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(status, f)
+    os.replace(tmp, path)  # readers never see a half-written file
+    return status
+
+
+def _read_status(job_id: str):
+    try:
+        with open(os.path.join(job_dir(job_id), "status.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _lock_is_held(model: str) -> bool:
+    try:
+        fd = os.open(_lock_path(model), os.O_RDONLY)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)  # also drops the probe lock
+    return False
+
+
+def _try_lock(fd, grace: float = 2.0) -> bool:
+    """Lock ``fd``, waiting up to ``grace`` seconds if the holder already finished.
+
+    A runner records its outcome just before exiting, so for a moment a
+    finished job can still hold the lock.
+    """
+    deadline = time.monotonic() + grace
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            holder = os.pread(fd, 64, 0).decode().strip()
+            status = _read_status(holder) if _JOB_ID.match(holder) else None
+            if not status or status["status"] in ACTIVE_STATES or time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+
+
+# ─── API used by the web app ─────────────────────────────────────────────────
+def submit(model: str = DEFAULT_MODEL, promote: bool = False, incremental: bool = False) -> dict:
+    """Queue a training run for ``model`` and return its status.
+
+    A successful run is added to the model registry; with ``promote`` it also
+    becomes the active version. ``incremental`` continues the active version
+    on the rows ingested since it instead of fitting from scratch.
+    """
+    if model not in TRAINERS:
+        raise UnknownModel(model)
+    trainer = dict(TRAINERS[model])
+    if incremental:
+        trainer["command"] = trainer["command"] + trainer.get("incremental_args", [])
+    os.makedirs(os.path.dirname(_lock_path(model)), exist_ok=True)
+
+    fd = os.open(_lock_path(model), os.O_RDWR | os.O_CREAT, 0o644)
+    if not _try_lock(fd):
+        running = os.pread(fd, 64, 0).decode().strip()
+        os.close(fd)
+        raise JobAlreadyRunning(running)
+
+    try:
+        job_id = uuid.uuid4().hex
+        os.makedirs(job_dir(job_id))
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, job_id.encode(), 0)
+        status = _write_status(job_id, job_id=job_id, model=model, status="queued", created_at=_now(),
+                               promote=promote, incremental=incremental, **trainer)
+
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "backend.training", "run", job_id, str(fd)],
+            cwd=ROOT_DIR,
+            env={**os.environ, "TRAIN_JOBS_DIR": JOBS_DIR, "MODEL_REGISTRY_DIR": registry.REGISTRY_DIR},
+            pass_fds=(fd,), start_new_session=True,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        # Reap the runner when it exits so it doesn't linger as a zombie.
+        threading.Thread(target=proc.wait, daemon=True).start()
+        return status
+    finally:
+        os.close(fd)  # the runner keeps the lock through its inherited descriptor
+
+
+def get(job_id: str):
+    """Return the job's status dict, or None if there is no such job."""
+    try:
+        status = _read_status(job_id)
+    except KeyError:
+        return None
+    if status and status["status"] in ACTIVE_STATES and not _lock_is_held(status["model"]):
+        # The runner died without recording an outcome (killed, host restart).
+        status = _write_status(job_id, status="failed", error="runner exited unexpectedly",
+                               finished_at=_now())
+    return status
+
+
+def read_log(job_id: str, offset: int = 0, follow: bool = False, poll: float = 0.5):
+    """Yield the job's log from ``offset``; with ``follow`` keep going until it ends."""
+    path = log_path(job_id)
+    while True:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+            if chunk:
+                offset += len(chunk)
+                yield chunk
+                continue
+        if not follow or (get(job_id) or {}).get("status") not in ACTIVE_STATES:
+            return
+        time.sleep(poll)
+
+
+def read_report_metrics(report_path: str) -> dict:
+    """Accuracy and macro/weighted averages from a classification-report CSV."""
+    metrics = {}
+    with open(report_path, newline="") as f:
+        for row in csv.DictReader(f):
+            name = row.get("") or next(iter(row.values()))
+            if name == "accuracy":
+                metrics["accuracy"] = round(float(row["f1-score"]), 4)
+            elif name in ("macro avg", "weighted avg"):
+                key = name.split()[0]
+                for col in ("precision", "recall", "f1-score"):
+                    metrics[f"{key}_{col.replace('-score', '')}"] = round(float(row[col]), 4)
+    return metrics
+
+
+def read_meta(meta_path: str, since: float) -> dict:
+    """The training script's metadata, if it was written after ``since``."""
+    try:
+        if os.path.getmtime(meta_path) < since:
+            return {}  # left over from an earlier run
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ─── Runner process ──────────────────────────────────────────────────────────
+def run(job_id: str):
+    """Run a queued job to completion (called in the detached runner)."""
+    status = _read_status(job_id)
+    started, started_at = time.monotonic(), time.time()
+    _write_status(job_id, status="running", pid=os.getpid(), started_at=_now())
+
+    env = {**os.environ, "MPLBACKEND": "Agg", "PYTHONUNBUFFERED": "1"}
+    with open(log_path(job_id), "ab") as log:
+        try:
+            code = subprocess.run(status["command"], cwd=ROOT_DIR, env=env,
+                                  stdout=log, stderr=subprocess.STDOUT).returncode
+        except Exception as e:
+            log.write(f"\n❌ Could not start training: {e}\n".encode())
+            code = -1
+
+    outcome = {"exit_code": code, "finished_at": _now(),
+               "duration_seconds": round(time.monotonic() - started, 1)}
+    if code != 0:
+        _write_status(job_id, status="failed", error=f"training exited with code {code}", **outcome)
+        return
+    meta = read_meta(status["meta"], started_at) if status.get("meta") else {}
+    if meta.get("skipped"):
+        # Nothing new to fit (incremental run): the active version stays as is.
+        _write_status(job_id, status="succeeded", skipped=meta["skipped"], new_rows=meta.get("new_rows"),
+                      **outcome)
+        return
+    try:
+        outcome["metrics"] = read_report_metrics(status["report"])
+    except (OSError, KeyError, ValueError) as e:
+        outcome["metrics"] = None
+        outcome["metrics_error"] = str(e)
+
+    if status.get("artifact"):
+        try:
+            # An incremental fit is trained on database rows, not on the dataset file.
+            data_path = None if meta.get("mode") == "incremental" else status.get("data")
+            info = registry.register(
+                status["artifact"], data_path=data_path, metrics=outcome["metrics"],
+                booster_path=status.get("booster"), spec_path=status.get("encoder_spec"),
+                promote=status.get("promote", False), source="train", job_id=job_id, **meta,
+            )
+            outcome.update(version=info["version"], promoted=status.get("promote", False))
+        except OSError as e:
+            outcome["registry_error"] = str(e)
+    _write_status(job_id, status="succeeded", **outcome)
+
+
+if __name__ == "__main__":
+    # python -m backend.training run <job_id> <lock_fd>
+    if len(sys.argv) != 4 or sys.argv[1] != "run":
+        sys.exit("usage: python -m backend.training run <job_id> <lock_fd>")
+    run(sys.argv[2])  # the inherited lock fd stays open until this process exits
@@ -0,0 +1,190 @@
+# backend/tuning.py
+"""Hyperparameter search for the XGBoost survey model (``train_model_2028.py --tune``).
+
+Each trial is one parameter set scored by stratified k-fold cross-validation.
+The training folds are rebalanced (SMOTE or class weights, see ``rebalance``)
+and XGBoost stops early on the held-out fold's ``mlogloss``. Trials run on a process pool, each worker
+fitting with ``n_jobs`` threads, so a search keeps every core busy.
+
+Every finished trial is appended to a JSONL checkpoint. An interrupted
+search that is run again skips the trials already recorded for the same
+data, folds and seed.
+"""
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+SEARCH_SPACE = {
+    "max_depth": [3, 4, 5, 6, 8],
+    "learning_rate": [0.03, 0.05, 0.1, 0.2],
+    "n_estimators": [300, 600, 1000],  # upper bound; early stopping picks the count
+    "subsample": [0.7, 0.8, 0.9, 1.0],
+}
+# The untuned config: deeper trees, a low rate, 300 trees, 90% of rows per tree.
+DEFAULT_PARAMS = {"max_depth": 6, "learning_rate": 0.05, "n_estimators": 300, "subsample": 0.9}
+FIXED_PARAMS = {"objective": "multi:softprob", "eval_metric": "mlogloss", "colsample_bytree": 0.9}
+EARLY_STOPPING_ROUNDS = 30
+REBALANCE_METHODS = ("smote", "weights")
+
+
+# ─── Resampling (shared with the final fit) ──────────────────────────────────
+def balance(X, y, n_onehot: int, random_state: int = 42):
+    """SMOTE-balance ``X``/``y``; keeps the engineered block's stored zeros."""
+    from imblearn.over_sampling import SMOTE
+    from backend.inference import stack_sparse
+
+    X_res, y_res = SMOTE(sampling_strategy="auto", random_state=random_state).fit_resample(X, y)
+    # SMOTE's sparse arithmetic drops zeros; store the engineered block in full again.
+    return stack_sparse(X_res[:, :n_onehot], X_res[:, n_onehot:].toarray()), np.asarray(y_res)
+
+
+def rebalance(X, y, n_onehot: int, method: str = "smote", random_state: int = 42):
+    """``(X, y, sample_weight)`` in which every class carries the same total weight.
+
+    ``smote`` adds synthetic minority rows (``sample_weight`` is None).
+    ``weights`` keeps the real rows and weights each by its class's inverse
+    frequency: no neighbour search and no extra rows.
+    """
+    if method == "smote":
+        return (*balance(X, y, n_onehot, random_state), None)
+    if method == "weights":
+        from sklearn.utils.class_weight import compute_sample_weight
+        return X, np.asarray(y), compute_sample_weight("balanced", y)
+    raise ValueError(f"unknown rebalance method {method!r}")
+
+
+# ─── Trials ──────────────────────────────────────────────────────────────────
+def sample_trials(n: int, seed: int = 42) -> list:
+    """The default config followed by ``n - 1`` distinct random grid points."""
+    grid = [dict(zip(SEARCH_SPACE, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    grid.remove(DEFAULT_PARAMS)
+    return [dict(DEFAULT_PARAMS)] + random.Random(seed).sample(grid, min(max(n - 1, 0), len(grid)))
+
+
+def data_fingerprint(X, y) -> str:
+    h = hashlib.sha256()
+    for part in (np.asarray(X.shape), X.indptr, X.indices, X.data, np.asarray(y)):
+        h.update(np.ascontiguousarray(part).tobytes())
+    return h.hexdigest()[:16]
+
+
+def trial_key(params: dict, folds: int, seed: int, fingerprint: str, method: str = "smote") -> str:
+    raw = json.dumps({"params": params, "folds": folds, "seed": seed, "data": fingerprint, "rebalance": method},
+                     sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def cross_validate(params: dict, X, y, n_onehot: int, folds: int = 5, n_jobs: int = 1, seed: int = 42,
+                   method: str = "smote") -> dict:
+    """Mean held-out ``mlogloss``/macro-F1 and early-stopped tree count for one config."""
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import StratifiedKFold
+    from xgboost import XGBClassifier
+
+    losses, f1s, rounds = [], [], []
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    for train_idx, val_idx in splitter.split(np.zeros(len(y)), y):
+        X_train, y_train, weight = rebalance(X[train_idx], y[train_idx], n_onehot, method, random_state=seed)
+        model = XGBClassifier(**FIXED_PARAMS, **params, early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                              n_jobs=n_jobs, random_state=seed)
+        model.fit(X_train, y_train, sample_weight=weight, eval_set=[(X[val_idx], y[val_idx])], verbose=False)
+        losses.append(model.best_score)
+        rounds.append(model.best_iteration + 1)
+        f1s.append(f1_score(y[val_idx], model.predict(X[val_idx]), average="macro"))
+    return {
+        "mlogloss": float(np.mean(losses)),
+        "mlogloss_std": float(np.std(losses)),
+        "macro_f1": float(np.mean(f1s)),
+        "best_n_estimators": int(round(np.mean(rounds))),
+    }
+
+
+# ─── Process pool ────────────────────────────────────────────────────────────
+_worker = {}
+
+
+def _init_worker(X, y, n_onehot, folds, n_jobs, seed, method):
+    _worker.update(X=X, y=y, n_onehot=n_onehot, folds=folds, n_jobs=n_jobs, seed=seed, method=method)
+
+
+def _run_trial(params: dict) -> dict:
+    started = time.perf_counter()
+    scores = cross_validate(params, _worker["X"], _worker["y"], _worker["n_onehot"],
+                            _worker["folds"], _worker["n_jobs"], _worker["seed"], _worker["method"])
+    return {**scores, "seconds": round(time.perf_counter() - started, 1)}
+
+
+# ─── Checkpoint ──────────────────────────────────────────────────────────────
+def read_checkpoint(path: str) -> dict:
+    """``{trial_key: result}`` of every complete line in ``path``."""
+    done = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted write
+                done[result["key"]] = result
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _append(path: str, result: dict):
+    line = (json.dumps(result, sort_keys=True) + "\n").encode()
+    with open(path, "ab+") as f:
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = b"\n" + line  # don't glue onto a line cut short by an interrupted write
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def search(X, y, n_onehot: int, trials: int = 20, folds: int = 5, workers: int = None,
+           n_jobs: int = None, checkpoint: str = None, seed: int = 42, method: str = "smote",
+           log=print) -> dict:
+    """Run (or resume) the search; returns the result with the lowest CV ``mlogloss``."""
+    from scipy import sparse
+
+    X, y = sparse.csr_matrix(X), np.asarray(y)
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, trials))
+    n_jobs = n_jobs or max(1, cores // workers)
+
+    fingerprint = data_fingerprint(X, y)
+    done = read_checkpoint(checkpoint) if checkpoint else {}
+    results, pending = [], {}
+    for params in sample_trials(trials, seed):
+        key = trial_key(params, folds, seed, fingerprint, method)
+        if key in done:
+            results.append(done[key])
+        else:
+            pending[key] = params
+    log(f"🔎 Tuning: {len(pending)} trials to run, {len(results)} resumed | "
+        f"{folds}-fold CV | {method} | {workers} workers x {n_jobs} threads")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(X, y, n_onehot, folds, n_jobs, seed, method)) as pool:
+            futures = {pool.submit(_run_trial, params): key for key, params in pending.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                result = {"key": key, "params": pending[key], "folds": folds, **future.result()}
+                if checkpoint:
+                    _append(checkpoint, result)
+                results.append(result)
+                log(f"   mlogloss={result['mlogloss']:.4f} macro_f1={result['macro_f1']:.3f} "
+                    f"trees={result['best_n_estimators']} {result['params']} ({result['seconds']}s)")
+
+    best = min(results, key=lambda r: r["mlogloss"])
+    log(f"🏆 Best: mlogloss={best['mlogloss']:.4f} {best['params']} trees={best['best_n_estimators']}")
+    return best
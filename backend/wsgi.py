@@ -1,6 +1,8 @@
+from backend.app import create_app
 
-
-from backend.app import app
+# Loaded once here; under gunicorn that is the master (preload_app), and each
+# forked worker finishes with backend.app.warmup() in post_fork.
+app = create_app(preload_model=True)
 
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,32 @@
+# gunicorn.conf.py — picked up automatically by `gunicorn backend.wsgi:app`
+import os
+import shutil
+import tempfile
+
+# Load the app (and the model) once in the master. Forked workers share the
+# booster's pages copy-on-write instead of each parsing their own copy.
+preload_app = True
+
+# Workers share Prometheus samples through files in this directory, so
+# /metrics reports totals for the whole server rather than one worker.
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "election-predictor-metrics")
+)
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be added to this one's.
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Compile/warm the model and start the registry watcher before this
+    # worker accepts its first request.
+    from backend.app import warmup
+    warmup()
+
+
+def child_exit(server, worker):
+    from backend.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
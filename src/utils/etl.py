@@ -1,14 +1,215 @@
 # src/utils/etl.py
+"""Streaming ETL: ``data/raw/*.csv`` -> ``survey_responses`` in Postgres.
 
+Each CSV is read ``--chunksize`` rows at a time and normalized with the rules
+in ``backend/features.py``, which also computes the engineered columns. Each chunk is then loaded with one
+``COPY ... FROM STDIN``.
+
+Every chunk is a batch keyed by the raw rows it covers: ``(source_file,
+first_row, row_count)``. The batch row and its COPY commit in the same
+transaction, and a load starts reading each file after the last raw row
+already recorded for it. Re-running a load after a crash, or on a file that
+has grown, only copies rows that are not there yet.
+
+    python src/utils/etl.py [data/raw] [--chunksize 100000]
+"""
+import argparse
+import glob
+import io
 import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT_DIR)
+
+from backend.features import (  # noqa: E402
+    ENGINEERED_COLS, PARTY_MAP, RAW_FEATURES, TARGET, engineer_features_frame,
+)
+
+CHUNK_ROWS = int(os.getenv("ETL_CHUNK_ROWS", "100000"))
+COLUMNS = RAW_FEATURES + ["winner_2028"] + ENGINEERED_COLS
+
+BATCH_SQL = """
+    INSERT INTO survey_ingest_batches (batch_key, source_file, first_row, row_count)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (batch_key) DO NOTHING
+    RETURNING id
+"""
+LOADED_ROWS_SQL = """
+    SELECT COALESCE(MAX(first_row + row_count), 0) AS loaded
+    FROM survey_ingest_batches
+    WHERE source_file = %s
+"""
+COPY_SQL = f"COPY survey_responses (batch_id, {', '.join(COLUMNS)}) FROM STDIN"
+
+
+# ─── Transform ───────────────────────────────────────────────────────────────
+# Survey answers repeat a handful of values millions of times, so each column
+# is factorized and only its distinct values are cleaned, parsed or formatted.
+def _clean_text(s: pd.Series, mapping: dict = None) -> pd.Categorical:
+    codes, uniques = pd.factorize(s)
+    cleaned = pd.Index(uniques, dtype=object).str.strip().str.lower()
+    if mapping is not None:
+        cleaned = pd.Index(cleaned.map(mapping), dtype=object).fillna("other")
+    clean_codes, categories = pd.factorize(cleaned)
+    return pd.Categorical.from_codes(np.append(clean_codes, -1)[codes], categories)  # -1 stays missing
+
+
+def normalize_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean one chunk of raw survey rows into ``COLUMNS`` order.
+
+    The engineered columns are always computed with ``backend.features``;
+    any copies in the CSV are ignored, so stored rows match what serving sees.
+    """
+    df = df.rename(columns=lambda c: str(c).strip().lower().replace(" ", "_"))
+    missing = [c for c in RAW_FEATURES + [TARGET] if c not in df.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+
+    out = pd.DataFrame({col: _clean_text(df[col]) for col in RAW_FEATURES}, index=df.index)
+    out["winner_2028"] = _clean_text(df[TARGET].fillna(""), PARTY_MAP)
+    out = out.dropna(subset=RAW_FEATURES)
+    out[ENGINEERED_COLS] = engineer_features_frame(out[RAW_FEATURES].astype(object))
+    return out.drop_duplicates()
+
+
+def batch_key(source_file: str, first_row: int, row_count: int) -> str:
+    """Key of the raw rows ``[first_row, first_row + row_count)`` of a file."""
+    return f"{source_file}:{first_row}:{row_count}"
+
+
+# ─── Load ────────────────────────────────────────────────────────────────────
+def _copy_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
 
-def run(input_dir: str, output_dir: str):
+def _copy_column(values) -> np.ndarray:
+    """Column rendered as COPY text fields (NULL is ``\\N``)."""
+    codes, uniques = pd.factorize(values)
+    if uniques.dtype.kind == "f":
+        fields = [repr(float(u)) for u in uniques]
+    else:
+        fields = [_copy_escape(str(u)) for u in uniques]
+    return np.array(fields + ["\\N"], dtype=object)[codes]
+
+
+def to_copy_text(chunk: pd.DataFrame, batch_id: int) -> str:
+    """Rows of ``chunk``, prefixed with ``batch_id``, in COPY's text format."""
+    columns = [np.full(len(chunk), str(batch_id), dtype=object)]
+    columns += [_copy_column(chunk[col]) for col in COLUMNS]
+    return "".join(line + "\n" for line in map("\t".join, zip(*columns)))
+
+
+def _first_value(row):
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+def loaded_rows(conn, source_file: str) -> int:
+    """Raw rows of ``source_file`` already covered by recorded batches."""
+    cur = conn.cursor()
+    try:
+        cur.execute(LOADED_ROWS_SQL, (source_file,))
+        return int(_first_value(cur.fetchone()))
+    finally:
+        cur.close()
+
+
+def load_chunk(conn, chunk: pd.DataFrame, source_file: str, first_row: int, rows_read: int) -> bool:
+    """COPY ``chunk`` unless its batch is already loaded; True if it was loaded.
+
+    ``rows_read`` is the number of raw CSV rows the chunk was normalized from,
+    so the batch records its span of the file even when rows were dropped.
     """
-    ETL stub: scans input_dir, processes files, and writes to output_dir.
+    key = batch_key(source_file, first_row, rows_read)
+    cur = conn.cursor()
+    try:
+        cur.execute(BATCH_SQL, (key, source_file, first_row, rows_read))
+        batch = cur.fetchone()
+        if batch is None:
+            conn.rollback()
+            return False
+        if not chunk.empty:
+            cur.copy_expert(COPY_SQL, io.StringIO(to_copy_text(chunk, _first_value(batch))))
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def read_chunks(path: str, chunksize: int = CHUNK_ROWS, start_row: int = 0):
+    """Yield ``(first_row, rows_read, normalized_chunk)`` for a raw CSV.
+
+    Data rows before ``start_row`` (0-based, header excluded) are skipped.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    print(f"[ETL] Would process data from {input_dir} into {output_dir}")
+    skip = range(1, start_row + 1) if start_row else None
+    reader = pd.read_csv(path, dtype=str, chunksize=chunksize, skiprows=skip,
+                         keep_default_na=False, na_values=[""])
+    first_row = start_row
+    for raw in reader:
+        if raw.empty:  # nothing past start_row
+            continue
+        yield first_row, len(raw), normalize_chunk(raw)
+        first_row += len(raw)
+
+
+def load_file(conn, path: str, chunksize: int = CHUNK_ROWS) -> dict:
+    """Load the rows of ``path`` past those already recorded for it."""
+    stats = {"batches_loaded": 0, "batches_skipped": 0, "rows_loaded": 0, "rows_read": 0}
+    source = os.path.basename(path)
+    for first_row, rows_read, chunk in read_chunks(path, chunksize, loaded_rows(conn, source)):
+        stats["rows_read"] += rows_read
+        if load_chunk(conn, chunk, source, first_row, rows_read):
+            stats["batches_loaded"] += 1
+            stats["rows_loaded"] += len(chunk)
+        else:
+            stats["batches_skipped"] += 1
+    return stats
+
+
+def run(input_dir: str = "data/raw", chunksize: int = CHUNK_ROWS, conn=None) -> dict:
+    """Load every CSV in ``input_dir``; returns totals across files."""
+    from backend.db import get_db_connection
+    from backend.schema import ensure_schema
+
+    paths = sorted(glob.glob(os.path.join(input_dir, "*.csv")))
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    totals = {"files": len(paths), "batches_loaded": 0, "batches_skipped": 0,
+              "rows_loaded": 0, "rows_read": 0}
+    started = time.perf_counter()
+    try:
+        cur = conn.cursor()
+        ensure_schema(cur)
+        conn.commit()
+        cur.close()
+        for path in paths:
+            stats = load_file(conn, path, chunksize)
+            for k, v in stats.items():
+                totals[k] += v
+            print(f"[ETL] {os.path.basename(path)}: {stats['rows_loaded']} rows in "
+                  f"{stats['batches_loaded']} new batches ({stats['batches_skipped']} already loaded)")
+    finally:
+        if own_conn:
+            conn.close()
+    totals["seconds"] = round(time.perf_counter() - started, 1)
+    print(f"✅ [ETL] Loaded {totals['rows_loaded']} of {totals['rows_read']} rows "
+          f"from {totals['files']} files in {totals['seconds']}s")
+    return totals
+
 
 if __name__ == "__main__":
-    # relative paths from project root
-    run("data/raw", "data/processed")
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Bulk-load raw survey CSVs into Postgres.")
+    parser.add_argument("input_dir", nargs="?", default=os.path.join(ROOT_DIR, "data", "raw"))
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    run(args.input_dir, args.chunksize)